@@ -1,13 +1,14 @@
 from gomoku.game import Board
 from gomoku import ai
 
-def run_demo(max_moves=200, depth=2):
-    board = Board(size=15)
+def run_demo(max_moves=200, depth=2, time_limit_ms=None, workers=1):
+    board = Board(15)
+    ai.reset_caches()
     current = 1
     move_count = 0
     print('Starting AI vs AI demo (depth={})'.format(depth))
     while move_count < max_moves:
-        mv = ai.choose_move_minimax(board, current, depth=depth)
+        mv = ai.choose_move_minimax(board, current, depth=depth, time_limit_ms=time_limit_ms, workers=workers)
         if mv is None:
             print('No moves left, draw')
             break
@@ -24,6 +25,17 @@ def run_demo(max_moves=200, depth=2):
         current = 3 - current
     else:
         print('Reached max moves, stopping.')
+    return list(board.history)
 
 if __name__ == '__main__':
-    run_demo(depth=2)
+    import argparse
+    from gomoku import profiling
+    parser = argparse.ArgumentParser(description='AI vs AI demo game')
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--moves', type=int, default=200)
+    parser.add_argument('--time', type=int, default=None, help='time limit per move in ms')
+    parser.add_argument('--workers', type=int, default=1)
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args)
+    run_demo(max_moves=args.moves, depth=args.depth, time_limit_ms=args.time, workers=args.workers)
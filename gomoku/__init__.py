@@ -1,3 +1,3 @@
 """Gomoku package"""
 
-__all__ = ["main", "game", "ui", "ai", "storage"]
+__all__ = ["main", "game", "ui", "ai", "storage", "patterns", "tt", "cache", "ai_numpy", "threats", "background", "book", "ttfile", "tournament", "bench", "profiling"]
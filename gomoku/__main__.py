@@ -0,0 +1,33 @@
+"""
+`python -m gomoku` opens the game (same options as gomoku.main);
+`python -m gomoku warmup` compiles and loads everything the first AI move
+would otherwise wait for, so short-lived batch workers start fast.
+"""
+import argparse
+import sys
+import time
+
+
+def warmup(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m gomoku warmup',
+                                     description='Precompile the JIT functions and build the lookup tables')
+    parser.add_argument('--size', type=int, nargs='*', default=[15], help='board sizes to prepare')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    from . import ai
+    print('{:8s} {:.2f}s'.format('import', time.perf_counter() - start))
+    ai.warmup(args.size, log=lambda name, secs: print('{:8s} {:.2f}s'.format(name, secs)))
+    print('warm-up done in {:.2f}s'.format(time.perf_counter() - start))
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == 'warmup':
+        warmup(argv[1:])
+    else:
+        from .main import main as run
+        run(argv)
+
+
+if __name__ == '__main__':
+    main()
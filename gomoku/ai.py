@@ -1,25 +1,57 @@
-from typing import Tuple, Optional, List
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import atexit
+import importlib.util
+import os
 import random
+import time
 
-# caches to speed repeated evaluations
-EVAL_CACHE = {}
+from .book import OpeningBook
+from .cache import EvalCache
+from .patterns import flat_lines, score_line_pair
+from .tt import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+from .ttfile import TTFile
+from . import threats
 
-# optional Cython accelerated evaluator
+# when True, cache entries carry the full grid and every hit is checked against it
+VERIFY_HASH = False
+
+# caches full-scan evaluations (one entry per position, shared by both colors); Board
+# keeps its pattern totals up to date, so searches on a Board never consult it and it
+# only backs the from-scratch evaluators used for other board objects
+EVAL_CACHE_MB = float(os.environ.get('GOMOKU_EVAL_CACHE_MB', 32))
+EVAL_CACHE = EvalCache(EVAL_CACHE_MB)
+
+# optional Cython core (gomoku/ai_cy.pyx, built by setup_cython.py): evaluator and whole-search engine
 try:
-    from .ai_cy import evaluate_board as _cy_evaluate_board
+    from .ai_cy import evaluate_board as _cy_evaluate_board, CySearch
     CY_EVAL_AVAILABLE = True
 except Exception:
     _cy_evaluate_board = None
+    CySearch = None
     CY_EVAL_AVAILABLE = False
 
-# optional numba JIT acceleration
-try:
-    import numpy as np
-    from .ai_numba import evaluate_board_numba
-    NUMBA_EVAL_AVAILABLE = True
-except Exception:
-    evaluate_board_numba = None
-    NUMBA_EVAL_AVAILABLE = False
+
+def _installed(package: str) -> bool:
+    return importlib.util.find_spec(package) is not None
+
+
+# optional numba JIT acceleration (gomoku.ai_numba) and vectorised NumPy evaluator
+# (gomoku.ai_numpy, which scores whole batches of positions). Both are imported
+# on first use, since importing numba alone takes a good part of a second; the flags
+# only say whether the packages are installed. warmup() loads them ahead of time.
+NUMPY_EVAL_AVAILABLE = _installed('numpy')
+NUMBA_EVAL_AVAILABLE = NUMPY_EVAL_AVAILABLE and _installed('numba')
+
+
+def _ai_numba():
+    from . import ai_numba
+    return ai_numba
+
+
+def _ai_numpy():
+    from . import ai_numpy
+    return ai_numpy
 
 
 def _grid_bytes(board) -> bytes:
@@ -33,6 +65,35 @@ def _grid_bytes(board) -> bytes:
     return bytes(ba)
 
 
+def _position_key(board):
+    # Zobrist hash maintained by Board; plain grid bytes for boards without one
+    h = getattr(board, 'hash', None)
+    if h is None:
+        return _grid_bytes(board)
+    return h
+
+
+def set_hash_verification(enabled: bool) -> None:
+    """Turn collision checking of TT/EVAL_CACHE hits on or off (clears both caches)."""
+    global VERIFY_HASH, EVAL_CACHE
+    VERIFY_HASH = bool(enabled)
+    EVAL_CACHE = EvalCache(EVAL_CACHE_MB, verify=VERIFY_HASH)
+    resize_tt(TT_SIZE_MB)
+
+
+def hash_collisions() -> int:
+    """Hash collisions caught since verification was last switched on."""
+    return DEFAULT_ENGINE.tt.collisions + EVAL_CACHE.collisions
+
+
+def reset_caches() -> None:
+    """Forget everything learned in previous games (TT, eval cache, killers, history)."""
+    DEFAULT_ENGINE.reset()
+    if _NATIVE_ENGINE is not None:
+        _NATIVE_ENGINE.reset()
+    EVAL_CACHE.clear()
+
+
 def choose_move_random(board) -> Optional[Tuple[int, int]]:
     empties = [(x, y) for y in range(board.size) for x in range(board.size) if board.grid[y][x] == 0]
     if not empties:
@@ -40,7 +101,50 @@ def choose_move_random(board) -> Optional[Tuple[int, int]]:
     return random.choice(empties)
 
 
+def _max_candidates(depth: int) -> int:
+    if depth <= 2:
+        return 30
+    elif depth == 3:
+        return 18
+    elif depth == 4:
+        return 10
+    return 6
+
+
+@lru_cache(maxsize=None)
+def _cell_order(size: int) -> Tuple[int, ...]:
+    # per flat cell: (distance to center << 10) | index, the tie-breaks after neighbour count
+    center = size // 2
+    return tuple(((abs(i % size - center) + abs(i // size - center)) << 10) | i for i in range(size * size))
+
+
 def _neighbors(board, dist: int = 2, depth: int = 2) -> List[Tuple[int, int]]:
+    size = board.size
+    cand = getattr(board, 'candidates', None)
+    if dist == 2 and cand is not None:
+        # Board keeps the candidate set and neighbour counts up to date
+        if not cand:
+            center = size // 2
+            return [(center, center)]
+        counts = board.neighbor_count
+        order = _cell_order(size)
+        keys = [((32 - counts[i]) << 20) | order[i] for i in cand]
+        keys.sort()
+        out = []
+        for k in keys[:_max_candidates(depth)]:
+            i = k & 1023
+            out.append((i % size, i // size))
+        return out
+    pts = _scan_neighbors(board, dist)
+    if not pts:
+        center = board.size // 2
+        return [(center, center)]
+    center = board.size // 2
+    items = sorted(pts.items(), key=lambda kv: (-kv[1], abs(kv[0][0] - center) + abs(kv[0][1] - center)))
+    return [p for p, _ in items[:_max_candidates(depth)]]
+
+
+def _scan_neighbors(board, dist: int) -> dict:
     pts = {}
     size = board.size
     for y in range(size):
@@ -53,20 +157,19 @@ def _neighbors(board, dist: int = 2, depth: int = 2) -> List[Tuple[int, int]]:
                         nx, ny = x + dx, y + dy
                         if 0 <= nx < size and 0 <= ny < size and board.grid[ny][nx] == 0:
                             pts[(nx, ny)] = pts.get((nx, ny), 0) + 1
-    if not pts:
-        center = board.size // 2
-        return [(center, center)]
-    center = board.size // 2
-    items = sorted(pts.items(), key=lambda kv: (-kv[1], abs(kv[0][0] - center) + abs(kv[0][1] - center)))
-    if depth <= 2:
-        max_candidates = 30
-    elif depth == 3:
-        max_candidates = 18
-    elif depth == 4:
-        max_candidates = 10
-    else:
-        max_candidates = 6
-    return [p for p, _ in items[:max_candidates]]
+    return pts
+
+
+WIN_SCORE = 10000
+
+# forced-win search run before the full-width search: VCF, then VCT with what is left.
+# It gets THREAT_TIME_SHARE of a timed search's limit, or THREAT_MS_PER_PLY per ply of a
+# fixed-depth one, with VCF capped at VCF_TIME_MS and VCT at VCT_TIME_MS (0 turns VCT off)
+THREAT_SEARCH = True
+VCF_TIME_MS = 50
+VCT_TIME_MS = 100
+THREAT_TIME_SHARE = 0.1
+THREAT_MS_PER_PLY = 5
 
 
 def _terminal_score(board, player: int) -> Optional[int]:
@@ -74,220 +177,904 @@ def _terminal_score(board, player: int) -> Optional[int]:
         last = board.history[-1]
         winner, _ = board.check_win(last)
         if winner == player:
-            return 10000
+            return WIN_SCORE
         elif winner is not None:
-            return -10000
+            return -WIN_SCORE
     return None
 
 
 def _py_evaluate_board(board, player: int) -> int:
-    # faster byte-based cache key
-    grid_key = _grid_bytes(board)
-    cache_key = (grid_key, player)
-    if cache_key in EVAL_CACHE:
-        return EVAL_CACHE[cache_key]
+    cache_key = _position_key(board)
+    check = _grid_bytes(board) if VERIFY_HASH else None
+    cached = EVAL_CACHE.get(cache_key, player, check)
+    if cached is not None:
+        return cached
 
-    size = board.size
+    # table-driven: precomputed line coordinates, one lookup per 6-cell window
     grid = board.grid
-
-    def iter_lines():
-        # rows
-        for y in range(size):
-            yield grid[y]
-        # cols
-        for x in range(size):
-            col = [grid[y][x] for y in range(size)]
-            yield col
-        # main diagonals
-        for k in range(-size + 1, size):
-            diag = []
-            for y in range(size):
-                x = y - k
-                if 0 <= x < size:
-                    diag.append(grid[y][x])
-            if len(diag) >= 1:
-                yield diag
-        # anti-diagonals
-        for k in range(0, 2 * size - 1):
-            adiag = []
-            for y in range(size):
-                x = k - y
-                if 0 <= x < size:
-                    adiag.append(grid[y][x])
-            if len(adiag) >= 1:
-                yield adiag
-
-    def score_for_player(pval: int) -> int:
-        score = 0
-        p = pval
-        opp = 3 - p
-        for line in iter_lines():
-            if len(line) < 2:
-                continue
-            padded = [0] + list(line) + [0]
-            L = len(padded)
-            # check five-in-row and smaller patterns using sliding windows
-            # five-in-row
-            for i in range(0, L - 4):
-                slice5 = padded[i:i + 5]
-                if all(v == p for v in slice5):
-                    score += 100000
-            # open4: 0 p p p p 0  (length 6 window)
-            for i in range(0, L - 5):
-                s6 = padded[i:i + 6]
-                if s6[0] == 0 and all(v == p for v in s6[1:5]) and s6[5] == 0:
-                    score += 10000
-            # four (closed or not fully open)
-            for i in range(0, L - 4):
-                s5 = padded[i:i + 5]
-                if sum(1 for v in s5 if v == p) == 4 and not all(v == p for v in s5):
-                    score += 1000
-            # open3: 0 p p p 0
-            for i in range(0, L - 4):
-                s5 = padded[i:i + 5]
-                if s5[0] == 0 and s5[4] == 0 and sum(1 for v in s5[1:4] if v == p) == 3:
-                    score += 500
-            # three (not open)
-            for i in range(0, L - 3):
-                s4 = padded[i:i + 4]
-                if sum(1 for v in s4 if v == p) == 3 and not (s4[0] == 0 and s4[-1] == 0):
-                    score += 100
-            # open2
-            for i in range(0, L - 3):
-                s4 = padded[i:i + 4]
-                if s4[0] == 0 and s4[-1] == 0 and sum(1 for v in s4[1:3] if v == p) == 2:
-                    score += 10
-        return score
-
-    my = score_for_player(player)
-    their = score_for_player(3 - player)
+    size = board.size
+    cells = [v for row in grid for v in row]
+    totals = [0, 0, 0]
+    for line in flat_lines(size):
+        s1, s2 = score_line_pair([cells[i] for i in line])
+        totals[1] += s1
+        totals[2] += s2
+    my = totals[player]
+    their = totals[3 - player]
     val = my - their
-    EVAL_CACHE[cache_key] = val
+    EVAL_CACHE.put(cache_key, player, val, check)
     return val
 
 
 def evaluate_board(board, player: int) -> int:
-    # wrapper: use Cython or numba evaluator when available; fall back to Python
-    grid_key = _grid_bytes(board)
-    cache_key = (grid_key, player)
-    if cache_key in EVAL_CACHE:
-        return EVAL_CACHE[cache_key]
-    if CY_EVAL_AVAILABLE and _cy_evaluate_board is not None:
+    # boards that keep per-line pattern scores up to date answer from the running total
+    if hasattr(board, 'pattern_totals'):
+        return board.evaluation(player)
+    # wrapper: use Cython, numba or NumPy evaluator when available; fall back to Python
+    if not (CY_EVAL_AVAILABLE or NUMBA_EVAL_AVAILABLE or NUMPY_EVAL_AVAILABLE):
+        return _py_evaluate_board(board, player)
+    cache_key = _position_key(board)
+    check = _grid_bytes(board) if VERIFY_HASH else None
+    cached = EVAL_CACHE.get(cache_key, player, check)
+    if cached is not None:
+        return cached
+    if CY_EVAL_AVAILABLE:
         val = _cy_evaluate_board(board, player)
-    elif NUMBA_EVAL_AVAILABLE and evaluate_board_numba is not None:
-        # Convert grid to numpy array for numba evaluation
-        import numpy as np
-        grid_array = np.array(board.grid, dtype=np.int32)
-        val = evaluate_board_numba(grid_array, player)
+    elif NUMBA_EVAL_AVAILABLE:
+        val = _numba_evaluate(board, player)
     else:
-        val = _py_evaluate_board(board, player)
-    EVAL_CACHE[cache_key] = val
+        val = _numpy_evaluate(board, player)
+    EVAL_CACHE.put(cache_key, player, val, check)
     return val
 
 
-TT = {}
+def _numpy_evaluate(board, player: int) -> int:
+    return _ai_numpy().evaluate_grid_numpy(board.grid, player)
 
-# killer moves and history heuristic
-KILLERS = {}  # depth -> list of killer moves (mx,my)
-HISTORY = {}  # (player,x,y) -> score
 
+def _numba_evaluate(board, player: int) -> int:
+    import numpy as np
+    return int(_ai_numba().evaluate_board_numba(np.array(board.grid, dtype=np.int32), player))
 
-def minimax(board, depth: int, alpha: int, beta: int, maximizing: bool, player: int) -> Tuple[int, Optional[Tuple[int, int]]]:
-    gb = _grid_bytes(board)
-    key = (gb, depth, maximizing, player)
-    if key in TT:
-        return TT[key]
-    term = _terminal_score(board, player)
-    if term is not None:
-        TT[key] = (term, None)
-        return term, None
-    if depth == 0:
-        val = evaluate_board(board, player)
-        TT[key] = (val, None)
-        return val, None
-    moves = _neighbors(board, depth=depth)
-    if not moves:
-        center = board.size // 2
-        val = evaluate_board(board, player)
-        TT[key] = (val, (center, center))
-        return val, (center, center)
+
+# leaf evaluators an Engine can be pinned to (benchmarks, tournaments); 'auto' is evaluate_board
+EVALUATORS = {'python': _py_evaluate_board}
+if NUMPY_EVAL_AVAILABLE:
+    EVALUATORS['numpy'] = _numpy_evaluate
+if NUMBA_EVAL_AVAILABLE:
+    EVALUATORS['numba'] = _numba_evaluate
+if CY_EVAL_AVAILABLE:
+    EVALUATORS['cython'] = _cy_evaluate_board
+
+
+TT_SIZE_MB = float(os.environ.get('GOMOKU_TT_MB', 16))
+
+# optional on-disk TT (gomoku.ttfile): loaded on the first search, new results appended after each
+TT_FILE = os.environ.get('GOMOKU_TT_FILE')
+TT_FILE_MIN_DEPTH = 2  # shallower results are cheaper to recompute than to store
+
+# side-to-move keys mixed into the position hash for TT lookups (indexed by player)
+_SIDE_KEYS = (0, 0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+
+# iterative deepening: aspiration half-width around the previous iteration's score
+ASPIRATION_WINDOW = 300
+INF = 9999999
+MAX_PLY = 64
+
+
+class SearchTimeout(Exception):
+    """Raised inside negamax when the time budget of a search runs out."""
+
+
+class SearchResult(NamedTuple):
+    move: Optional[Tuple[int, int]]
+    score: int                      # from the searching player's point of view
+    pv: List[Tuple[int, int]]       # principal variation, starting with move
+    depth: int                      # depth of the last completed iteration
+
+
+class SearchStats:
+    """Counters and timings of one search (see Engine.stats and last_search_stats).
+
+    iterations holds (depth, seconds, nodes, score) per completed iteration;
+    cutoffs maps the index of the move that caused a beta cutoff (0 = first
+    move tried) to how often that happened.
+    """
+
+    def __init__(self, source: str = 'search'):
+        self.source = source  # 'search', 'parallel', 'book', 'threats' or 'none'
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.interior_nodes = 0
+        self.moves_searched = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_stores = 0
+        self.tt_cutoffs = 0
+        self.cutoffs = {}
+        self.iterations = []
+        self.elapsed = 0.0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        total = sum(self.cutoffs.values())
+        return self.cutoffs.get(0, 0) / total if total else 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        """Average number of moves searched per interior node."""
+        return self.moves_searched / self.interior_nodes if self.interior_nodes else 0.0
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """Node growth from the second-to-last to the last iteration."""
+        if len(self.iterations) < 2 or not self.iterations[-2][2]:
+            return 0.0
+        return self.iterations[-1][2] / self.iterations[-2][2]
+
+    def merge(self, other: 'SearchStats') -> None:
+        """Add the counters of other (a search run in parallel with this one)."""
+        for name in ('nodes', 'leaf_evals', 'interior_nodes', 'moves_searched', 'tt_probes', 'tt_hits',
+                     'tt_stores', 'tt_cutoffs'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for i, n in other.cutoffs.items():
+            self.cutoffs[i] = self.cutoffs.get(i, 0) + n
+
+    def as_dict(self) -> dict:
+        out = dict(vars(self))
+        out['cutoffs'] = dict(sorted(self.cutoffs.items()))
+        for name in ('nodes_per_sec', 'tt_hit_rate', 'first_move_cutoff_rate', 'branching_factor',
+                     'effective_branching_factor'):
+            out[name] = getattr(self, name)
+        return out
+
+    def summary(self) -> List[str]:
+        """A few human-readable lines (UI overlay, console)."""
+        lines = ['{} nodes in {:.2f}s ({:.0f}/s), {} leaf evals ({})'.format(
+            self.nodes, self.elapsed, self.nodes_per_sec, self.leaf_evals, self.source)]
+        lines.append('TT {} probes, {:.0%} hits, {} cutoffs, {} stores'.format(
+            self.tt_probes, self.tt_hit_rate, self.tt_cutoffs, self.tt_stores))
+        lines.append('beta cutoffs {} ({:.0%} on first move), branching {:.1f} / EBF {:.1f}'.format(
+            sum(self.cutoffs.values()), self.first_move_cutoff_rate, self.branching_factor,
+            self.effective_branching_factor))
+        if self.iterations:
+            lines.append('depths: ' + '  '.join('{}:{:.2f}s'.format(d, t) for d, t, _, _ in self.iterations))
+        return lines
+
+
+def _tt_key(board, to_move: int) -> int:
+    key = _position_key(board)
+    if not isinstance(key, int):
+        key = hash(key) & 0xFFFFFFFFFFFFFFFF
+    return key ^ _SIDE_KEYS[to_move]
+
+
+def _move_score_simple(b, x: int, y: int, p: int) -> int:
     # lightweight local scoring for move ordering (adjacency-based)
-    def move_score_simple(b, x, y, p):
-        s = 0
-        size = b.size
-        for dy in range(-2, 3):
-            for dx in range(-2, 3):
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < size and 0 <= ny < size:
-                    if b.grid[ny][nx] == p:
-                        s += 10
-                    elif b.grid[ny][nx] == 0:
-                        s += 1
-        return s
-
-    scored_moves = []
-    killers_here = KILLERS.get(depth, [])
-    for (mx, my) in moves:
-        sc = move_score_simple(board, mx, my, player if maximizing else (3 - player))
-        hist = HISTORY.get((player, mx, my), 0)
-        killer_bonus = 200000 if (mx, my) in killers_here else 0
-        total = sc + hist + killer_bonus
-        scored_moves.append((total, (mx, my)))
-    scored_moves.sort(key=lambda t: -t[0] if maximizing else t[0])
-    ordered = [m for _, m in scored_moves]
-    best_move = None
-    if maximizing:
-        max_eval = -9999999
-        for (mx, my) in ordered:
-            board.place_move(mx, my, player)
-            val, _ = minimax(board, depth - 1, alpha, beta, False, player)
+    s = 0
+    size = b.size
+    for dy in range(-2, 3):
+        for dx in range(-2, 3):
+            if dx == 0 and dy == 0:
+                continue
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < size and 0 <= ny < size:
+                if b.grid[ny][nx] == p:
+                    s += 10
+                elif b.grid[ny][nx] == 0:
+                    s += 1
+    return s
+
+
+class Engine:
+    """Search state: transposition table, killer moves, history scores, node count.
+
+    The module-level search functions share DEFAULT_ENGINE; parallel workers
+    build their own and share only the best root scores (shared_bounds).
+    """
+
+    def __init__(self, tt_size_mb: Optional[float] = None, evaluator: str = 'auto'):
+        self.tt = TranspositionTable(TT_SIZE_MB if tt_size_mb is None else tt_size_mb, verify=VERIFY_HASH)
+        self.evaluate = evaluate_board if evaluator == 'auto' else EVALUATORS[evaluator]
+        self.killers = {}   # depth -> list of killer moves (mx,my)
+        self.history = {}   # (player,x,y) -> score
+        self.nodes = 0
+        self.deadline = None  # time.perf_counter() value during time-limited searches
+        self.cancel = None  # threading.Event; once set the search stops like on a timeout
+        self.root_moves = None  # restricts the moves tried at ply 0 (parallel root splitting)
+        self.shared_bounds = None  # best root score per depth, shared by the workers splitting the root
+        self.iterations = []  # SearchResult of every completed iteration of the last search
+        self.stats = SearchStats()  # counters of the last search
+        self.tt_file = None  # TTFile the table is loaded from and saved to
+        self._tt_file_loaded = False
+        self._pv = [[] for _ in range(MAX_PLY + 1)]  # triangular PV table, one line per ply
+
+    def reset(self) -> None:
+        self.tt.clear()
+        self.killers.clear()
+        self.history.clear()
+        self._tt_file_loaded = False
+
+    def use_tt_file(self, path: Optional[str]) -> None:
+        """Keep search results in the file at path across sessions (None to stop)."""
+        self.tt_file = TTFile(path) if path else None
+        self._tt_file_loaded = False
+
+    def _load_tt_file(self) -> None:
+        # stored under the previous generation, so this search's results may replace them
+        self._tt_file_loaded = True
+        if VERIFY_HASH:
+            return  # the file keeps no positions to verify against
+        for key, (score, depth, flag, move) in self.tt_file.load().items():
+            self.tt.store(key, depth, score, flag, move)
+
+    def _save_tt_file(self) -> None:
+        self.tt_file.append(self.tt.entries(self.tt.generation, TT_FILE_MIN_DEPTH))
+
+    def order_moves(self, board, moves, depth: int, to_move: int, hash_move) -> List[Tuple[int, int]]:
+        scored_moves = []
+        killers_here = self.killers.get(depth, [])
+        history = self.history
+        for (mx, my) in moves:
+            if (mx, my) == hash_move:
+                continue
+            sc = _move_score_simple(board, mx, my, to_move)
+            hist = history.get((to_move, mx, my), 0)
+            killer_bonus = 200000 if (mx, my) in killers_here else 0
+            scored_moves.append((sc + hist + killer_bonus, (mx, my)))
+        scored_moves.sort(key=lambda t: -t[0])
+        ordered = [m for _, m in scored_moves]
+        # the hash move from the TT is tried first, even if move generation cut it
+        if hash_move is not None and board.is_valid_move(*hash_move):
+            ordered.insert(0, hash_move)
+        return ordered
+
+    def negamax(self, board, depth: int, alpha: int, beta: int, to_move: int, ply: int = 0) -> Tuple[int, Optional[Tuple[int, int]]]:
+        """Principal Variation Search; the score is from to_move's point of view.
+
+        The first (hash) move gets the full window, the rest a null window and a
+        re-search only if they beat alpha. The principal variation from this node
+        is left in self._pv[ply].
+        """
+        self.nodes += 1
+        if not self.nodes & 255:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchTimeout()
+        pv_table = self._pv
+        pv_table[ply] = []
+        tt = self.tt
+        size = board.size
+        key = 0
+        check = None
+        hash_move = None
+        alpha_orig, beta_orig = alpha, beta
+        if depth > 0:
+            key = _tt_key(board, to_move)
+            if VERIFY_HASH:
+                check = _grid_bytes(board)
+            entry = tt.probe(key, check)
+            if entry is not None:
+                t_score, t_depth, t_flag, t_move = entry
+                if t_move != NO_MOVE:
+                    hash_move = (t_move % size, t_move // size)
+                if t_depth >= depth and ply > 0:
+                    if t_flag == EXACT:
+                        self.stats.tt_cutoffs += 1
+                        return t_score, hash_move
+                    if t_flag == LOWER:
+                        alpha = max(alpha, t_score)
+                    else:
+                        beta = min(beta, t_score)
+                    if alpha >= beta:
+                        self.stats.tt_cutoffs += 1
+                        return t_score, hash_move
+        term = _terminal_score(board, to_move)
+        if term is not None:
+            if depth > 0:
+                tt.store(key, depth, term, EXACT, NO_MOVE, check)
+            return term, None
+        if depth == 0 or ply >= MAX_PLY:
+            # leaf evaluation is a running total on Board; not worth a TT slot
+            self.stats.leaf_evals += 1
+            return self.evaluate(board, to_move), None
+        if ply == 0 and self.root_moves is not None:
+            moves = self.root_moves
+            if hash_move not in moves:
+                hash_move = None
+        else:
+            moves = _neighbors(board, depth=depth)
+        if not moves:
+            center = board.size // 2
+            val = self.evaluate(board, to_move)
+            tt.store(key, depth, val, EXACT, center * size + center, check)
+            return val, (center, center)
+        ordered = self.order_moves(board, moves, depth, to_move, hash_move)
+        opp = 3 - to_move
+        best = -INF
+        best_move = None
+        stats = self.stats
+        stats.interior_nodes += 1
+        bounds = self.shared_bounds if ply == 0 else None
+        for i, (mx, my) in enumerate(ordered):
+            if bounds is not None and depth < len(bounds) and alpha < bounds[depth] - 1 < beta:
+                # another worker's share already scored this; only better or equal moves matter
+                alpha = alpha_orig = bounds[depth] - 1
+            board.place_move(mx, my, to_move)
+            if i == 0:
+                val = -self.negamax(board, depth - 1, -beta, -alpha, opp, ply + 1)[0]
+            else:
+                val = -self.negamax(board, depth - 1, -alpha - 1, -alpha, opp, ply + 1)[0]
+                if alpha < val < beta:
+                    val = -self.negamax(board, depth - 1, -beta, -alpha, opp, ply + 1)[0]
             board.undo()
-            if val > max_eval:
-                max_eval = val
+            if val > best:
+                best = val
                 best_move = (mx, my)
-            alpha = max(alpha, val)
-            if beta <= alpha:
+            if val > alpha:
+                alpha = val
+                pv_table[ply] = [(mx, my)] + pv_table[ply + 1]
+                if bounds is not None and depth < len(bounds) and val > bounds[depth]:
+                    bounds[depth] = val
+            if alpha >= beta:
+                stats.cutoffs[i] = stats.cutoffs.get(i, 0) + 1
                 # record killer move and history increment for this move
                 kd = depth - 1
-                KILLERS.setdefault(kd, [])
-                if (mx, my) not in KILLERS[kd]:
-                    KILLERS[kd].insert(0, (mx, my))
-                    KILLERS[kd] = KILLERS[kd][:2]
-                HISTORY[(player, mx, my)] = HISTORY.get((player, mx, my), 0) + (1 << depth)
+                killers = self.killers.setdefault(kd, [])
+                if (mx, my) not in killers:
+                    killers.insert(0, (mx, my))
+                    del killers[2:]
+                self.history[(to_move, mx, my)] = self.history.get((to_move, mx, my), 0) + (1 << depth)
                 break
-        TT[key] = (max_eval, best_move)
-        return max_eval, best_move
-    else:
-        min_eval = 9999999
-        for (mx, my) in ordered:
-            board.place_move(mx, my, 3 - player)
-            val, _ = minimax(board, depth - 1, alpha, beta, True, player)
-            board.undo()
-            if val < min_eval:
-                min_eval = val
-                best_move = (mx, my)
-            beta = min(beta, val)
-            if beta <= alpha:
-                # record killer move and history increment for this move (opponent perspective)
-                kd = depth - 1
-                KILLERS.setdefault(kd, [])
-                if (mx, my) not in KILLERS[kd]:
-                    KILLERS[kd].insert(0, (mx, my))
-                    KILLERS[kd] = KILLERS[kd][:2]
-                HISTORY[(3 - player, mx, my)] = HISTORY.get((3 - player, mx, my), 0) + (1 << depth)
+        stats.moves_searched += i + 1
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, best, flag, best_move[1] * size + best_move[0], check)
+        return best, best_move
+
+    def extend_pv(self, board, pv: List[Tuple[int, int]], player: int, depth: int) -> List[Tuple[int, int]]:
+        # the PV stops at TT cutoffs; continue it from the hash moves stored there
+        pv = list(pv)
+        made = 0
+        to_move = player
+        for (mx, my) in pv:
+            if not board.place_move(mx, my, to_move):
+                break
+            made += 1
+            to_move = 3 - to_move
+        while len(pv) < depth and _terminal_score(board, to_move) is None:
+            entry = self.tt.probe(_tt_key(board, to_move), _grid_bytes(board) if VERIFY_HASH else None)
+            if entry is None or entry[3] == NO_MOVE:
                 break
-        TT[key] = (min_eval, best_move)
-        return min_eval, best_move
+            mv = (entry[3] % board.size, entry[3] // board.size)
+            if not board.place_move(mv[0], mv[1], to_move):
+                break
+            pv.append(mv)
+            made += 1
+            to_move = 3 - to_move
+        for _ in range(made):
+            board.undo()
+        return pv
+
+    def search_root(self, board, player: int, depth: int, alpha: int = -INF, beta: int = INF) -> Tuple[int, Optional[Tuple[int, int]], List[Tuple[int, int]]]:
+        val, mv = self.negamax(board, depth, alpha, beta, player)
+        pv = self._pv[0]
+        if mv is not None and (not pv or pv[0] != mv):
+            pv = [mv]
+        return val, mv, pv
+
+    def iterative_deepening(self, board, player: int, time_limit_ms: int, max_depth: int) -> SearchResult:
+        start = time.perf_counter()
+        budget = time_limit_ms / 1000.0
+        result = SearchResult(None, 0, [], 0)
+        try:
+            for d in range(1, max_depth + 1):
+                # the first iteration always completes so there is a move to return
+                self.deadline = start + budget if result.move is not None else None
+                if result.move is None:
+                    alpha, beta = -INF, INF
+                else:
+                    alpha, beta = result.score - ASPIRATION_WINDOW, result.score + ASPIRATION_WINDOW
+                it_start, it_nodes = time.perf_counter(), self.nodes
+                val, mv, pv = self.search_root(board, player, d, alpha, beta)
+                if val <= alpha or val >= beta:
+                    # outside the aspiration window: re-search with a full window
+                    val, mv, pv = self.search_root(board, player, d)
+                result = SearchResult(mv, val, pv, d)
+                self.iterations.append(result)
+                self.stats.iterations.append((d, time.perf_counter() - it_start, self.nodes - it_nodes, val))
+                # the next iteration costs several times this one; don't start what can't finish
+                if time.perf_counter() - start > budget / 2:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return result
+
+    def search(self, board, player: int, depth: int = 2, time_limit_ms: Optional[int] = None,
+               max_depth: int = 20, cancel=None) -> SearchResult:
+        """Full-width search for player; the board is left as it was found.
+
+        Setting the cancel event stops the search; a fixed-depth search then
+        returns no move, a timed one its last completed iteration.
+        """
+        if self.tt_file is not None:
+            if self.tt_file.size != board.size:
+                # the file is kept per board size; switching size starts it afresh
+                self.tt_file = TTFile(self.tt_file.path, board.size)
+                self._tt_file_loaded = False
+            if not self._tt_file_loaded:
+                self._load_tt_file()
+        self.tt.new_search()
+        self.iterations = []
+        self.cancel = cancel
+        stats = self.stats = SearchStats()
+        tt = self.tt
+        counters = (self.nodes, tt.probes, tt.hits, tt.stores)
+        start = time.perf_counter()
+        n_history = len(board.history)
+        redo = list(board._redo_stack)
+        try:
+            if time_limit_ms is None:
+                try:
+                    val, mv, pv = self.search_root(board, player, depth)
+                except SearchTimeout:
+                    val, mv, pv = 0, None, []
+                result = SearchResult(mv, val, pv, depth)
+                if mv is not None:
+                    self.iterations.append(result)
+                    stats.iterations.append((depth, time.perf_counter() - start, self.nodes - counters[0], val))
+            else:
+                result = self.iterative_deepening(board, player, time_limit_ms, max_depth)
+        finally:
+            self.cancel = None
+            # an aborted iteration leaves its moves on the board; take them back
+            while len(board.history) > n_history:
+                board.undo()
+            board._redo_stack[:] = redo
+        if result.move is not None:
+            result = result._replace(pv=self.extend_pv(board, result.pv, player, result.depth))
+            board._redo_stack[:] = redo
+            # parallel searches merge iterations, so the last one carries the extended pv too
+            self.iterations[-1] = result
+        if self.tt_file is not None:
+            self._save_tt_file()
+        stats.elapsed = time.perf_counter() - start
+        stats.nodes, stats.tt_probes, stats.tt_hits, stats.tt_stores = (now - then for now, then in zip(
+            (self.nodes, tt.probes, tt.hits, tt.stores), counters))
+        return result
+
+
+class NativeEngine:
+    """Engine interface over a compiled search core (SEARCH_CORES).
+
+    The whole search of a move runs in one call on the core's own board,
+    with the same move generation, ordering and pruning as Engine, so both
+    find the same moves and scores. The core owns the transposition table
+    and its counters, so tt is the core itself. root_moves and
+    shared_bounds split the root as on Engine; the on-disk table and hash
+    verification stay with Engine.
+    """
+
+    def __init__(self, core: str = 'cython', tt_size_mb: Optional[float] = None):
+        self.core = core
+        self.tt = SEARCH_CORES[core](TT_SIZE_MB if tt_size_mb is None else tt_size_mb)
+        self.nodes = 0
+        self.root_moves = None
+        self.shared_bounds = None
+        self.iterations = []
+        self.stats = SearchStats()
+
+    def reset(self) -> None:
+        self.tt.clear()
 
+    def search(self, board, player: int, depth: int = 2, time_limit_ms: Optional[int] = None,
+               max_depth: int = 20, cancel=None) -> SearchResult:
+        """Same contract as Engine.search."""
+        core = self.tt
+        size = board.size
+        names = ('nodes', 'leaf_evals', 'interior_nodes', 'moves_searched', 'probes', 'hits', 'stores', 'tt_cutoffs')
+        before = [getattr(core, n) for n in names]
+        cut_before = core.cutoffs()
+        core.new_search()
+        start = time.perf_counter()
+        root_moves = None if self.root_moves is None else [y * size + x for x, y in self.root_moves]
+        move, score, pv, done, iterations = core.search(board, player, depth, time_limit_ms, max_depth, cancel,
+                                                        root_moves, self.shared_bounds)
+        stats = self.stats = SearchStats()
+        stats.elapsed = time.perf_counter() - start
+        (stats.nodes, stats.leaf_evals, stats.interior_nodes, stats.moves_searched, stats.tt_probes,
+         stats.tt_hits, stats.tt_stores, stats.tt_cutoffs) = (getattr(core, n) - b for n, b in zip(names, before))
+        stats.cutoffs = {i: n - cut_before.get(i, 0) for i, n in core.cutoffs().items() if n > cut_before.get(i, 0)}
+        stats.iterations = [it[:4] for it in iterations]
+        self.nodes += stats.nodes
+        self.iterations = [SearchResult((m % size, m // size), sc, [(m % size, m // size)], d)
+                           for d, _, _, sc, m in iterations]
+        if move < 0:
+            return SearchResult(None, 0, [], depth)
+        result = SearchResult((move % size, move // size), score, [(m % size, m // size) for m in pv], done)
+        self.iterations[-1] = result
+        return result
 
-def choose_move_minimax(board, player: int, depth: int = 2) -> Optional[Tuple[int, int]]:
-    term = _terminal_score(board, player)
-    if term is not None:
+
+# compiled search cores NativeEngine can run on
+SEARCH_CORES = {}
+if CySearch is not None:
+    SEARCH_CORES['cython'] = CySearch
+if NUMBA_EVAL_AVAILABLE:
+    SEARCH_CORES['numba'] = lambda size_mb=16: _ai_numba().NumbaSearch(size_mb)
+
+# search core the module-level functions use instead of DEFAULT_ENGINE: the Cython
+# core when it is built, else 'python'; GOMOKU_SEARCH_CORE picks one explicitly
+SEARCH_CORE = os.environ.get('GOMOKU_SEARCH_CORE', 'cython' if 'cython' in SEARCH_CORES else 'python')
+# board sizes the compiled cores are built for
+NATIVE_MIN_SIZE, NATIVE_MAX_SIZE = 5, 19
+_NATIVE_ENGINE = None
+
+
+def _native_core(board) -> Optional[str]:
+    # features only Engine has (the on-disk table, hash verification) keep searches on it
+    if (SEARCH_CORE not in SEARCH_CORES or TT_FILE or VERIFY_HASH
+            or not NATIVE_MIN_SIZE <= board.size <= NATIVE_MAX_SIZE):
         return None
-    _, move = minimax(board, depth, -9999999, 9999999, True, player)
-    if move is None:
-        return choose_move_random(board)
+    return SEARCH_CORE
+
+
+def _default_engine(board):
+    global _NATIVE_ENGINE
+    if _native_core(board) is None:
+        return DEFAULT_ENGINE
+    if _NATIVE_ENGINE is None or _NATIVE_ENGINE.core != SEARCH_CORE:
+        _NATIVE_ENGINE = NativeEngine(SEARCH_CORE)
+    return _NATIVE_ENGINE
+
+
+DEFAULT_ENGINE = Engine()
+DEFAULT_ENGINE.use_tt_file(TT_FILE)
+# the default engine's state under its old module-level names
+TT = DEFAULT_ENGINE.tt
+KILLERS = DEFAULT_ENGINE.killers
+HISTORY = DEFAULT_ENGINE.history
+
+
+def resize_tt(size_mb: float) -> None:
+    """Replace the transposition table with an empty one of size_mb megabytes."""
+    global TT, TT_SIZE_MB
+    TT_SIZE_MB = size_mb
+    TT = DEFAULT_ENGINE.tt = TranspositionTable(size_mb, verify=VERIFY_HASH)
+    DEFAULT_ENGINE._tt_file_loaded = False
+
+
+def use_tt_file(path: Optional[str]) -> None:
+    """Persist the default engine's search results in path (None switches it off)."""
+    global TT_FILE
+    TT_FILE = path
+    DEFAULT_ENGINE.use_tt_file(path)
+
+
+def negamax(board, depth: int, alpha: int, beta: int, to_move: int, ply: int = 0) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """Engine.negamax on the default engine."""
+    return DEFAULT_ENGINE.negamax(board, depth, alpha, beta, to_move, ply)
+
+
+def minimax(board, depth: int, alpha: int, beta: int, maximizing: bool, player: int) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """Score from player's point of view (kept for callers of the old two-sided search)."""
+    if maximizing:
+        return negamax(board, depth, alpha, beta, player)
+    val, mv = negamax(board, depth, -beta, -alpha, 3 - player)
+    return -val, mv
+
+
+# parallel root search: a lazily started process pool, kept between moves, with the
+# event that cancels its running searches and the best root score per depth they share
+_POOL = None
+_POOL_WORKERS = 0
+_POOL_CANCEL = None
+_POOL_BOUNDS = None
+
+
+def _worker_pool(workers: int):
+    global _POOL, _POOL_WORKERS, _POOL_CANCEL, _POOL_BOUNDS
+    if _POOL is None or _POOL_WORKERS != workers:
+        shutdown_workers()
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _POOL_CANCEL = multiprocessing.Event()
+        _POOL_BOUNDS = multiprocessing.RawArray('i', MAX_PLY + 1)
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(_POOL_CANCEL, _POOL_BOUNDS))
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def shutdown_workers() -> None:
+    """Stop the worker processes of parallel searches (restarted on demand)."""
+    global _POOL, _POOL_WORKERS, _POOL_CANCEL, _POOL_BOUNDS
+    if _POOL is not None:
+        _POOL_CANCEL.set()
+        _POOL.shutdown(wait=True, cancel_futures=True)
+    _POOL = None
+    _POOL_WORKERS = 0
+    _POOL_CANCEL = _POOL_BOUNDS = None
+
+
+atexit.register(shutdown_workers)
+
+
+# a worker process's ((TT size, core), engine): its table, killers and history carry over
+# between moves; the pool's cancel event and shared bounds, set up when the process starts
+_WORKER_ENGINE = None
+_WORKER_CANCEL = None
+_WORKER_BOUNDS = None
+
+
+def _init_worker(cancel, bounds) -> None:
+    global _WORKER_CANCEL, _WORKER_BOUNDS
+    _WORKER_CANCEL = cancel
+    _WORKER_BOUNDS = bounds
+
+
+def _search_root_moves(board_cls, size: int, history, player: int, root_moves, depth: int,
+                       time_limit_ms: Optional[int], max_depth: int, tt_size_mb: float,
+                       core: Optional[str] = None) -> Tuple[List[SearchResult], SearchStats]:
+    # runs in a worker process: own board, the process's engine on core (Engine when None),
+    # only root_moves tried at the root
+    global _WORKER_ENGINE
+    board = board_cls(size)
+    board.load_history(history)
+    if _WORKER_ENGINE is None or _WORKER_ENGINE[0] != (tt_size_mb, core):
+        engine = Engine(tt_size_mb) if core is None else NativeEngine(core, tt_size_mb)
+        _WORKER_ENGINE = ((tt_size_mb, core), engine)
+    engine = _WORKER_ENGINE[1]
+    engine.root_moves = root_moves
+    engine.shared_bounds = _WORKER_BOUNDS
+    engine.search(board, player, depth, time_limit_ms, max_depth, _WORKER_CANCEL)
+    return engine.iterations, engine.stats
+
+
+def _wait_workers(futures, cancel) -> bool:
+    # False once cancel is set; running workers stop at their next check, so the pool is free again
+    from concurrent.futures import wait
+    if cancel is None:
+        wait(futures)
+        return True
+    while wait(futures, timeout=0.05).not_done:
+        if cancel.is_set():
+            _POOL_CANCEL.set()
+            for f in futures:
+                f.cancel()
+            wait(futures)
+            return False
+    return not cancel.is_set()
+
+
+def _parallel_search(board, player: int, depth: int, time_limit_ms: Optional[int], max_depth: int,
+                     workers: int, cancel=None) -> SearchResult:
+    """Split the root moves round-robin over worker processes and merge their results.
+
+    Workers run the native search core when the serial search would. Each
+    publishes its best root score per depth, and the others search their
+    remaining moves only for one at least as good: a worker's best score is
+    exact when it ties or beats every other share, and lower otherwise. A
+    fixed-depth search scores the move ordered first on its own before the
+    rest are split, so every share starts with a bound to beat. Results are compared at the deepest iteration every worker completed;
+    equal scores go to the move ordered first, so the same iterations always
+    give the same answer.
+    """
+    root_depth = depth if time_limit_ms is None else 2
+    moves = DEFAULT_ENGINE.order_moves(board, _neighbors(board, depth=root_depth), root_depth, player, None)
+    lead = 1 if time_limit_ms is None else 0
+    shares = [moves[:lead]] if lead else []
+    shares += [moves[lead + k::workers] for k in range(min(workers, len(moves) - lead))]
+    if len(shares) < 2:
+        return _default_engine(board).search(board, player, depth, time_limit_ms, max_depth, cancel)
+    global _LAST_STATS
+    stats = _LAST_STATS = SearchStats('parallel')
+    start = time.perf_counter()
+    pool = _worker_pool(workers)
+    # no search is running between calls, so the shared state can be reset
+    _POOL_CANCEL.clear()
+    _POOL_BOUNDS[:] = [-INF] * len(_POOL_BOUNDS)
+    args = (type(board), board.size, list(board.history), player)
+    rest = (depth, time_limit_ms, max_depth, TT_SIZE_MB, _native_core(board))
+    futures = [pool.submit(_search_root_moves, *args, shares[0], *rest)]
+    if lead and not _wait_workers(futures, cancel):
+        return SearchResult(None, 0, [], 0)
+    futures += [pool.submit(_search_root_moves, *args, share, *rest) for share in shares[1:]]
+    if not _wait_workers(futures, cancel):
+        return SearchResult(None, 0, [], 0)
+    per_worker = []
+    for f in futures:
+        its, worker_stats = f.result()
+        if its:  # a worker stopped before its first iteration has nothing to offer
+            per_worker.append(its)
+        stats.merge(worker_stats)
+    stats.elapsed = time.perf_counter() - start
+    if not per_worker:
+        return SearchResult(None, 0, [], 0)
+    common = min(its[-1].depth for its in per_worker)
+    rank = {m: i for i, m in enumerate(moves)}
+    best = None
+    for its in per_worker:
+        res = next(r for r in its if r.depth == common)
+        if best is None or res.score > best.score or (res.score == best.score and rank[res.move] < rank[best.move]):
+            best = res
+    return best
+
+
+# opening book consulted before any search; GOMOKU_BOOK names a book file opened on first use
+BOOK_PATH = os.environ.get('GOMOKU_BOOK')
+BOOK = None
+
+
+def load_book(path: Optional[str]) -> None:
+    """Use the opening book at path (None switches the book off)."""
+    global BOOK, BOOK_PATH
+    if BOOK is not None:
+        BOOK.close()
+    BOOK_PATH = path
+    BOOK = OpeningBook(path) if path else None
+
+
+def _book_move(board) -> Optional[Tuple[int, int]]:
+    if BOOK is None and BOOK_PATH:
+        try:
+            load_book(BOOK_PATH)
+        except (OSError, ValueError):
+            load_book(None)
+    if BOOK is None:
+        return None
+    return BOOK.choose(board)
+
+
+def _threat_search(board, player: int, depth: int, time_limit_ms: Optional[int] = None,
+                   cancel=None) -> Optional[List[Tuple[int, int]]]:
+    # forcing lines (fours, then fours and open threes) are far cheaper than full-width search
+    if time_limit_ms is None:
+        budget = THREAT_MS_PER_PLY * depth
+    else:
+        budget = time_limit_ms * THREAT_TIME_SHARE
+    start = time.perf_counter()
+    line = threats.find_vcf(board, player, time_limit_ms=min(VCF_TIME_MS, budget), cancel=cancel)
+    left = min(VCT_TIME_MS, budget - (time.perf_counter() - start) * 1000)
+    if line is None and left > 0:
+        line = threats.find_vct(board, player, time_limit_ms=left, cancel=cancel)
+    return line
+
+
+_LAST_STATS = SearchStats('none')
+
+# gomoku.profiling.SearchProfiler wrapped around every search_position call when set
+PROFILER = None
+
+
+def last_search_stats() -> SearchStats:
+    """SearchStats of the most recent search_position / choose_move_minimax call."""
+    return _LAST_STATS
+
+
+def search_position(board, player: int, depth: int = 2, time_limit_ms: Optional[int] = None,
+                    max_depth: int = 20, workers: int = 1, cancel=None, engine: Optional[Engine] = None) -> SearchResult:
+    """Search for player and return move, score and principal variation.
+
+    A book move (gomoku.book) comes back with depth 0 and no search, as does
+    a forced win found by the threat-space solver (gomoku.threats), with the
+    forcing line as pv. With time_limit_ms the search deepens iteratively
+    from depth 1 to max_depth and reports the last completed iteration when
+    the budget runs out (depth is then ignored); otherwise it searches to
+    depth.
+    With workers > 1 the root moves are shared out over that many processes.
+    cancel is an optional threading.Event that aborts the search once set,
+    engine the Engine (or NativeEngine) to search with instead of the
+    default one: a NativeEngine on SEARCH_CORE when that core is available
+    and the board fits it, else DEFAULT_ENGINE (always DEFAULT_ENGINE with a
+    TT file or hash verification on).
+    """
+    if PROFILER is not None:
+        with PROFILER.profile('move{:03d}_p{}'.format(len(board.history) + 1, player)):
+            return _search_position(board, player, depth, time_limit_ms, max_depth, workers, cancel, engine)
+    return _search_position(board, player, depth, time_limit_ms, max_depth, workers, cancel, engine)
+
+
+def _search_position(board, player: int, depth: int, time_limit_ms: Optional[int], max_depth: int,
+                     workers: int, cancel, engine: Optional[Engine]) -> SearchResult:
+    global _LAST_STATS
+    _LAST_STATS = SearchStats('none')
+    if _terminal_score(board, player) is not None:
+        return SearchResult(None, 0, [], 0)
+    start = time.perf_counter()
+    mv = _book_move(board)
+    if mv is not None:
+        _LAST_STATS = SearchStats('book')
+        _LAST_STATS.elapsed = time.perf_counter() - start
+        return SearchResult(mv, 0, [mv], 0)
+    if THREAT_SEARCH:
+        line = _threat_search(board, player, depth, time_limit_ms, cancel)
+        if line:
+            _LAST_STATS = SearchStats('threats')
+            _LAST_STATS.elapsed = time.perf_counter() - start
+            return SearchResult(line[0], WIN_SCORE, line, 0)
+        if time_limit_ms is not None:
+            # the main search gets what the book and threat searches left
+            time_limit_ms = max(1, time_limit_ms - int((time.perf_counter() - start) * 1000))
+    if workers > 1:
+        return _parallel_search(board, player, depth, time_limit_ms, max_depth, workers, cancel)
+    engine = engine or _default_engine(board)
+    result = engine.search(board, player, depth, time_limit_ms, max_depth, cancel)
+    _LAST_STATS = engine.stats
+    return result
+
+
+def choose_move_minimax(board, player: int, depth: int = 2, time_limit_ms: Optional[int] = None,
+                        max_depth: int = 20, workers: int = 1, cancel=None, with_stats: bool = False):
+    """Best move for player (see search_position for the search options).
+
+    With with_stats the result is a (move, SearchStats) pair.
+    """
+    global _LAST_STATS
+    if _terminal_score(board, player) is not None:
+        _LAST_STATS = SearchStats('none')
+        move = None
+    else:
+        move = search_position(board, player, depth, time_limit_ms, max_depth, workers, cancel).move
+        if cancel is not None and cancel.is_set():
+            move = None
+        elif move is None:
+            move = choose_move_random(board)
+    if with_stats:
+        return move, _LAST_STATS
     return move
 
+
+def warmup(sizes: Sequence[int] = (15,), log=None) -> Dict[str, float]:
+    """Do the one-off work of the first search ahead of time; returns seconds per step.
+
+    Builds the line, hash and move-generation tables for each board size,
+    opens the opening book, imports the optional NumPy/numba backends and
+    runs their JIT-compiled functions once (numba keeps the machine code in
+    its on-disk cache, so later processes only load it) and prepares the
+    Cython core. log(step, seconds) is called after every step.
+    """
+    from .game import Board, neighbor_cells, zobrist_keys
+    from .patterns import cell_lines, line_index_array, pattern_table_array
+    steps = {}
+
+    def step(name, fn) -> None:
+        start = time.perf_counter()
+        fn()
+        steps[name] = steps.get(name, 0.0) + time.perf_counter() - start
+        if log is not None:
+            log(name, steps[name])
+
+    def tables(size: int) -> None:
+        flat_lines(size), cell_lines(size), zobrist_keys(size), neighbor_cells(size), _cell_order(size)
+        if NUMPY_EVAL_AVAILABLE:
+            line_index_array(size), pattern_table_array()
+
+    step('book', lambda: _book_move(Board(15)))
+    for size in sizes:
+        b = Board(size)
+        c = size // 2
+        b.load_history([(c, c, 1), (c + 1, c, 2), (c, c + 1, 1)])
+        step('tables', lambda: tables(size))
+        if NUMPY_EVAL_AVAILABLE:
+            step('numpy', lambda: _numpy_evaluate(b, 1))
+        if NUMBA_EVAL_AVAILABLE:
+            step('numba', lambda: (_numba_evaluate(b, 1), NativeEngine('numba', 1).search(b, 2, 2)))
+        if CY_EVAL_AVAILABLE:
+            step('cython', lambda: (_cy_evaluate_board(b, 1), NativeEngine('cython', 1).search(b, 2, 2)))
+    return steps
@@ -0,0 +1,614 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True, initializedcheck=False
+"""
+Optional Cython core: typed board, pattern evaluator and alpha-beta search.
+
+Build with `python setup_cython.py build_ext --inplace` (see
+README_ACCELERATE.md). gomoku.ai picks the module up when it imports:
+
+- evaluate_board(board, player) gives exactly the values of the Python
+  evaluator, from the same pattern tables (gomoku.patterns) looked up over
+  C arrays;
+- CySearch runs a whole search in compiled code on its own C board, with
+  incremental per-line pattern scores, Zobrist hashing, a two-tier
+  transposition table, killer and history move ordering and principal
+  variation search, mirroring ai.Engine.negamax. ai.NativeEngine wraps it
+  behind the Engine interface.
+
+Boards up to MAX_SIZE x MAX_SIZE are supported.
+"""
+import array
+import time
+
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport malloc, free, qsort
+from libc.string cimport memset
+
+from .patterns import PATTERN_TABLES, flat_lines
+from .game import zobrist_keys
+
+cdef enum:
+    MAX_SIZE = 19
+    MAX_CELLS = MAX_SIZE * MAX_SIZE
+    MAX_LINES = 6 * MAX_SIZE - 2
+    ROW = MAX_SIZE + 4          # pad, line cells, pad, OFF up to the full width
+    PAD_CELL = MAX_CELLS        # always 0
+    OFF_CELL = MAX_CELLS + 1    # always OFF
+    N_NEIGHBORS = 24            # the 5x5 box around a cell
+    MAX_PLY = 64
+    MAX_MOVES = 32              # generated moves plus the hash move
+    CHECK_EVERY = 255           # nodes between deadline / cancel checks
+
+cdef enum:
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+cdef int WIN_SCORE = 10000
+cdef int INF = 9999999
+cdef int ASPIRATION_WINDOW = 300
+cdef int KILLER_BONUS = 200000
+cdef int[:] _NO_BOUNDS = array.array('i')
+cdef uint64_t SIDE_KEYS[3]
+SIDE_KEYS[0] = 0
+SIDE_KEYS[1] = 0x9E3779B97F4A7C15
+SIDE_KEYS[2] = 0xC2B2AE3D27D4EB4F
+
+cdef int TABLE1[4096]
+cdef int TABLE2[4096]
+for _code in range(4096):
+    TABLE1[_code] = PATTERN_TABLES[1][_code]
+    TABLE2[_code] = PATTERN_TABLES[2][_code]
+
+
+cdef class _Geometry:
+    """Line, neighbour and hash tables of one board size."""
+    cdef int size, n, n_lines, width
+    cdef short lines[MAX_LINES][ROW]
+    cdef unsigned char cell_lines[MAX_CELLS][4]
+    cdef short neighbors[MAX_CELLS][N_NEIGHBORS]
+    cdef unsigned char n_neighbors[MAX_CELLS]
+    cdef int order[MAX_CELLS]   # (distance to centre << 10) | index
+    cdef uint64_t zobrist[MAX_CELLS][3]
+
+    def __init__(self, int size):
+        cdef int i, k, x, y, nx, ny, center
+        if not 5 <= size <= MAX_SIZE:
+            raise ValueError('board size must be between 5 and {}'.format(MAX_SIZE))
+        self.size = size
+        self.n = size * size
+        self.width = size + 4
+        lines = flat_lines(size)
+        self.n_lines = len(lines)
+        for i, line in enumerate(lines):
+            self.lines[i][0] = PAD_CELL
+            for k in range(1, ROW):
+                self.lines[i][k] = OFF_CELL
+            for k, cell in enumerate(line):
+                self.lines[i][k + 1] = cell
+                self.cell_lines[cell][0 if i < size else 1 if i < 2 * size else 2 if i < 4 * size - 1 else 3] = i
+            self.lines[i][len(line) + 1] = PAD_CELL
+        keys = zobrist_keys(size)
+        center = size // 2
+        for i in range(self.n):
+            x, y = i % size, i // size
+            self.order[i] = ((abs(x - center) + abs(y - center)) << 10) | i
+            self.zobrist[i][0] = 0
+            self.zobrist[i][1] = keys[i * 3 + 1]
+            self.zobrist[i][2] = keys[i * 3 + 2]
+            k = 0
+            for ny in range(max(0, y - 2), min(size, y + 3)):
+                for nx in range(max(0, x - 2), min(size, x + 3)):
+                    if nx != x or ny != y:
+                        self.neighbors[i][k] = ny * size + nx
+                        k += 1
+            self.n_neighbors[i] = k
+
+
+_GEOMETRIES = {}
+
+
+cdef _Geometry _geometry(int size):
+    g = _GEOMETRIES.get(size)
+    if g is None:
+        g = _GEOMETRIES[size] = _Geometry(size)
+    return g
+
+
+cdef inline void _score_line(const signed char* cells, const short* row, int width, int* s1, int* s2) noexcept nogil:
+    # slide a 6-cell base-4 window along the row; one table lookup per player and window
+    cdef int code = 0, k, a = 0, b = 0
+    for k in range(5):
+        code = (code << 2) | cells[row[k]]
+    for k in range(5, width):
+        code = ((code << 2) | cells[row[k]]) & 4095
+        a += TABLE1[code]
+        b += TABLE2[code]
+    s1[0] = a
+    s2[0] = b
+
+
+cdef void _load_cells(signed char* cells, board, int size) except *:
+    cdef int x, y
+    memset(cells, 0, MAX_CELLS + 2)
+    cells[OFF_CELL] = 3
+    flat = getattr(board, '_cells', None)
+    if flat is not None:
+        for x in range(size * size):
+            cells[x] = flat[x]
+        return
+    grid = board.grid
+    for y in range(size):
+        row = grid[y]
+        for x in range(size):
+            cells[y * size + x] = row[x]
+
+
+def evaluate_board(board, int player):
+    """Pattern score of board from player's point of view (same values as ai._py_evaluate_board)."""
+    cdef _Geometry g = _geometry(board.size)
+    cdef signed char cells[MAX_CELLS + 2]
+    cdef int li, a, b, t1 = 0, t2 = 0
+    _load_cells(cells, board, g.size)
+    for li in range(g.n_lines):
+        _score_line(cells, g.lines[li], g.width, &a, &b)
+        t1 += a
+        t2 += b
+    return t1 - t2 if player == 1 else t2 - t1
+
+
+cdef class _Position:
+    """C board with incremental line scores, neighbour counts and Zobrist hash."""
+    cdef _Geometry g
+    cdef signed char cells[MAX_CELLS + 2]
+    cdef int count[MAX_CELLS]
+    cdef int ls1[MAX_LINES]
+    cdef int ls2[MAX_LINES]
+    cdef int totals[3]
+    cdef uint64_t hash
+    cdef int stones
+
+    def __init__(self, board):
+        cdef int i, li, x, y, p
+        self.g = _geometry(board.size)
+        memset(self.cells, 0, MAX_CELLS + 2)
+        self.cells[OFF_CELL] = 3
+        memset(self.count, 0, sizeof(self.count))
+        self.totals[0] = self.totals[1] = self.totals[2] = 0
+        self.hash = 0
+        self.stones = 0
+        for li in range(self.g.n_lines):
+            self.ls1[li] = self.ls2[li] = 0
+        for x, y, p in board.history:
+            self.place(y * self.g.size + x, p)
+
+    cdef inline int evaluation(self, int player) noexcept nogil:
+        return self.totals[player] - self.totals[3 - player]
+
+    cdef void _rescore(self, int idx) noexcept nogil:
+        cdef int j, li, a, b
+        for j in range(4):
+            li = self.g.cell_lines[idx][j]
+            _score_line(self.cells, self.g.lines[li], self.g.width, &a, &b)
+            self.totals[1] += a - self.ls1[li]
+            self.totals[2] += b - self.ls2[li]
+            self.ls1[li] = a
+            self.ls2[li] = b
+
+    cdef void place(self, int idx, int p) noexcept nogil:
+        cdef int k
+        self.hash ^= self.g.zobrist[idx][p]
+        self.cells[idx] = p
+        self.stones += 1
+        for k in range(self.g.n_neighbors[idx]):
+            self.count[self.g.neighbors[idx][k]] += 1
+        self._rescore(idx)
+
+    cdef void remove(self, int idx) noexcept nogil:
+        cdef int k
+        self.hash ^= self.g.zobrist[idx][self.cells[idx]]
+        self.cells[idx] = 0
+        self.stones -= 1
+        for k in range(self.g.n_neighbors[idx]):
+            self.count[self.g.neighbors[idx][k]] -= 1
+        self._rescore(idx)
+
+    cdef int _run(self, int x, int y, int dx, int dy, int p) noexcept nogil:
+        cdef int n = 0, size = self.g.size
+        x += dx
+        y += dy
+        while 0 <= x < size and 0 <= y < size and self.cells[y * size + x] == p:
+            n += 1
+            x += dx
+            y += dy
+        return n
+
+    cdef bint is_five(self, int idx) noexcept nogil:
+        """Whether the stone on idx is part of five or more in a row."""
+        cdef int size = self.g.size, x = idx % size, y = idx // size, p = self.cells[idx]
+        return (self._run(x, y, 1, 0, p) + self._run(x, y, -1, 0, p) >= 4
+                or self._run(x, y, 0, 1, p) + self._run(x, y, 0, -1, p) >= 4
+                or self._run(x, y, 1, 1, p) + self._run(x, y, -1, -1, p) >= 4
+                or self._run(x, y, 1, -1, p) + self._run(x, y, -1, 1, p) >= 4)
+
+
+cdef int _cmp_int(const void* a, const void* b) noexcept nogil:
+    cdef int x = (<const int*>a)[0], y = (<const int*>b)[0]
+    return (x > y) - (x < y)
+
+
+cdef int _cmp_long(const void* a, const void* b) noexcept nogil:
+    cdef long long x = (<const long long*>a)[0], y = (<const long long*>b)[0]
+    return (x > y) - (x < y)
+
+
+cdef inline int _max_candidates(int depth) noexcept nogil:
+    if depth <= 2:
+        return 30
+    if depth == 3:
+        return 18
+    if depth == 4:
+        return 10
+    return 6
+
+
+cdef class CySearch:
+    """Search state of the compiled core: transposition table, killers, history, counters.
+
+    The table has the layout and replacement policy of tt.TranspositionTable
+    (two slots per bucket: deepest result, newest result). Counters are
+    cumulative; ai.NativeEngine turns them into per-search SearchStats.
+    """
+    cdef uint64_t* keys
+    cdef int* scores
+    cdef short* moves
+    cdef signed char* depths
+    cdef unsigned char* flags
+    cdef unsigned char* gens
+    cdef readonly long capacity
+    cdef long mask
+    cdef readonly int generation
+    cdef int killers[MAX_PLY + 1][2]
+    cdef int history[3][MAX_CELLS]
+    cdef int pv[MAX_PLY + 1][MAX_PLY + 1]
+    cdef int pv_len[MAX_PLY + 1]
+    cdef double deadline
+    cdef object cancel
+    cdef bint aborted
+    cdef int best_root          # best move of the last finished root node
+    cdef bint split             # only the cells in root_mask are tried at the root
+    cdef unsigned char root_mask[MAX_CELLS]
+    cdef int[:] bounds          # shared best root score per depth, or an empty view
+    cdef readonly long long nodes, leaf_evals, interior_nodes, moves_searched
+    cdef readonly long long probes, hits, stores, tt_cutoffs
+    cdef long long cut_index[MAX_MOVES]
+
+    def __cinit__(self, double size_mb=16):
+        cdef long slots = max(2, <long>(size_mb * 1024 * 1024) // 17)
+        cdef long buckets = 1
+        while buckets * 2 <= slots // 2:
+            buckets *= 2
+        self.bounds = _NO_BOUNDS
+        self.capacity = buckets * 2
+        self.mask = buckets - 1
+        self.keys = <uint64_t*>malloc(self.capacity * sizeof(uint64_t))
+        self.scores = <int*>malloc(self.capacity * sizeof(int))
+        self.moves = <short*>malloc(self.capacity * sizeof(short))
+        self.depths = <signed char*>malloc(self.capacity)
+        self.flags = <unsigned char*>malloc(self.capacity)
+        self.gens = <unsigned char*>malloc(self.capacity)
+        if not (self.keys and self.scores and self.moves and self.depths and self.flags and self.gens):
+            raise MemoryError()
+        self.clear()
+
+    def __dealloc__(self):
+        free(self.keys)
+        free(self.scores)
+        free(self.moves)
+        free(self.depths)
+        free(self.flags)
+        free(self.gens)
+
+    def clear(self):
+        """Forget every stored result, killer and history score, and zero the counters."""
+        memset(self.flags, 0, self.capacity)
+        memset(self.gens, 0, self.capacity)
+        memset(self.killers, 0xFF, sizeof(self.killers))
+        memset(self.history, 0, sizeof(self.history))
+        self.generation = 0
+        self.nodes = self.leaf_evals = self.interior_nodes = self.moves_searched = 0
+        self.probes = self.hits = self.stores = self.tt_cutoffs = 0
+        memset(self.cut_index, 0, sizeof(self.cut_index))
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    def __len__(self):
+        cdef long i, n = 0
+        for i in range(self.capacity):
+            n += self.flags[i] != 0
+        return n
+
+    def cutoffs(self):
+        """{index of the move that caused a beta cutoff: count}, cumulative."""
+        return {i: self.cut_index[i] for i in range(MAX_MOVES) if self.cut_index[i]}
+
+    cdef long _find(self, uint64_t key) noexcept nogil:
+        cdef long i = <long>(key & <uint64_t>self.mask) << 1
+        if self.flags[i] and self.keys[i] == key:
+            return i
+        if self.flags[i + 1] and self.keys[i + 1] == key:
+            return i + 1
+        return -1
+
+    cdef void _store(self, uint64_t key, int depth, int score, int flag, int move) noexcept nogil:
+        cdef long i = <long>(key & <uint64_t>self.mask) << 1, slot
+        self.stores += 1
+        if self.flags[i] and self.keys[i] == key:
+            slot = i
+        elif self.flags[i + 1] and self.keys[i + 1] == key:
+            if depth >= self.depths[i] or not self.flags[i] or self.gens[i] != self.generation:
+                self.flags[i + 1] = 0
+                slot = i
+            else:
+                slot = i + 1
+        elif not self.flags[i] or self.gens[i] != self.generation or depth >= self.depths[i]:
+            slot = i
+        else:
+            slot = i + 1
+        if move < 0 and self.flags[slot] and self.keys[slot] == key:
+            move = self.moves[slot]
+        self.keys[slot] = key
+        self.scores[slot] = score
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.gens[slot] = self.generation
+        self.moves[slot] = move
+
+    cdef bint _should_stop(self) except -1:
+        if self.deadline > 0 and time.perf_counter() > self.deadline:
+            return True
+        return self.cancel is not None and self.cancel.is_set()
+
+    cdef int _order(self, _Position pos, int depth, int to_move, int hash_move, int ply, int* out) except -1:
+        """Candidate moves of the node in search order; returns how many."""
+        cdef _Geometry g = pos.g
+        cdef int cand[MAX_CELLS]
+        cdef long long keyed[MAX_MOVES]
+        cdef int i, k, n = 0, m = 0, idx, sc, limit
+        cdef bint restrict = ply == 0 and self.split
+        if restrict and hash_move >= 0 and not self.root_mask[hash_move]:
+            hash_move = -1
+        for i in range(g.n):
+            if pos.cells[i] == 0 and (self.root_mask[i] if restrict else pos.count[i] > 0):
+                cand[n] = ((32 - pos.count[i]) << 20) | g.order[i]
+                n += 1
+        if n == 0:
+            return 0
+        qsort(cand, n, sizeof(int), _cmp_int)
+        # the root moves of a split search are all tried, as in ai.Engine
+        limit = MAX_MOVES - 1 if restrict else _max_candidates(depth)
+        if n > limit:
+            n = limit
+        for i in range(n):
+            idx = cand[i] & 1023
+            if idx == hash_move:
+                continue
+            sc = 0
+            for k in range(g.n_neighbors[idx]):
+                if pos.cells[g.neighbors[idx][k]] == to_move:
+                    sc += 10
+                elif pos.cells[g.neighbors[idx][k]] == 0:
+                    sc += 1
+            sc += self.history[to_move][idx]
+            if depth <= MAX_PLY and (self.killers[depth][0] == idx or self.killers[depth][1] == idx):
+                sc += KILLER_BONUS
+            # best first; ties keep the generation order
+            keyed[m] = -(<long long>sc << 16) | (m << 10) | idx
+            m += 1
+        qsort(keyed, m, sizeof(long long), _cmp_long)
+        k = 0
+        if hash_move >= 0 and pos.cells[hash_move] == 0:
+            out[0] = hash_move
+            k = 1
+        for i in range(m):
+            out[k] = <int>(keyed[i] & 1023)
+            k += 1
+        return k
+
+    cdef int _negamax(self, _Position pos, int depth, int alpha, int beta, int to_move, int ply, int last) except? -99999999:
+        cdef uint64_t key = 0
+        cdef long slot
+        cdef int hash_move = -1, alpha_orig = alpha, beta_orig = beta
+        cdef int t_score, t_flag, val, best, best_move, i = 0, j, n, mv, flag, opp = 3 - to_move
+        cdef int moves[MAX_MOVES]
+        self.nodes += 1
+        if not (self.nodes & CHECK_EVERY) and self._should_stop():
+            self.aborted = True
+        if self.aborted:
+            return 0
+        self.pv_len[ply] = 0
+        if depth > 0:
+            key = pos.hash ^ SIDE_KEYS[to_move]
+            self.probes += 1
+            slot = self._find(key)
+            if slot >= 0:
+                self.hits += 1
+                t_score = self.scores[slot]
+                t_flag = self.flags[slot]
+                hash_move = self.moves[slot]
+                if self.depths[slot] >= depth and ply > 0:
+                    if t_flag == EXACT:
+                        self.tt_cutoffs += 1
+                        return t_score
+                    if t_flag == LOWER:
+                        alpha = max(alpha, t_score)
+                    else:
+                        beta = min(beta, t_score)
+                    if alpha >= beta:
+                        self.tt_cutoffs += 1
+                        return t_score
+        if last >= 0 and pos.is_five(last):
+            # the previous move won
+            if depth > 0:
+                self._store(key, depth, -WIN_SCORE, EXACT, -1)
+            return -WIN_SCORE
+        if depth == 0 or ply >= MAX_PLY:
+            self.leaf_evals += 1
+            return pos.evaluation(to_move)
+        n = self._order(pos, depth, to_move, hash_move, ply, moves)
+        if n == 0:
+            mv = (pos.g.size // 2) * (pos.g.size + 1)
+            val = pos.evaluation(to_move)
+            self._store(key, depth, val, EXACT, mv)
+            if ply == 0:
+                self.best_root = mv
+            return val
+        best = -INF
+        best_move = moves[0]
+        self.interior_nodes += 1
+        for i in range(n):
+            mv = moves[i]
+            if ply == 0 and depth < self.bounds.shape[0] and alpha < self.bounds[depth] - 1 < beta:
+                # another worker's share already scored this; only better or equal moves matter
+                alpha = alpha_orig = self.bounds[depth] - 1
+            pos.place(mv, to_move)
+            if i == 0:
+                val = -self._negamax(pos, depth - 1, -beta, -alpha, opp, ply + 1, mv)
+            else:
+                val = -self._negamax(pos, depth - 1, -alpha - 1, -alpha, opp, ply + 1, mv)
+                if alpha < val < beta and not self.aborted:
+                    val = -self._negamax(pos, depth - 1, -beta, -alpha, opp, ply + 1, mv)
+            pos.remove(mv)
+            if self.aborted:
+                return 0
+            if val > best:
+                best = val
+                best_move = mv
+            if val > alpha:
+                alpha = val
+                self.pv[ply][0] = mv
+                for j in range(self.pv_len[ply + 1]):
+                    self.pv[ply][j + 1] = self.pv[ply + 1][j]
+                self.pv_len[ply] = self.pv_len[ply + 1] + 1
+                if ply == 0 and depth < self.bounds.shape[0] and val > self.bounds[depth]:
+                    self.bounds[depth] = val
+            if alpha >= beta:
+                self.cut_index[i] += 1
+                if depth - 1 <= MAX_PLY and self.killers[depth - 1][0] != mv and self.killers[depth - 1][1] != mv:
+                    self.killers[depth - 1][1] = self.killers[depth - 1][0]
+                    self.killers[depth - 1][0] = mv
+                self.history[to_move][mv] += 1 << min(depth, 30)
+                break
+        self.moves_searched += i + 1
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._store(key, depth, best, flag, best_move)
+        if ply == 0:
+            self.best_root = best_move
+        return best
+
+    def search(self, board, int player, int depth=2, time_limit_ms=None, int max_depth=20, cancel=None,
+               root_moves=None, bounds=None):
+        """Search board for player; moves are flat cell indices (y * size + x).
+
+        Returns (move, score, pv, depth, iterations) where iterations holds
+        (depth, seconds, nodes, score, move) per completed iteration. Without
+        time_limit_ms one search to depth is run; with it the search deepens
+        from depth 1 to max_depth with aspiration windows, keeps the last
+        completed iteration and does not start one it is unlikely to finish.
+        Setting the cancel event stops the search like a timeout; a fixed-depth
+        search then returns move -1.
+
+        root_moves restricts the moves tried at the root (parallel root
+        splitting). bounds is a writable int buffer indexed by depth, shared
+        by the searches splitting one root: each publishes its best root
+        score there and searches its remaining moves only for one at least
+        as good, so equal scores stay exact.
+        """
+        cdef _Position pos = _Position(board)
+        cdef int d, i, val, alpha, beta, move = -1, score = 0, done = 0
+        cdef double start = time.perf_counter(), budget, it_start
+        cdef long long it_nodes
+        pv = []
+        iterations = []
+        last = -1
+        history = board.history
+        if history:
+            x, y, _ = history[len(history) - 1]
+            last = y * board.size + x
+        self.cancel = cancel
+        self.aborted = False
+        self.deadline = 0
+        self.split = root_moves is not None
+        if self.split:
+            memset(self.root_mask, 0, sizeof(self.root_mask))
+            for i in root_moves:
+                self.root_mask[i] = 1
+        self.bounds = _NO_BOUNDS if bounds is None else bounds
+        try:
+            if time_limit_ms is None:
+                it_nodes = self.nodes
+                val = self._search_root(pos, player, depth, -INF, INF, last)
+                if not self.aborted:
+                    move, score, done = self.best_root, val, depth
+                    pv = self._root_pv(pos, player, depth)
+                    iterations.append((depth, time.perf_counter() - start, self.nodes - it_nodes, val, move))
+                return move, score, pv, done, iterations
+            budget = time_limit_ms / 1000.0
+            for d in range(1, max_depth + 1):
+                # the first iteration always completes so there is a move to return
+                self.deadline = start + budget if move >= 0 else 0
+                if move < 0:
+                    alpha, beta = -INF, INF
+                else:
+                    alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
+                it_start, it_nodes = time.perf_counter(), self.nodes
+                val = self._search_root(pos, player, d, alpha, beta, last)
+                if not self.aborted and (val <= alpha or val >= beta):
+                    val = self._search_root(pos, player, d, -INF, INF, last)
+                if self.aborted:
+                    break
+                move, score, done = self.best_root, val, d
+                pv = self._root_pv(pos, player, d)
+                iterations.append((d, time.perf_counter() - it_start, self.nodes - it_nodes, val, move))
+                if time.perf_counter() - start > budget / 2:
+                    break
+            return move, score, pv, done, iterations
+        finally:
+            self.cancel = None
+            self.deadline = 0
+            self.split = False
+            self.bounds = _NO_BOUNDS
+
+    cdef int _search_root(self, _Position pos, int player, int depth, int alpha, int beta, int last) except? -99999999:
+        self.best_root = -1
+        return self._negamax(pos, depth, alpha, beta, player, 0, last)
+
+    cdef list _root_pv(self, _Position pos, int player, int depth):
+        # the PV is empty when every root move failed low; it then starts with the best move alone
+        cdef int i, made = 0, to_move = player
+        cdef long slot
+        if self.pv_len[0] and self.pv[0][0] == self.best_root:
+            pv = [self.pv[0][i] for i in range(self.pv_len[0])]
+        else:
+            pv = [self.best_root]
+        # the table stops the PV at TT cutoffs; continue it from the hash moves stored there
+        for i in pv:
+            pos.place(i, to_move)
+            made += 1
+            to_move = 3 - to_move
+        while len(pv) < depth and not pos.is_five(pv[len(pv) - 1]):
+            slot = self._find(pos.hash ^ SIDE_KEYS[to_move])
+            if slot < 0 or self.moves[slot] < 0 or pos.cells[self.moves[slot]] != 0:
+                break
+            pv.append(self.moves[slot])
+            pos.place(self.moves[slot], to_move)
+            made += 1
+            to_move = 3 - to_move
+        for i in reversed(pv[:made]):
+            pos.remove(i)
+        return pv
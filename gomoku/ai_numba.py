@@ -2,130 +2,665 @@
 Optional numba JIT acceleration for hot AI routines.
 Numba compiles Python functions to machine code at runtime,
 providing near-C performance without requiring a C compiler.
+Besides the leaf evaluator this module holds a complete search engine
+(NumbaSearch) that ai.NativeEngine runs as the 'numba' search core.
 """
+import threading
+import time
+from functools import lru_cache
+
 import numba
 import numpy as np
 
+from .game import neighbor_cells, zobrist_keys
+from .patterns import cell_lines, line_index_array, pattern_table_array
 
-@numba.jit(nopython=True)
-def score_line_numba(line_array, p):
-    """
-    Numba-accelerated line scoring.
-    line_array: 1D numpy array of ints (0, 1, or 2)
-    p: player value (1 or 2)
-    Returns score for this player on this line.
+
+@numba.njit(nogil=True, cache=True)
+def _evaluate_grid(grid, lines, tables, player):
+    """Pattern score of a (size, size) grid for player, both colours in one pass.
+
+    lines is patterns.line_index_array(size): row indices past the board
+    (size*size for the zero pad, size*size + 1 for OFF) are mapped to their
+    cell values here, so no padded copy of the grid is needed.
     """
-    L = len(line_array)
-    if L == 0:
-        return 0
-    
-    # Pad with zeros
-    padded = np.zeros(L + 2, dtype=np.int32)
-    padded[1:L+1] = line_array
-    
-    s = 0
-    padded_len = L + 2
-    
-    # five-in-row
-    for i in range(0, padded_len - 4):
-        if (padded[i] == p and padded[i+1] == p and padded[i+2] == p 
-            and padded[i+3] == p and padded[i+4] == p):
-            s += 100000
-    
-    # open4: 0 p p p p 0
-    for i in range(0, padded_len - 5):
-        if (padded[i] == 0 and padded[i+5] == 0 
-            and padded[i+1] == p and padded[i+2] == p 
-            and padded[i+3] == p and padded[i+4] == p):
-            s += 10000
-    
-    # open2: 0 p p 0
-    for i in range(0, padded_len - 3):
-        if (padded[i] == 0 and padded[i+3] == 0 
-            and padded[i+1] == p and padded[i+2] == p):
-            s += 10
-    
-    return s
-
-
-@numba.jit(nopython=True)
+    size = grid.shape[0]
+    n = size * size
+    t1 = 0
+    t2 = 0
+    for li in range(lines.shape[0]):
+        code = 0
+        for k in range(lines.shape[1]):
+            i = lines[li, k]
+            if i < n:
+                v = grid[i // size, i % size]
+            elif i == n:
+                v = 0
+            else:
+                v = 3
+            code = ((code << 2) | v) & 4095
+            if k >= 5:
+                t1 += tables[1, code]
+                t2 += tables[2, code]
+    return t1 - t2 if player == 1 else t2 - t1
+
+
 def evaluate_board_numba(grid_array, player):
     """
-    Numba-accelerated board evaluation.
+    Numba-accelerated board evaluation, equal to the Python evaluator.
     grid_array: 2D numpy array of ints (0, 1, or 2)
     player: 1 or 2
-    Returns evaluation score.
+    Returns evaluation score. The compiled kernel allocates nothing; the
+    line and pattern tables are built once per board size.
+    """
+    return _evaluate_grid(grid_array, line_index_array(grid_array.shape[0]), pattern_table_array(), player)
+
+
+# ---------------------------------------------------------------------------
+# Whole-search engine: board, move generation, make/unmake, transposition
+# table and principal variation search all run in nopython mode on
+# preallocated arrays, so Python makes one call per move. It mirrors
+# ai.Engine.negamax (and ai_cy.CySearch) move for move.
+# ---------------------------------------------------------------------------
+MAX_SIZE = 19           # largest board the preallocated tables hold
+MAX_PLY = 64
+MAX_MOVES = 32          # generated moves plus the hash move
+CHECK_EVERY = 255       # nodes between looks at the control flags
+WIN_SCORE = 10000
+INF = 9999999
+ASPIRATION_WINDOW = 300
+KILLER_BONUS = 200000
+EXACT, LOWER, UPPER = 1, 2, 3
+SIDE_KEYS = np.array([0, 0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F], dtype=np.uint64)
+WATCH_INTERVAL = 0.001  # seconds between the watcher thread's checks
+_NO_BOUNDS = np.zeros(0, dtype=np.int32)  # bounds of a search nothing shares
+
+# slots of the counters array
+C_NODES, C_LEAF_EVALS, C_INTERIOR, C_MOVES, C_PROBES, C_HITS, C_STORES, C_TT_CUTOFFS, C_BEST = range(9)
+COUNTER_NAMES = ('nodes', 'leaf_evals', 'interior_nodes', 'moves_searched', 'probes', 'hits', 'stores', 'tt_cutoffs')
+# slots of the control array, written by the watcher thread while the core runs
+CTL_CANCEL, CTL_TIMEOUT, CTL_HALF_TIME, CTL_HAVE_MOVE, CTL_ABORTED, CTL_ITERATIONS = range(6)
+# fields of a search stack frame (one per ply)
+(F_DEPTH, F_ALPHA, F_BETA, F_ALPHA0, F_BETA0, F_TO_MOVE, F_LAST, F_BEST, F_BEST_MOVE, F_I, F_N,
+ F_RESEARCH) = range(12)
+
+
+@lru_cache(maxsize=None)
+def _geometry(size):
+    """Per-size tables: (lines, cell_lines, neighbours, neighbour counts, cell order, zobrist, patterns, size)."""
+    if not 5 <= size <= MAX_SIZE:
+        raise ValueError('board size must be between 5 and {}'.format(MAX_SIZE))
+    n = size * size
+    center = size // 2
+    neighbors = np.full((n, 24), -1, dtype=np.int32)
+    n_neighbors = np.zeros(n, dtype=np.int32)
+    for i, cells in enumerate(neighbor_cells(size)):
+        neighbors[i, :len(cells)] = cells
+        n_neighbors[i] = len(cells)
+    order = np.array([((abs(i % size - center) + abs(i // size - center)) << 10) | i for i in range(n)],
+                     dtype=np.int64)
+    zobrist = np.array(zobrist_keys(size), dtype=np.uint64).reshape(n, 3)
+    return (line_index_array(size), np.array(cell_lines(size), dtype=np.int32), neighbors, n_neighbors,
+            order, zobrist, pattern_table_array(), size)
+
+
+@numba.njit(nogil=True, cache=True)
+def _score_line(cells, row, tables):
+    code = 0
+    for k in range(5):
+        code = (code << 2) | cells[row[k]]
+    a = 0
+    b = 0
+    for k in range(5, row.shape[0]):
+        code = ((code << 2) | cells[row[k]]) & 4095
+        a += tables[1, code]
+        b += tables[2, code]
+    return a, b
+
+
+@numba.njit(nogil=True, cache=True)
+def _rescore(geo, pos, idx):
+    lines, lines_of, _, _, _, _, tables, _ = geo
+    cells, _, ls, totals, _ = pos
+    for j in range(4):
+        li = lines_of[idx, j]
+        a, b = _score_line(cells, lines[li], tables)
+        totals[1] += a - ls[1, li]
+        totals[2] += b - ls[2, li]
+        ls[1, li] = a
+        ls[2, li] = b
+
+
+@numba.njit(nogil=True, cache=True)
+def _place(geo, pos, idx, p):
+    _, _, neighbors, n_neighbors, _, zobrist, _, _ = geo
+    cells, count, _, _, hv = pos
+    hv[0] ^= zobrist[idx, p]
+    cells[idx] = p
+    for k in range(n_neighbors[idx]):
+        count[neighbors[idx, k]] += 1
+    _rescore(geo, pos, idx)
+
+
+@numba.njit(nogil=True, cache=True)
+def _remove(geo, pos, idx):
+    _, _, neighbors, n_neighbors, _, zobrist, _, _ = geo
+    cells, count, _, _, hv = pos
+    hv[0] ^= zobrist[idx, cells[idx]]
+    cells[idx] = 0
+    for k in range(n_neighbors[idx]):
+        count[neighbors[idx, k]] -= 1
+    _rescore(geo, pos, idx)
+
+
+@numba.njit(nogil=True, cache=True)
+def _run(cells, size, x, y, dx, dy, p):
+    n = 0
+    x += dx
+    y += dy
+    while 0 <= x < size and 0 <= y < size and cells[y * size + x] == p:
+        n += 1
+        x += dx
+        y += dy
+    return n
+
+
+@numba.njit(nogil=True, cache=True)
+def _is_five(cells, size, idx):
+    x = idx % size
+    y = idx // size
+    p = cells[idx]
+    return (_run(cells, size, x, y, 1, 0, p) + _run(cells, size, x, y, -1, 0, p) >= 4
+            or _run(cells, size, x, y, 0, 1, p) + _run(cells, size, x, y, 0, -1, p) >= 4
+            or _run(cells, size, x, y, 1, 1, p) + _run(cells, size, x, y, -1, -1, p) >= 4
+            or _run(cells, size, x, y, 1, -1, p) + _run(cells, size, x, y, -1, 1, p) >= 4)
+
+
+@numba.njit(nogil=True, cache=True)
+def _tt_find(tt, key):
+    keys, _, _, _, flags, _, params = tt
+    i = np.int64((key & params[0]) << np.uint64(1))
+    if flags[i] and keys[i] == key:
+        return i
+    if flags[i + 1] and keys[i + 1] == key:
+        return i + 1
+    return -1
+
+
+@numba.njit(nogil=True, cache=True)
+def _tt_store(tt, counters, key, depth, score, flag, move):
+    # same two-tier policy as tt.TranspositionTable.store
+    keys, scores, moves, depths, flags, gens, params = tt
+    counters[C_STORES] += 1
+    gen = params[1]
+    i = np.int64((key & params[0]) << np.uint64(1))
+    if flags[i] and keys[i] == key:
+        slot = i
+    elif flags[i + 1] and keys[i + 1] == key:
+        if depth >= depths[i] or not flags[i] or gens[i] != gen:
+            flags[i + 1] = 0
+            slot = i
+        else:
+            slot = i + 1
+    elif not flags[i] or gens[i] != gen or depth >= depths[i]:
+        slot = i
+    else:
+        slot = i + 1
+    if move < 0 and flags[slot] and keys[slot] == key:
+        move = moves[slot]
+    keys[slot] = key
+    scores[slot] = score
+    depths[slot] = depth
+    flags[slot] = flag
+    gens[slot] = gen
+    moves[slot] = move
+
+
+@numba.njit(nogil=True, cache=True)
+def _max_candidates(depth):
+    if depth <= 2:
+        return 30
+    if depth == 3:
+        return 18
+    if depth == 4:
+        return 10
+    return 6
+
+
+@numba.njit(nogil=True, cache=True)
+def _order(geo, pos, heur, root, depth, to_move, hash_move, ply):
+    """Writes the node's moves in search order to heur moves[ply]; returns how many."""
+    _, _, neighbors, n_neighbors, order, _, _, size = geo
+    cells, count, _, _, _ = pos
+    killers, history, _, _, _, _, moves, cand, keyed, _ = heur
+    mask = root[0]
+    restrict = ply == 0 and mask.shape[0] > 0
+    if restrict and hash_move >= 0 and mask[hash_move] == 0:
+        hash_move = -1
+    c = cand[ply]
+    n = 0
+    for i in range(size * size):
+        if cells[i] == 0 and ((restrict and mask[i] != 0) or (not restrict and count[i] > 0)):
+            c[n] = ((32 - count[i]) << 20) | order[i]
+            n += 1
+    if n == 0:
+        return 0
+    c[:n].sort()
+    # the root moves of a split search are all tried, as in ai.Engine
+    n = min(n, MAX_MOVES - 1 if restrict else _max_candidates(depth))
+    kk = keyed[ply]
+    m = 0
+    for i in range(n):
+        idx = c[i] & 1023
+        if idx == hash_move:
+            continue
+        sc = 0
+        for k in range(n_neighbors[idx]):
+            v = cells[neighbors[idx, k]]
+            if v == to_move:
+                sc += 10
+            elif v == 0:
+                sc += 1
+        sc += history[to_move, idx]
+        if depth <= MAX_PLY and (killers[depth, 0] == idx or killers[depth, 1] == idx):
+            sc += KILLER_BONUS
+        # best first; ties keep the generation order
+        kk[m] = -(sc << 16) | (m << 10) | idx
+        m += 1
+    kk[:m].sort()
+    out = moves[ply]
+    k = 0
+    if hash_move >= 0 and cells[hash_move] == 0:
+        out[0] = hash_move
+        k = 1
+    for i in range(m):
+        out[k] = kk[i] & 1023
+        k += 1
+    return k
+
+
+@numba.njit(nogil=True, cache=True)
+def _enter(geo, pos, tt, heur, stack, root, ply):
+    """Start the node in frame ply: (True, score) when it is decided without
+    searching moves (abort, TT cutoff, win, leaf), else (False, 0) with its
+    moves ordered and the frame ready to search them."""
+    size = geo[7]
+    cells, _, _, totals, hv = pos
+    _, scores, tt_moves, depths, flags, _, _ = tt
+    _, _, counters, _, _, pv_len, moves, _, _, ctl = heur
+    frames, keys = stack
+    f = frames[ply]
+    depth = f[F_DEPTH]
+    alpha = f[F_ALPHA]
+    beta = f[F_BETA]
+    to_move = f[F_TO_MOVE]
+    last = f[F_LAST]
+    counters[C_NODES] += 1
+    if (counters[C_NODES] & CHECK_EVERY) == 0:
+        # the first iteration of a timed search always completes
+        if ctl[CTL_CANCEL] or (ctl[CTL_TIMEOUT] and ctl[CTL_HAVE_MOVE]):
+            ctl[CTL_ABORTED] = 1
+    if ctl[CTL_ABORTED]:
+        return True, 0
+    pv_len[ply] = 0
+    f[F_ALPHA0] = alpha
+    f[F_BETA0] = beta
+    key = np.uint64(0)
+    hash_move = -1
+    if depth > 0:
+        key = hv[0] ^ SIDE_KEYS[to_move]
+        counters[C_PROBES] += 1
+        slot = _tt_find(tt, key)
+        if slot >= 0:
+            counters[C_HITS] += 1
+            t_score = np.int64(scores[slot])
+            t_flag = flags[slot]
+            hash_move = np.int64(tt_moves[slot])
+            if depths[slot] >= depth and ply > 0:
+                if t_flag == EXACT:
+                    counters[C_TT_CUTOFFS] += 1
+                    return True, t_score
+                if t_flag == LOWER:
+                    alpha = max(alpha, t_score)
+                else:
+                    beta = min(beta, t_score)
+                if alpha >= beta:
+                    counters[C_TT_CUTOFFS] += 1
+                    return True, t_score
+    keys[ply] = key
+    if last >= 0 and _is_five(cells, size, last):
+        # the previous move won
+        if depth > 0:
+            _tt_store(tt, counters, key, depth, -WIN_SCORE, EXACT, -1)
+        return True, -WIN_SCORE
+    if depth == 0 or ply >= MAX_PLY:
+        counters[C_LEAF_EVALS] += 1
+        return True, np.int64(totals[to_move] - totals[3 - to_move])
+    n = _order(geo, pos, heur, root, depth, to_move, hash_move, ply)
+    if n == 0:
+        mv = (size // 2) * (size + 1)
+        val = np.int64(totals[to_move] - totals[3 - to_move])
+        _tt_store(tt, counters, key, depth, val, EXACT, mv)
+        if ply == 0:
+            counters[C_BEST] = mv
+        return True, val
+    counters[C_INTERIOR] += 1
+    f[F_ALPHA] = alpha
+    f[F_BETA] = beta
+    f[F_BEST] = -INF
+    f[F_BEST_MOVE] = moves[ply, 0]
+    f[F_I] = 0
+    f[F_N] = n
+    f[F_RESEARCH] = 0
+    return False, 0
+
+
+@numba.njit(nogil=True, cache=True)
+def _negamax(geo, pos, tt, heur, stack, root, depth, alpha, beta, to_move, last):
+    """Principal variation search from the root; the score is from to_move's point of view.
+
+    Same algorithm as ai.Engine.negamax, run as a loop over the frames in
+    stack instead of by recursion (numba cannot cache recursive functions).
+    The first move of a node gets the full window, the rest a null window
+    and a re-search only if they beat alpha. root holds the root move mask
+    and the shared bounds of a split search (see NumbaSearch.search).
+    """
+    killers, history, counters, cut_index, pv, pv_len, moves, _, _, ctl = heur
+    bounds = root[1]
+    frames, keys = stack
+    f = frames[0]
+    f[F_DEPTH] = depth
+    f[F_ALPHA] = alpha
+    f[F_BETA] = beta
+    f[F_TO_MOVE] = to_move
+    f[F_LAST] = last
+    ply = 0
+    done, ret = _enter(geo, pos, tt, heur, stack, root, 0)
+    while True:
+        if not done:
+            # search the current move of the node at ply in a child frame
+            f = frames[ply]
+            mv = moves[ply, f[F_I]]
+            if not f[F_RESEARCH]:
+                if ply == 0 and f[F_DEPTH] < bounds.shape[0] and f[F_ALPHA] < bounds[f[F_DEPTH]] - 1 < f[F_BETA]:
+                    # another worker's share already scored this; only better or equal moves matter
+                    f[F_ALPHA] = f[F_ALPHA0] = bounds[f[F_DEPTH]] - 1
+                _place(geo, pos, mv, f[F_TO_MOVE])
+            c = frames[ply + 1]
+            c[F_DEPTH] = f[F_DEPTH] - 1
+            if f[F_I] == 0 or f[F_RESEARCH]:
+                c[F_ALPHA] = -f[F_BETA]
+            else:
+                c[F_ALPHA] = -f[F_ALPHA] - 1
+            c[F_BETA] = -f[F_ALPHA]
+            c[F_TO_MOVE] = 3 - f[F_TO_MOVE]
+            c[F_LAST] = mv
+            ply += 1
+            done, ret = _enter(geo, pos, tt, heur, stack, root, ply)
+            continue
+        # the node at ply is finished with score ret; back to its parent
+        if ply == 0:
+            return ret
+        ply -= 1
+        f = frames[ply]
+        i = f[F_I]
+        mv = moves[ply, i]
+        val = -ret
+        alpha = f[F_ALPHA]
+        beta = f[F_BETA]
+        if i > 0 and not f[F_RESEARCH] and alpha < val < beta and not ctl[CTL_ABORTED]:
+            f[F_RESEARCH] = 1
+            done = False
+            continue
+        _remove(geo, pos, mv)
+        f[F_RESEARCH] = 0
+        if ctl[CTL_ABORTED]:
+            ret = 0
+            continue
+        to_move = f[F_TO_MOVE]
+        depth = f[F_DEPTH]
+        if val > f[F_BEST]:
+            f[F_BEST] = val
+            f[F_BEST_MOVE] = mv
+        if val > alpha:
+            alpha = f[F_ALPHA] = val
+            pv[ply, 0] = mv
+            for j in range(pv_len[ply + 1]):
+                pv[ply, j + 1] = pv[ply + 1, j]
+            pv_len[ply] = pv_len[ply + 1] + 1
+            if ply == 0 and depth < bounds.shape[0] and val > bounds[depth]:
+                bounds[depth] = val
+        if alpha >= beta:
+            cut_index[i] += 1
+            kd = depth - 1
+            # killers are kept for the depths the table has rows for, as in ai_cy
+            if kd <= MAX_PLY and killers[kd, 0] != mv and killers[kd, 1] != mv:
+                killers[kd, 1] = killers[kd, 0]
+                killers[kd, 0] = mv
+            history[to_move, mv] += 1 << min(depth, 30)
+        elif i + 1 < f[F_N]:
+            f[F_I] = i + 1
+            done = False
+            continue
+        counters[C_MOVES] += i + 1
+        best = f[F_BEST]
+        if best <= f[F_ALPHA0]:
+            flag = UPPER
+        elif best >= f[F_BETA0]:
+            flag = LOWER
+        else:
+            flag = EXACT
+        _tt_store(tt, counters, keys[ply], depth, best, flag, f[F_BEST_MOVE])
+        if ply == 0:
+            counters[C_BEST] = f[F_BEST_MOVE]
+        ret = best
+
+
+@numba.njit(nogil=True, cache=True)
+def _root_pv(geo, pos, tt, heur, player, depth, pv_out):
+    """Copies the root PV to pv_out, continued from TT hash moves; returns its length."""
+    size = geo[7]
+    cells = pos[0]
+    _, _, tt_moves, _, _, _, _ = tt
+    _, _, counters, _, pv, pv_len, _, _, _, _ = heur
+    best = counters[C_BEST]
+    n = 0
+    if pv_len[0] > 0 and pv[0, 0] == best:
+        for j in range(pv_len[0]):
+            pv_out[j] = pv[0, j]
+        n = pv_len[0]
+    else:
+        pv_out[0] = best
+        n = 1
+    # the table stops the PV at TT cutoffs; continue it from the hash moves stored there
+    to_move = player
+    for j in range(n):
+        _place(geo, pos, pv_out[j], to_move)
+        to_move = 3 - to_move
+    made = n
+    while n < depth and not _is_five(cells, size, pv_out[n - 1]):
+        slot = _tt_find(tt, pos[4][0] ^ SIDE_KEYS[to_move])
+        if slot < 0 or tt_moves[slot] < 0 or cells[tt_moves[slot]] != 0:
+            break
+        pv_out[n] = tt_moves[slot]
+        _place(geo, pos, pv_out[n], to_move)
+        n += 1
+        made += 1
+        to_move = 3 - to_move
+    for j in range(made - 1, -1, -1):
+        _remove(geo, pos, pv_out[j])
+    return n
+
+
+@numba.njit(nogil=True, cache=True)
+def _search(geo, pos, tt, heur, stack, root, player, depth, timed, max_depth, last, iters, pv_out):
+    """One fixed-depth search, or iterative deepening when timed (stopped through the control flags).
+
+    Fills iters with (depth, nodes, score, move) per completed iteration
+    (counted in the control flags, so the watcher can time them) and pv_out
+    with the PV; returns (move, score, depth, iterations, pv length).
     """
-    size = grid_array.shape[0]
-    p = player
-    opp = 3 - p
-    val = 0
-    
-    # Score rows for player
-    for y in range(size):
-        val += score_line_numba(grid_array[y, :], p)
-    
-    # Score cols for player
-    for x in range(size):
-        val += score_line_numba(grid_array[:, x], p)
-    
-    # Score diagonals for player
-    for k in range(-size + 1, size):
-        diag = np.zeros(size, dtype=np.int32)
-        diag_len = 0
-        for y in range(size):
-            x = y - k
-            if 0 <= x < size:
-                diag[diag_len] = grid_array[y, x]
-                diag_len += 1
-        if diag_len > 0:
-            val += score_line_numba(diag[:diag_len], p)
-    
-    # Score anti-diagonals for player
-    for k in range(0, 2 * size - 1):
-        diag = np.zeros(size, dtype=np.int32)
-        diag_len = 0
-        for y in range(size):
-            x = k - y
-            if 0 <= x < size:
-                diag[diag_len] = grid_array[y, x]
-                diag_len += 1
-        if diag_len > 0:
-            val += score_line_numba(diag[:diag_len], p)
-    
-    # Score opponent (subtract from total)
-    opp_score = 0
-    
-    # Score rows for opponent
-    for y in range(size):
-        opp_score += score_line_numba(grid_array[y, :], opp)
-    
-    # Score cols for opponent
-    for x in range(size):
-        opp_score += score_line_numba(grid_array[:, x], opp)
-    
-    # Score diagonals for opponent
-    for k in range(-size + 1, size):
-        diag = np.zeros(size, dtype=np.int32)
-        diag_len = 0
-        for y in range(size):
-            x = y - k
-            if 0 <= x < size:
-                diag[diag_len] = grid_array[y, x]
-                diag_len += 1
-        if diag_len > 0:
-            opp_score += score_line_numba(diag[:diag_len], opp)
-    
-    # Score anti-diagonals for opponent
-    for k in range(0, 2 * size - 1):
-        diag = np.zeros(size, dtype=np.int32)
-        diag_len = 0
-        for y in range(size):
-            x = k - y
-            if 0 <= x < size:
-                diag[diag_len] = grid_array[y, x]
-                diag_len += 1
-        if diag_len > 0:
-            opp_score += score_line_numba(diag[:diag_len], opp)
-    
-    return val - opp_score
+    counters = heur[2]
+    ctl = heur[9]
+    move = -1
+    score = 0
+    done = 0
+    n_iters = 0
+    n_pv = 0
+    first = 1 if timed else depth
+    last_depth = max_depth if timed else depth
+    for d in range(first, last_depth + 1):
+        if move < 0:
+            alpha, beta = -INF, INF
+        else:
+            alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
+        nodes = counters[C_NODES]
+        counters[C_BEST] = -1
+        val = _negamax(geo, pos, tt, heur, stack, root, d, alpha, beta, player, last)
+        if not ctl[CTL_ABORTED] and (val <= alpha or val >= beta):
+            counters[C_BEST] = -1
+            val = _negamax(geo, pos, tt, heur, stack, root, d, -INF, INF, player, last)
+        if ctl[CTL_ABORTED]:
+            break
+        move = counters[C_BEST]
+        score = val
+        done = d
+        ctl[CTL_HAVE_MOVE] = 1
+        n_pv = _root_pv(geo, pos, tt, heur, player, d, pv_out)
+        iters[n_iters, 0] = d
+        iters[n_iters, 1] = counters[C_NODES] - nodes
+        iters[n_iters, 2] = val
+        iters[n_iters, 3] = move
+        n_iters += 1
+        ctl[CTL_ITERATIONS] = n_iters
+        # the next iteration costs several times this one; don't start what can't finish
+        if ctl[CTL_HALF_TIME]:
+            break
+    return move, score, done, n_iters, n_pv
+
+
+@numba.njit(nogil=True, cache=True)
+def _load(geo, pos, stones):
+    for i in range(stones.shape[0]):
+        _place(geo, pos, stones[i, 0], stones[i, 1])
+
+
+class NumbaSearch:
+    """Search state of the numba core in preallocated arrays; same interface as ai_cy.CySearch.
+
+    A watcher thread turns the deadline and the cancel event into flags the
+    compiled search polls (it runs without the GIL), so time-limited and
+    cancellable searches still take a single call; it also timestamps the
+    completed iterations, to within WATCH_INTERVAL.
+    """
+
+    def __init__(self, size_mb=16):
+        slots = max(2, int(size_mb * 1024 * 1024) // 17)
+        buckets = 1 << ((slots // 2).bit_length() - 1)
+        self.capacity = buckets * 2
+        self._tt = (np.zeros(self.capacity, dtype=np.uint64), np.zeros(self.capacity, dtype=np.int32),
+                    np.full(self.capacity, -1, dtype=np.int16), np.zeros(self.capacity, dtype=np.int8),
+                    np.zeros(self.capacity, dtype=np.uint8), np.zeros(self.capacity, dtype=np.uint8),
+                    np.array([buckets - 1, 0], dtype=np.uint64))
+        cells = MAX_SIZE * MAX_SIZE
+        self._heur = (np.full((MAX_PLY + 2, 2), -1, dtype=np.int64),    # killers by depth
+                      np.zeros((3, cells), dtype=np.int64),              # history by player and cell
+                      np.zeros(len(COUNTER_NAMES) + 1, dtype=np.int64),  # counters, best root move
+                      np.zeros(MAX_MOVES, dtype=np.int64),               # beta cutoffs by move index
+                      np.zeros((MAX_PLY + 1, MAX_PLY + 1), dtype=np.int64),  # triangular PV table
+                      np.zeros(MAX_PLY + 1, dtype=np.int64),
+                      np.zeros((MAX_PLY + 1, MAX_MOVES), dtype=np.int64),    # moves per ply
+                      np.zeros((MAX_PLY + 1, cells), dtype=np.int64),        # candidate scratch per ply
+                      np.zeros((MAX_PLY + 1, MAX_MOVES), dtype=np.int64),    # ordering scratch per ply
+                      np.zeros(6, dtype=np.int64))                           # control flags
+        self._stack = (np.zeros((MAX_PLY + 2, 12), dtype=np.int64), np.zeros(MAX_PLY + 2, dtype=np.uint64))
+        self.clear()
+
+    def clear(self):
+        """Forget every stored result, killer and history score, and zero the counters."""
+        for a in self._tt[4:6]:
+            a[:] = 0
+        self._tt[6][1] = 0
+        self._heur[0][:] = -1
+        for a in self._heur[1:4]:
+            a[:] = 0
+
+    def new_search(self):
+        self._tt[6][1] = (int(self._tt[6][1]) + 1) & 0xFF
+
+    @property
+    def generation(self):
+        return int(self._tt[6][1])
+
+    def __len__(self):
+        return int(np.count_nonzero(self._tt[4]))
+
+    def __getattr__(self, name):
+        if name in COUNTER_NAMES:
+            return int(self._heur[2][COUNTER_NAMES.index(name)])
+        raise AttributeError(name)
+
+    def cutoffs(self):
+        """{index of the move that caused a beta cutoff: count}, cumulative."""
+        return {i: int(n) for i, n in enumerate(self._heur[3]) if n}
+
+    def search(self, board, player, depth=2, time_limit_ms=None, max_depth=20, cancel=None,
+               root_moves=None, bounds=None):
+        """Search board for player; same arguments and results as ai_cy.CySearch.search."""
+        size = board.size
+        geo = _geometry(size)
+        n = size * size
+        pos = (np.zeros(n + 2, dtype=np.int8), np.zeros(n, dtype=np.int32),
+               np.zeros((3, len(geo[0])), dtype=np.int64), np.zeros(3, dtype=np.int64),
+               np.zeros(1, dtype=np.uint64))
+        pos[0][n + 1] = 3  # OFF cell of line_index_array
+        stones = np.array([(y * size + x, p) for x, y, p in board.history], dtype=np.int64).reshape(-1, 2)
+        _load(geo, pos, stones)
+        last = int(stones[-1, 0]) if len(stones) else -1
+        mask = np.zeros(n if root_moves is not None else 0, dtype=np.uint8)
+        if root_moves is not None:
+            mask[list(root_moves)] = 1
+        root = (mask, _NO_BOUNDS if bounds is None else np.frombuffer(bounds, dtype=np.int32))
+        ctl = self._heur[9]
+        ctl[:] = 0
+        timed = time_limit_ms is not None
+        iters = np.zeros((max_depth + 1 if timed else 1, 4), dtype=np.int64)
+        pv_out = np.zeros(MAX_PLY + 1, dtype=np.int64)
+        done = threading.Event()
+        start = time.perf_counter()
+        stamps = [start]  # end of each completed iteration, as seen by the watcher
+        watcher = None
+        if timed or cancel is not None:
+            watcher = threading.Thread(target=self._watch, daemon=True,
+                                       args=(ctl, done, cancel, time_limit_ms, start, stamps))
+            watcher.start()
+        try:
+            move, score, reached, n_iters, n_pv = _search(geo, pos, self._tt, self._heur, self._stack, root, player, depth,
+                                                          timed, max_depth, last, iters, pv_out)
+        finally:
+            end = time.perf_counter()
+            done.set()
+            if watcher is not None:
+                watcher.join()
+        stamps = (stamps + [end] * n_iters)[:n_iters + 1]
+        iterations = [(int(d), stamps[i + 1] - stamps[i], int(nodes), int(sc), int(m))
+                      for i, (d, nodes, sc, m) in enumerate(iters[:n_iters])]
+        if move < 0:
+            return -1, 0, [], 0, iterations
+        return int(move), int(score), [int(m) for m in pv_out[:n_pv]], int(reached), iterations
+
+    @staticmethod
+    def _watch(ctl, done, cancel, time_limit_ms, start, stamps):
+        budget = time_limit_ms / 1000.0 if time_limit_ms is not None else None
+        while not done.wait(WATCH_INTERVAL):
+            now = time.perf_counter()
+            while len(stamps) <= ctl[CTL_ITERATIONS]:
+                stamps.append(now)
+            if cancel is not None and cancel.is_set():
+                ctl[CTL_CANCEL] = 1
+            if budget is not None:
+                elapsed = now - start
+                if elapsed > budget / 2:
+                    ctl[CTL_HALF_TIME] = 1
+                if elapsed > budget:
+                    ctl[CTL_TIMEOUT] = 1
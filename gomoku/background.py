@@ -0,0 +1,105 @@
+"""
+AI searches on a background thread, so the UI keeps drawing and handling
+events while the engine thinks, and pondering: searching the opponent's
+expected reply on their time.
+"""
+import threading
+import time
+from typing import Optional, Tuple
+
+from . import ai
+
+# upper bound for a ponder search, which normally runs until it is stopped
+PONDER_TIME_MS = 600000
+
+
+class BackgroundSearch:
+    """One AI search running on a daemon thread.
+
+    The search works on a copy of the board, so the caller may keep using
+    (or changing) its own. Poll done() each frame and collect result();
+    cancel() sets the cancellation token checked by the search and waits for
+    the thread to stop.
+
+    With ponder_move the opponent's expected reply is played on the copy
+    first and player's answer is deepened until the search is stopped,
+    filling the transposition table; ponder_hit() then tells whether that
+    answer can be played as it is.
+    """
+
+    def __init__(self, board, player: int, depth: int = 2, time_limit_ms: Optional[int] = None,
+                 workers: int = 1, ponder_move: Optional[Tuple[int, int]] = None):
+        self.board = board.copy()
+        self.player = player
+        self.ponder_move = ponder_move
+        if ponder_move is not None:
+            self.board.place_move(ponder_move[0], ponder_move[1], 3 - player)
+            time_limit_ms = PONDER_TIME_MS
+        self.history = list(self.board.history)  # position the result belongs to
+        self.cancel_event = threading.Event()
+        self.started = time.perf_counter()
+        self.stopped = None
+        self.search_result = None  # ai.SearchResult once the search has returned
+        self.stats = None  # ai.SearchStats of the search, once it has returned
+        self._move = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(depth, time_limit_ms, workers), daemon=True)
+        self._thread.start()
+
+    def _run(self, depth: int, time_limit_ms: Optional[int], workers: int) -> None:
+        board = self.board
+        try:
+            res = ai.search_position(board, self.player, depth, time_limit_ms, workers=workers,
+                                     cancel=self.cancel_event)
+            self.search_result = res
+            self.stats = ai.last_search_stats()
+            self._move = res.move
+            # same fallback as choose_move_minimax: any move unless the game is over
+            if self._move is None and not self.cancelled() and \
+                    (not board.history or board.check_win(board.history[-1])[0] is None):
+                self._move = ai.choose_move_random(board)
+        except Exception as ex:
+            self._error = ex
+        finally:
+            self.stopped = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Seconds the search has been (or was) running."""
+        return (self.stopped or time.perf_counter()) - self.started
+
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def result(self) -> Optional[Tuple[int, int]]:
+        """The chosen move (None when cancelled); re-raises an error from the search."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return None if self.cancelled() else self._move
+
+    def cancel(self, wait: bool = True) -> None:
+        self.cancel_event.set()
+        if wait:
+            self._thread.join()
+
+    def ponder_hit(self, board, depth: int, time_limit_ms: Optional[int] = None):
+        """Stop pondering; the ai.SearchResult to play on board, or None.
+
+        The result is usable when the opponent played the predicted move and
+        the ponder search got as far as a normal search would: depth
+        iterations, or time_limit_ms of thinking, or a forced win. Otherwise
+        the caller searches again, mostly from the warmed-up TT.
+        """
+        self.cancel()
+        res = self.search_result
+        if self.ponder_move is None or self._error is not None or res is None or res.move is None:
+            return None
+        if board.history != self.history:
+            return None
+        if res.depth == 0 or (time_limit_ms is None and res.depth >= depth) or \
+                (time_limit_ms is not None and self.elapsed() * 1000 >= time_limit_ms):
+            return res
+        return None
@@ -0,0 +1,220 @@
+"""
+Benchmarks on a fixed set of positions, per evaluator backend and search core.
+
+For every backend in ai.EVALUATORS (plus 'auto', the incremental Board
+evaluation) it measures static evaluations per second, search nodes per
+second, time to reach each depth and the TT hit rate, and checks that the
+backends agree with the pure Python evaluator on every position. The same
+searches are timed on every search core ('python', ai.Engine, plus each of
+ai.SEARCH_CORES), which should all find the same scores. Results are written
+as JSON so runs on different commits can be compared.
+
+    python -m gomoku.bench --depth 3 --out bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from typing import Dict, List, Optional, Sequence
+
+from . import ai, storage
+from .game import Board
+
+# name -> (stones as (x, y, player), player to move)
+POSITIONS = {
+    'opening': ([(7, 7, 1), (8, 6, 2), (6, 6, 1), (8, 8, 2)], 1),
+    'midgame': ([(7, 7, 1), (8, 6, 2), (6, 6, 1), (8, 8, 2), (8, 7, 1), (8, 5, 2), (6, 7, 1), (9, 7, 2),
+                 (5, 7, 1), (4, 7, 2), (6, 8, 1), (7, 5, 2)], 1),
+    'vcf': ([(5, 5, 1), (6, 5, 1), (7, 5, 1), (4, 5, 2), (8, 6, 1), (8, 7, 1), (8, 9, 2), (0, 0, 2), (14, 14, 2)], 1),
+    'double_three': ([(6, 7, 1), (7, 7, 1), (8, 5, 1), (8, 6, 1), (0, 0, 2), (14, 14, 2), (0, 14, 2), (14, 0, 2)], 1),
+    'defend_four': ([(1, 1, 2), (2, 1, 2), (3, 1, 2), (4, 1, 2), (7, 7, 1), (8, 7, 1), (9, 7, 1)], 1),
+}
+SAVE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'save_1.json')
+SCATTERED_SEED = 5  # 'scattered': 40 random stones, a dense position for evaluator timing
+
+
+def positions() -> Dict[str, Board]:
+    """The benchmark positions as boards; save_1.json is included when present."""
+    out = {}
+    for name, (stones, _) in POSITIONS.items():
+        b = Board(15)
+        b.load_history(stones)
+        out[name] = b
+    if os.path.exists(SAVE_FILE):
+        b = Board(15)
+        b.load_history(storage.import_json(SAVE_FILE)['history'])
+        out['save_1'] = b
+    rng = random.Random(SCATTERED_SEED)
+    b = Board(15)
+    for i in range(40):
+        empties = [(x, y) for y in range(15) for x in range(15) if b.grid[y][x] == 0]
+        x, y = rng.choice(empties)
+        b.place_move(x, y, 1 + i % 2)
+    out['scattered'] = b
+    return out
+
+
+def _to_move(name: str, board: Board) -> int:
+    if name in POSITIONS:
+        return POSITIONS[name][1]
+    return 1 if len(board.history) % 2 == 0 else 2
+
+
+def backends() -> List[str]:
+    return ['auto'] + sorted(ai.EVALUATORS)
+
+
+def cores() -> List[str]:
+    return ['python'] + sorted(ai.SEARCH_CORES)
+
+
+def _evaluator(name: str):
+    if name == 'auto':
+        return ai.evaluate_board
+    return ai.EVALUATORS[name]
+
+
+def bench_eval(backend: str, boards: Sequence[Board], min_time: float = 0.2) -> float:
+    """Static evaluations per second over boards (the eval cache is emptied before each call)."""
+    evaluate = _evaluator(backend)
+    n = 0
+    start = time.perf_counter()
+    while True:
+        for b in boards:
+            ai.EVAL_CACHE.clear()
+            evaluate(b, 1)
+        n += len(boards)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return n / elapsed
+
+
+def bench_search(backend: str, board: Board, player: int, depth: int) -> Dict:
+    """Fixed-depth searches 1..depth on a fresh engine: time to each depth, nodes/sec, TT hit rate."""
+    return _time_searches(ai.Engine(evaluator=backend), board, player, depth)
+
+
+def bench_core(core: str, board: Board, player: int, depth: int) -> Dict:
+    """bench_search on a fresh engine of search core core ('python' or one of ai.SEARCH_CORES)."""
+    engine = ai.Engine() if core == 'python' else ai.NativeEngine(core)
+    return _time_searches(engine, board, player, depth)
+
+
+def _time_searches(engine, board: Board, player: int, depth: int) -> Dict:
+    ai.EVAL_CACHE.clear()
+    times = []
+    scores = []
+    total = 0.0
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        res = engine.search(board, player, depth=d)
+        total += time.perf_counter() - start
+        times.append(total)
+        scores.append(res.score)
+    tt = engine.tt
+    return {
+        'time_to_depth': times,
+        'scores': scores,
+        'move': list(res.move) if res.move else None,
+        'nodes': engine.nodes,
+        'nodes_per_sec': engine.nodes / total if total else 0.0,
+        'tt_hit_rate': tt.hits / tt.probes if tt.probes else 0.0,
+    }
+
+
+def parity(boards: Dict[str, Board], names: Sequence[str]) -> Dict[str, List[str]]:
+    """Positions on which each backend's evaluation differs from the Python evaluator."""
+    out = {}
+    for backend in names:
+        evaluate = _evaluator(backend)
+        bad = []
+        for pos, b in boards.items():
+            ai.EVAL_CACHE.clear()
+            ref = ai._py_evaluate_board(b, 1)
+            ai.EVAL_CACHE.clear()
+            if int(evaluate(b, 1)) != ref:
+                bad.append(pos)
+        out[backend] = bad
+    return out
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(depth: int = 3, names: Optional[Sequence[str]] = None, min_time: float = 0.2,
+        core_names: Optional[Sequence[str]] = None) -> Dict:
+    names = list(names or backends())
+    core_names = list(core_names or cores())
+    boards = positions()
+    report = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'depth': depth,
+        'positions': sorted(boards),
+        'parity': parity(boards, names),
+        'backends': {},
+        'cores': {},
+    }
+    # searches skip the threat solver and book, which do not depend on the backend
+    for backend in names:
+        _evaluator(backend)(boards['opening'], 1)  # JIT compilation is not part of the timings
+        searches = {pos: bench_search(backend, b, _to_move(pos, b), depth) for pos, b in boards.items()}
+        nodes = sum(s['nodes'] for s in searches.values())
+        secs = sum(s['time_to_depth'][-1] for s in searches.values())
+        report['backends'][backend] = {
+            'evals_per_sec': bench_eval(backend, list(boards.values()), min_time),
+            'nodes_per_sec': nodes / secs if secs else 0.0,
+            'searches': searches,
+        }
+    for core in core_names:
+        bench_core(core, boards['opening'], 1, 1)  # nor is loading a compiled core
+        searches = {pos: bench_core(core, b, _to_move(pos, b), depth) for pos, b in boards.items()}
+        nodes = sum(s['nodes'] for s in searches.values())
+        secs = sum(s['time_to_depth'][-1] for s in searches.values())
+        report['cores'][core] = {'nodes_per_sec': nodes / secs if secs else 0.0, 'searches': searches}
+    return report
+
+
+def format_report(report: Dict) -> str:
+    lines = ['commit {}  python {}  depth {}'.format(report['commit'], report['python'], report['depth'])]
+    for name, r in report['backends'].items():
+        ttd = sum(s['time_to_depth'][-1] for s in r['searches'].values())
+        hit = sum(s['tt_hit_rate'] for s in r['searches'].values()) / len(r['searches'])
+        mismatch = report['parity'].get(name)
+        lines.append('{:8s} {:10.0f} evals/s {:10.0f} nodes/s  depth {} in {:.2f}s  TT hits {:.0%}{}'.format(
+            name, r['evals_per_sec'], r['nodes_per_sec'], report['depth'], ttd, hit,
+            '  MISMATCH: ' + ', '.join(mismatch) if mismatch else ''))
+    ref = report.get('cores', {}).get('python')
+    for name, r in report.get('cores', {}).items():
+        ttd = sum(s['time_to_depth'][-1] for s in r['searches'].values())
+        mismatch = [pos for pos, s in r['searches'].items() if ref and s['scores'] != ref['searches'][pos]['scores']]
+        lines.append('core {:8s} {:10.0f} nodes/s  depth {} in {:.3f}s{}'.format(
+            name, r['nodes_per_sec'], report['depth'], ttd, '  MISMATCH: ' + ', '.join(mismatch) if mismatch else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m gomoku.bench', description='Evaluator and search benchmarks')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--backends', nargs='*', default=None, help='subset of: ' + ' '.join(backends()))
+    parser.add_argument('--cores', nargs='*', default=None, help='subset of: ' + ' '.join(cores()))
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per evaluator timing')
+    parser.add_argument('--out', default=None, help='write the JSON report here')
+    args = parser.parse_args(argv)
+    report = run(args.depth, args.backends, args.min_time, args.cores)
+    if args.out:
+        with open(args.out, 'w', encoding='utf8') as f:
+            json.dump(report, f, indent=2)
+    print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
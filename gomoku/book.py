@@ -0,0 +1,237 @@
+"""
+Opening book: position hash -> book moves with weights.
+
+The file is a small header followed by fixed-size records sorted by key, and
+is opened with mmap so a lookup is a binary search over the mapped bytes.
+Positions are stored in a canonical orientation (the smallest Zobrist hash
+of the 8 board symmetries), so one entry covers all mirrored and rotated
+versions of an opening.
+
+Build a book from saved games and self-play:
+
+    python -m gomoku.book build opening.book --saves "save_*.json" --selfplay 20
+"""
+import argparse
+import glob
+import mmap
+import random
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .game import Board, zobrist_keys
+
+MAGIC = b'GMKBOOK1'
+HEADER = struct.Struct('<8sHHI')   # magic, version, board size, record count
+RECORD = struct.Struct('<QHH')     # canonical key, canonical move (flat index), weight
+VERSION = 1
+BOOK_PLIES = 12  # positions deeper than this many moves are not stored
+
+
+def _transforms(size: int):
+    n = size - 1
+    return (
+        lambda x, y: (x, y),
+        lambda x, y: (n - x, y),
+        lambda x, y: (x, n - y),
+        lambda x, y: (n - x, n - y),
+        lambda x, y: (y, x),
+        lambda x, y: (n - y, x),
+        lambda x, y: (y, n - x),
+        lambda x, y: (n - y, n - x),
+    )
+
+
+# index of the inverse of each transform above (5 and 6 are the two quarter turns)
+_INVERSE = (0, 1, 2, 3, 4, 6, 5, 7)
+
+
+def canonical_key(size: int, stones: Sequence[Tuple[int, int, int]]) -> Tuple[int, int]:
+    """(key, transform) for the stones (x, y, player): smallest hash over the 8 symmetries."""
+    keys = zobrist_keys(size)
+    best = None
+    for t, f in enumerate(_transforms(size)):
+        h = 0
+        for x, y, p in stones:
+            tx, ty = f(x, y)
+            h ^= keys[(ty * size + tx) * 3 + p]
+        if best is None or h < best[0]:
+            best = (h, t)
+    return best
+
+
+class OpeningBook:
+    """Read-only view of a book file through mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError('not an opening book: {}'.format(path))
+        magic = None
+        if len(self._map) >= HEADER.size:
+            magic, version, size, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or HEADER.size + count * RECORD.size > len(self._map):
+            self.close()
+            raise ValueError('not an opening book: {}'.format(path))
+        self.size = size
+        self.count = count
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, i: int) -> int:
+        return struct.unpack_from('<Q', self._map, HEADER.size + i * RECORD.size)[0]
+
+    def _entries(self, key: int) -> List[Tuple[int, int]]:
+        # binary search for the first record with key, then read while it matches
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self.count:
+            k, move, weight = RECORD.unpack_from(self._map, HEADER.size + lo * RECORD.size)
+            if k != key:
+                break
+            out.append((move, weight))
+            lo += 1
+        return out
+
+    def lookup(self, board) -> List[Tuple[int, int, int]]:
+        """Book moves (x, y, weight) for the position on board, heaviest first."""
+        if board.size != self.size or len(board.history) > BOOK_PLIES:
+            return []
+        stones = [(x, y, p) for y, row in enumerate(board.grid) for x, p in enumerate(row) if p]
+        key, t = canonical_key(self.size, stones)
+        back = _transforms(self.size)[_INVERSE[t]]
+        out = []
+        for move, weight in self._entries(key):
+            x, y = back(move % self.size, move // self.size)
+            if board.is_valid_move(x, y):
+                out.append((x, y, weight))
+        out.sort(key=lambda e: -e[2])
+        return out
+
+    def choose(self, board, rng=random) -> Optional[Tuple[int, int]]:
+        """A book move picked with probability proportional to its weight, or None."""
+        entries = self.lookup(board)
+        if not entries:
+            return None
+        x, y, _ = rng.choices(entries, weights=[e[2] for e in entries])[0]
+        return x, y
+
+
+def collect(games: Iterable[Tuple[Sequence[Tuple[int, int, int]], Optional[int]]], size: int = 15,
+            max_plies: int = BOOK_PLIES) -> Dict[Tuple[int, int], int]:
+    """Weights per (canonical key, canonical move) from (history, winner) pairs.
+
+    Every move of the first max_plies counts 1, moves of the eventual winner 2.
+    """
+    counts = {}
+    fs = _transforms(size)
+    for history, winner in games:
+        stones = []
+        for x, y, p in list(history)[:max_plies]:
+            key, t = canonical_key(size, stones)
+            cx, cy = fs[t](x, y)
+            entry = (key, cy * size + cx)
+            counts[entry] = counts.get(entry, 0) + (2 if p == winner else 1)
+            stones.append((x, y, p))
+    return counts
+
+
+def write_book(path: str, counts: Dict[Tuple[int, int], int], size: int = 15) -> int:
+    """Write the collected weights as a book file; returns the number of records."""
+    records = sorted(counts.items(), key=lambda kv: (kv[0][0], -kv[1]))
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size, len(records)))
+        for (key, move), weight in records:
+            f.write(RECORD.pack(key, move, min(weight, 0xFFFF)))
+    return len(records)
+
+
+def _winner(history, size: int) -> Optional[int]:
+    if not history:
+        return None
+    b = Board(size)
+    b.load_history(history)
+    return b.check_win(tuple(history[-1]))[0]
+
+
+def games_from_saves(patterns: Iterable[str], size: int = 15):
+    """(history, winner) for every saved game (storage JSON) matching the glob patterns."""
+    from . import storage
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            history = [tuple(h) for h in storage.load_state(path).get('history', [])]
+            yield history, _winner(history, size)
+
+
+def selfplay_games(n: int, depth: int = 2, random_plies: int = 2, size: int = 15, seed: Optional[int] = None):
+    """(history, winner) for n AI-vs-AI games; the first random_plies moves are random near the stones."""
+    from . import ai
+    rng = random.Random(seed)
+    for _ in range(n):
+        b = Board(size)
+        ai.reset_caches()
+        player = 1
+        winner = None
+        while len(b.history) < size * size:
+            if len(b.history) < random_plies:
+                mv = rng.choice(ai._neighbors(b))
+            else:
+                mv = ai.choose_move_minimax(b, player, depth=depth)
+            if mv is None:
+                break
+            b.place_move(mv[0], mv[1], player)
+            winner = b.check_win((mv[0], mv[1], player))[0]
+            if winner is not None:
+                break
+            player = 3 - player
+        yield list(b.history), winner
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m gomoku.book', description='Opening book tools')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    build = sub.add_parser('build', help='build a book from saved games and self-play')
+    build.add_argument('out')
+    build.add_argument('--saves', nargs='*', default=[], help='glob patterns of saved JSON games')
+    build.add_argument('--selfplay', type=int, default=0, help='number of AI-vs-AI games to play')
+    build.add_argument('--depth', type=int, default=2)
+    build.add_argument('--plies', type=int, default=BOOK_PLIES)
+    build.add_argument('--seed', type=int, default=None)
+    show = sub.add_parser('show', help='print the book moves of a saved game position')
+    show.add_argument('book')
+    show.add_argument('save', nargs='?')
+    args = parser.parse_args(argv)
+    if args.cmd == 'build':
+        games = list(games_from_saves(args.saves))
+        games.extend(selfplay_games(args.selfplay, args.depth, seed=args.seed))
+        n = write_book(args.out, collect(games, max_plies=args.plies))
+        print('{} records from {} games written to {}'.format(n, len(games), args.out))
+    else:
+        book = OpeningBook(args.book)
+        b = Board(book.size)
+        if args.save:
+            from . import storage
+            b.load_history([tuple(h) for h in storage.load_state(args.save).get('history', [])])
+        for x, y, w in book.lookup(b):
+            print('({},{}) weight {}'.format(x, y, w))
+        book.close()
+
+
+if __name__ == '__main__':
+    main()
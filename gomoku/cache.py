@@ -0,0 +1,75 @@
+"""Bounded LRU cache for static evaluations."""
+from collections import OrderedDict
+from typing import Optional
+
+# rough per-entry cost of an OrderedDict slot holding an int key and int value
+ENTRY_BYTES = 160
+# with verify an entry also holds a (value, grid) tuple and the grid bytes (sized for 19x19)
+VERIFY_ENTRY_BYTES = ENTRY_BYTES + 56 + 33 + 19 * 19
+
+
+class EvalCache:
+    """LRU cache of evaluations keyed by position only.
+
+    It backs the full-scan evaluators (gomoku.ai._py_evaluate_board and the
+    compiled ones for boards without running pattern totals); searches on a
+    Board read its incrementally kept totals instead.
+
+    Values are stored from player 1's point of view; the evaluation is
+    antisymmetric (evaluate(b, 2) == -evaluate(b, 1)), so one entry serves
+    both colors.
+    """
+
+    def __init__(self, budget_mb: float = 32, verify: bool = False):
+        self.budget_mb = budget_mb
+        entry_bytes = VERIFY_ENTRY_BYTES if verify else ENTRY_BYTES
+        self.max_entries = max(1, int(budget_mb * 1024 * 1024) // entry_bytes)
+        self._data = OrderedDict()
+        # optional collision check: full position stored with each value
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.collisions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, player: int, check=None) -> Optional[int]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.verify:
+            entry, stored = entry
+            if stored != check:
+                self.collisions += 1
+                self.misses += 1
+                return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry if player == 1 else -entry
+
+    def put(self, key, player: int, value: int, check=None) -> None:
+        v1 = value if player == 1 else -value
+        data = self._data
+        data[key] = (v1, check) if self.verify else v1
+        data.move_to_end(key)
+        if len(data) > self.max_entries:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'collisions': self.collisions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -1,11 +1,115 @@
+import random
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
+from .patterns import cell_lines, flat_lines, score_line_pair
+
+ZOBRIST_SEED = 20240601  # fixed so hashes are stable across processes and runs
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> Tuple[int, ...]:
+    """64-bit random keys indexed by cell*3 + player (slot 0 of each cell unused)."""
+    rng = random.Random(ZOBRIST_SEED + size)
+    keys = []
+    for _ in range(size * size):
+        keys.extend((0, rng.getrandbits(64), rng.getrandbits(64)))
+    return tuple(keys)
+
+
+@lru_cache(maxsize=None)
+def neighbor_cells(size: int, dist: int = 2) -> Tuple[Tuple[int, ...], ...]:
+    """For each flat cell index, the flat indices of the surrounding (2*dist+1)^2 box minus the cell."""
+    out = []
+    for y in range(size):
+        for x in range(size):
+            out.append(tuple(ny * size + nx
+                             for ny in range(max(0, y - dist), min(size, y + dist + 1))
+                             for nx in range(max(0, x - dist), min(size, x + dist + 1))
+                             if (nx, ny) != (x, y)))
+    return tuple(out)
+
+
 class Board:
     def __init__(self, size: int = 15):
         self.size = size
         self.grid = [[0 for _ in range(size)] for _ in range(size)]
         self.history = []  # list of (x,y,player)
         self._redo_stack = []
+        # per-line pattern scores, refreshed for the 4 lines through each changed cell
+        self._lines = flat_lines(size)
+        self._cell_lines = cell_lines(size)
+        self._line_scores = [None, [0] * len(self._lines), [0] * len(self._lines)]
+        self._cells = [0] * (size * size)  # flat copy of grid for line lookups
+        self.pattern_totals = [0, 0, 0]  # indexed by player
+        self._zobrist = zobrist_keys(size)
+        self.hash = 0  # Zobrist hash of the stones on the board
+        # move generation: stones within distance 2 of each cell, and the empty
+        # cells with at least one such stone (flat indices)
+        self._neighbor_cells = neighbor_cells(size)
+        self.neighbor_count = [0] * (size * size)
+        self.candidates = set()
+
+    def _set_cell(self, x: int, y: int, value: int) -> None:
+        zi = (y * self.size + x) * 3
+        self.hash ^= self._zobrist[zi + self.grid[y][x]] ^ self._zobrist[zi + value]
+        self.grid[y][x] = value
+        idx = y * self.size + x
+        cells = self._cells
+        old = cells[idx]
+        cells[idx] = value
+        if not old and value:
+            counts = self.neighbor_count
+            cand = self.candidates
+            cand.discard(idx)
+            for n in self._neighbor_cells[idx]:
+                counts[n] += 1
+                if not cells[n]:
+                    cand.add(n)
+        elif old and not value:
+            counts = self.neighbor_count
+            cand = self.candidates
+            for n in self._neighbor_cells[idx]:
+                counts[n] -= 1
+                if not counts[n]:
+                    cand.discard(n)
+            if counts[idx]:
+                cand.add(idx)
+        s1, s2 = self._line_scores[1], self._line_scores[2]
+        totals = self.pattern_totals
+        for li in self._cell_lines[idx]:
+            n1, n2 = score_line_pair([cells[i] for i in self._lines[li]])
+            totals[1] += n1 - s1[li]
+            totals[2] += n2 - s2[li]
+            s1[li] = n1
+            s2[li] = n2
+
+    def evaluation(self, player: int) -> int:
+        """Pattern score of the position from player's point of view (running total)."""
+        return self.pattern_totals[player] - self.pattern_totals[3 - player]
+
+    def compute_hash(self) -> int:
+        """Zobrist hash recomputed from the grid (for checking the incremental one)."""
+        h = 0
+        for y in range(self.size):
+            for x in range(self.size):
+                h ^= self._zobrist[(y * self.size + x) * 3 + self.grid[y][x]]
+        return h
+
+    def load_history(self, history) -> None:
+        """Reset the board and replay history (list of (x,y,player))."""
+        self.__init__(self.size)
+        for x, y, player in history:
+            if self.is_valid_move(x, y):
+                self._set_cell(x, y, player)
+                self.history.append((x, y, player))
+
+    def copy(self) -> 'Board':
+        """Independent board with the same history and redo stack (same class)."""
+        other = type(self)(self.size)
+        other.load_history(self.history)
+        other._redo_stack = list(self._redo_stack)
+        return other
 
     def is_valid_move(self, x: int, y: int) -> bool:
         return 0 <= x < self.size and 0 <= y < self.size and self.grid[y][x] == 0
@@ -13,7 +117,7 @@ class Board:
     def place_move(self, x: int, y: int, player: int) -> bool:
         if not self.is_valid_move(x, y):
             return False
-        self.grid[y][x] = player
+        self._set_cell(x, y, player)
         self.history.append((x, y, player))
         self._redo_stack.clear()
         return True
@@ -22,7 +126,7 @@ class Board:
         if not self.history:
             return None
         x,y,player = self.history.pop()
-        self.grid[y][x] = 0
+        self._set_cell(x, y, 0)
         self._redo_stack.append((x,y,player))
         return (x,y,player)
 
@@ -30,7 +134,7 @@ class Board:
         if not self._redo_stack:
             return None
         x,y,player = self._redo_stack.pop()
-        self.grid[y][x] = player
+        self._set_cell(x, y, player)
         self.history.append((x,y,player))
         return (x,y,player)
 
@@ -1,4 +1,14 @@
-def main():
+import argparse
+
+from . import profiling
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='gomoku', description='Gomoku with an AI opponent')
+    profiling.add_arguments(parser)
+    # unknown options belong to wrappers such as gomoku_launcher.py
+    args, _ = parser.parse_known_args(argv)
+    profiling.configure(args)
     try:
         from .ui import run_ui
     except Exception as e:
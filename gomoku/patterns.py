@@ -0,0 +1,150 @@
+"""Line geometry and pattern scoring shared by the board and the evaluators."""
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# pattern weights (same values the evaluator has always used)
+FIVE = 100000
+OPEN_FOUR = 10000
+FOUR = 1000
+OPEN_THREE = 500
+THREE = 100
+OPEN_TWO = 10
+
+# lines are scored through 6-cell windows encoded in base 4
+WINDOW = 6
+CODE_MASK = 4 ** WINDOW - 1
+OFF = 3  # cell value for "past the end of the line"
+
+
+@lru_cache(maxsize=None)
+def board_lines(size: int) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """All lines of a size x size board as tuples of (x, y).
+
+    Order: rows, columns, main diagonals, anti-diagonals (the order the
+    full-board evaluator has always walked them in).
+    """
+    lines = []
+    for y in range(size):
+        lines.append(tuple((x, y) for x in range(size)))
+    for x in range(size):
+        lines.append(tuple((x, y) for y in range(size)))
+    for k in range(-size + 1, size):
+        lines.append(tuple((y - k, y) for y in range(size) if 0 <= y - k < size))
+    for k in range(0, 2 * size - 1):
+        lines.append(tuple((k - y, y) for y in range(size) if 0 <= k - y < size))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=None)
+def cell_lines(size: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    """For each flat cell index y*size+x, the indices of its row, column, diagonal and anti-diagonal."""
+    ndiag = 2 * size - 1
+    out = []
+    for y in range(size):
+        for x in range(size):
+            row = y
+            col = size + x
+            diag = 2 * size + (y - x) + size - 1
+            adiag = 2 * size + ndiag + (x + y)
+            out.append((row, col, diag, adiag))
+    return tuple(out)
+
+
+def _window_score(cells: Sequence[int], p: int) -> int:
+    """Score of the patterns anchored at the first cell of a 6-cell window.
+
+    OFF marks cells past the end of the (zero-padded) line; patterns
+    that would reach them do not count.
+    """
+    c0, c1, c2, c3, c4, c5 = cells
+    if OFF in (c0, c1, c2, c3):
+        return 0
+    s = 0
+    # 4-cell patterns
+    n4 = (c0 == p) + (c1 == p) + (c2 == p) + (c3 == p)
+    if n4 == 3 and not (c0 == 0 and c3 == 0):
+        s += THREE
+    if c0 == 0 and c3 == 0 and c1 == p and c2 == p:
+        s += OPEN_TWO
+    if c4 == OFF:
+        return s
+    # 5-cell patterns
+    n5 = n4 + (c4 == p)
+    if n5 == 5:
+        s += FIVE
+    elif n5 == 4:
+        s += FOUR
+    if c0 == 0 and c4 == 0 and c1 == p and c2 == p and c3 == p:
+        s += OPEN_THREE
+    # 6-cell pattern
+    if c0 == 0 and c5 == 0 and n5 == 4:
+        s += OPEN_FOUR
+    return s
+
+
+def _build_pattern_tables() -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+    tables = [(), [], []]
+    for code in range(4 ** WINDOW):
+        cells = [(code >> (2 * (WINDOW - 1 - k))) & 3 for k in range(WINDOW)]
+        for p in (1, 2):
+            tables[p].append(_window_score(cells, p))
+    return tables[0], tuple(tables[1]), tuple(tables[2])
+
+
+# PATTERN_TABLES[p][code]: score for player p of the window whose cells are
+# the base-4 digits of code (first cell most significant)
+PATTERN_TABLES = _build_pattern_tables()
+
+
+def score_line_pair(line: Sequence[int]) -> Tuple[int, int]:
+    """Pattern scores (player 1, player 2) of one line, via table lookups."""
+    t1 = PATTERN_TABLES[1]
+    t2 = PATTERN_TABLES[2]
+    s1 = s2 = 0
+    code = 0  # starts with the leading zero pad
+    for v in line:
+        code = (code << 2) | v
+    code = (code << 6) | (OFF << 2) | OFF  # trailing zero pad, then two OFF cells
+    # code holds len(line)+4 digits; slide a 6-digit window over it
+    for shift in range(2 * (len(line) - 2), -2, -2):
+        w = (code >> shift) & CODE_MASK
+        s1 += t1[w]
+        s2 += t2[w]
+    return s1, s2
+
+
+@lru_cache(maxsize=None)
+def flat_lines(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """board_lines(size) as flat cell indices y*size+x."""
+    return tuple(tuple(y * size + x for x, y in line) for line in board_lines(size))
+
+
+@lru_cache(maxsize=None)
+def line_index_array(size: int):
+    """NumPy view of the line geometry for vectorised and numba evaluators.
+
+    Returns an int32 array of shape (n_lines, size + 4) indexing a flat board
+    extended with two extra cells: size*size holds the zero pad and
+    size*size + 1 holds OFF. Each row is pad, line cells, pad, then OFF up to
+    the full width, so every 6-cell window of every row can be looked up in
+    PATTERN_TABLES without bounds checks.
+    """
+    import numpy as np
+    pad, off = size * size, size * size + 1
+    lines = flat_lines(size)
+    out = np.full((len(lines), size + 4), off, dtype=np.int32)
+    for i, line in enumerate(lines):
+        out[i, 0] = pad
+        out[i, 1:len(line) + 1] = line
+        out[i, len(line) + 1] = pad
+    return out
+
+
+@lru_cache(maxsize=None)
+def pattern_table_array():
+    """PATTERN_TABLES as an int32 array of shape (3, 4**WINDOW); row 0 is unused."""
+    import numpy as np
+    out = np.zeros((3, CODE_MASK + 1), dtype=np.int32)
+    out[1] = PATTERN_TABLES[1]
+    out[2] = PATTERN_TABLES[2]
+    return out
@@ -0,0 +1,168 @@
+"""
+Profiling of AI searches only (not the UI loop or game setup).
+
+When ai.PROFILER is set, every search_position call runs inside
+PROFILER.profile(label) and leaves per-move files in the output directory:
+
+- mode 'cprofile': <label>.pstats (open with pstats or snakeviz) and
+  <label>.collapsed, stacks reconstructed from the call graph;
+- mode 'sample': <label>.collapsed from a sampling thread that records the
+  searching thread's stack every interval seconds; low overhead, suited
+  to long sessions.
+
+Collapsed files hold one 'frame;frame;frame count' line per stack, the
+input format of flamegraph.pl and speedscope.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+MODES = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.005
+# call-graph stacks below this share of the total time are dropped
+MIN_STACK_SHARE = 0.001
+
+
+def _frame_name(filename: str, lineno: int, func: str) -> str:
+    return '{}:{}:{}'.format(os.path.basename(filename), lineno, func)
+
+
+class _Sampler:
+    """Counts the stacks of one thread, sampled from a daemon thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(_frame_name(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if names:
+                stack = ';'.join(reversed(names))
+                self.counts[stack] = self.counts.get(stack, 0) + 1
+
+
+def collapsed_from_stats(stats: pstats.Stats, unit: float = 1e-6) -> Dict[str, int]:
+    """Collapsed stacks (in units of `unit` seconds) rebuilt from a cProfile call graph.
+
+    cProfile keeps caller -> callee edges, not whole stacks, so each function's
+    own time is spread over its callers in proportion to the time spent under
+    each of them (the approach of flameprof). Recursion is cut at the first
+    repeat of a function on the path.
+    """
+    raw = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    total = sum(entry[2] for entry in raw.values()) or 1.0
+    out = {}
+
+    def walk(func, share: float, path: Tuple[str, ...], seen) -> None:
+        cc, nc, tt, ct, _ = raw[func]
+        name = _frame_name(*func)
+        path = path + (name,)
+        own = tt * share
+        if own / total >= MIN_STACK_SHARE / 10:
+            key = ';'.join(path)
+            out[key] = out.get(key, 0) + int(own / unit)
+        for callee, edge_ct in callees.get(func, ()):
+            if callee in seen or callee not in raw:
+                continue
+            callee_ct = raw[callee][3]
+            if not callee_ct:
+                continue
+            sub = share * min(1.0, edge_ct / callee_ct)
+            if raw[callee][3] * sub / total >= MIN_STACK_SHARE:
+                walk(callee, sub, path, seen | {callee})
+
+    for func, entry in raw.items():
+        if not entry[4]:  # no callers inside the profile: a root
+            walk(func, 1.0, (), {func})
+    return {k: v for k, v in out.items() if v > 0}
+
+
+def write_collapsed(path: str, counts: Dict[str, int]) -> None:
+    with open(path, 'w', encoding='utf8') as f:
+        for stack, n in sorted(counts.items()):
+            f.write('{} {}\n'.format(stack, n))
+
+
+class SearchProfiler:
+    """Writes one profile per AI search into out_dir (see module docstring)."""
+
+    def __init__(self, out_dir: str, mode: str = 'cprofile', interval: float = SAMPLE_INTERVAL):
+        if mode not in MODES:
+            raise ValueError('profile mode must be one of {}'.format(', '.join(MODES)))
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.mode = mode
+        self.interval = interval
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _next_label(self, label: str) -> str:
+        with self._lock:
+            self.count += 1
+            return '{:04d}_{}'.format(self.count, label)
+
+    @contextmanager
+    def profile(self, label: str = 'search'):
+        base = os.path.join(self.out_dir, self._next_label(label))
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                prof.dump_stats(base + '.pstats')
+                write_collapsed(base + '.collapsed', collapsed_from_stats(pstats.Stats(prof)))
+        else:
+            sampler = _Sampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                write_collapsed(base + '.collapsed', sampler.stop())
+        with open(os.path.join(self.out_dir, 'index.txt'), 'a', encoding='utf8') as f:
+            f.write('{} {:.3f}s\n'.format(os.path.basename(base), time.perf_counter() - start))
+
+
+def add_arguments(parser) -> None:
+    """--profile/--profile-mode/--sample-interval options for a command-line entry point."""
+    parser.add_argument('--profile', nargs='?', const='profiles', default=None, metavar='DIR',
+                        help='profile every AI search into DIR (default: ./profiles)')
+    parser.add_argument('--profile-mode', choices=MODES, default='cprofile',
+                        help='cprofile: pstats + collapsed stacks per move; sample: low-overhead sampling')
+    parser.add_argument('--sample-interval', type=float, default=SAMPLE_INTERVAL, metavar='SECONDS')
+
+
+def configure(args) -> None:
+    """Install the profiler requested by add_arguments' options on gomoku.ai."""
+    if args.profile:
+        from . import ai
+        ai.PROFILER = SearchProfiler(args.profile, args.profile_mode, args.sample_interval)
+        print('Profiling AI searches into {} ({})'.format(args.profile, args.profile_mode))
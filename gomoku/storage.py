@@ -1,5 +1,7 @@
 import json
-from typing import Any
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 def save_state(path: str, state: Any) -> None:
     with open(path, 'w', encoding='utf8') as f:
@@ -8,3 +10,217 @@ def save_state(path: str, state: Any) -> None:
 def load_state(path: str) -> Any:
     with open(path, 'r', encoding='utf8') as f:
         return json.load(f)
+
+
+# Binary game records: header (magic, version, board size, result), JSON
+# metadata, then the moves as varints of flat_index * 2 + (player - 1).
+# The grid is not stored; it is rebuilt from the history.
+RECORD_MAGIC = b'GMKR'
+RECORD_VERSION = 1
+RESULT_UNKNOWN = 0  # 1 or 2: that player won
+RESULT_DRAW = 3
+_RECORD_HEADER = struct.Struct('<4sBBB')  # magic, version, size, result
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(data, pos: int) -> Tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def encode_record(history, size: int = 15, result: int = RESULT_UNKNOWN, meta: Optional[Dict] = None) -> bytes:
+    """Binary record of a game: history of (x, y, player), result and optional metadata."""
+    out = bytearray(_RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, size, result))
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf8') if meta else b''
+    _put_varint(out, len(meta_bytes))
+    out += meta_bytes
+    _put_varint(out, len(history))
+    for x, y, player in history:
+        _put_varint(out, (y * size + x) * 2 + player - 1)
+    return bytes(out)
+
+
+def decode_record(data) -> Dict[str, Any]:
+    """Inverse of encode_record: dict with size, result, meta and history."""
+    magic, version, size, result = _RECORD_HEADER.unpack_from(data, 0)
+    if magic != RECORD_MAGIC or version != RECORD_VERSION:
+        raise ValueError('not a game record')
+    pos = _RECORD_HEADER.size
+    n, pos = _get_varint(data, pos)
+    meta = json.loads(bytes(data[pos:pos + n]).decode('utf8')) if n else {}
+    pos += n
+    count, pos = _get_varint(data, pos)
+    history = []
+    for _ in range(count):
+        code, pos = _get_varint(data, pos)
+        cell, p = divmod(code, 2)
+        history.append((cell % size, cell // size, p + 1))
+    return {'size': size, 'result': result, 'meta': meta, 'history': history}
+
+
+def save_record(path: str, history, size: int = 15, result: int = RESULT_UNKNOWN, meta: Optional[Dict] = None) -> None:
+    with open(path, 'wb') as f:
+        f.write(encode_record(history, size, result, meta))
+
+
+def load_record(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        return decode_record(f.read())
+
+
+def _grid_from_history(history, size: int) -> List[List[int]]:
+    grid = [[0] * size for _ in range(size)]
+    for x, y, player in history:
+        grid[y][x] = player
+    return grid
+
+
+def record_from_state(state: Dict[str, Any], size: int = 15) -> Dict[str, Any]:
+    """Record dict from a save_state JSON dict; everything but grid and history goes to meta."""
+    grid = state.get('grid')
+    if grid:
+        size = len(grid)
+    meta = {k: v for k, v in state.items() if k not in ('grid', 'history', 'result')}
+    return {'size': size, 'result': state.get('result', RESULT_UNKNOWN), 'meta': meta,
+            'history': [tuple(h) for h in state.get('history', [])]}
+
+
+def state_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """save_state JSON dict from a record dict, with the grid rebuilt from the history."""
+    state = dict(record.get('meta') or {})
+    state['history'] = [list(h) for h in record['history']]
+    state['grid'] = _grid_from_history(record['history'], record['size'])
+    if record.get('result'):
+        state['result'] = record['result']
+    return state
+
+
+def import_json(path: str) -> Dict[str, Any]:
+    """Read a JSON save file as a record dict."""
+    return record_from_state(load_state(path))
+
+
+def export_json(path: str, record: Dict[str, Any]) -> None:
+    """Write a record dict as a JSON save file that load_state and the UI understand."""
+    save_state(path, state_from_record(record))
+
+
+class GameArchive:
+    """Append-only file of game records with an offset index for random access.
+
+    The archive holds varint-length-prefixed records; path + '.idx' holds one
+    little-endian uint64 offset per record. The index is only ever derived from
+    the archive, so when the two disagree (e.g. a crash between the writes)
+    it is rebuilt by scanning, and a torn last record is cut off.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + '.idx'
+        self._offsets = self._load_index()
+
+    def _load_index(self) -> List[int]:
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        offsets = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                raw = f.read()
+            n = len(raw) // 8
+            offsets = list(struct.unpack('<{}Q'.format(n), raw[:n * 8]))
+        end = self._record_end(offsets[-1]) if offsets else 0
+        if end != size:
+            offsets = self._scan()
+            self._write_index(offsets)
+        return offsets
+
+    def _record_end(self, offset: int) -> Optional[int]:
+        # end offset of the record starting at offset, None if the archive is shorter
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            head = f.read(10)
+        try:
+            n, pos = _get_varint(head, 0)
+        except IndexError:
+            return None
+        return offset + pos + n
+
+    def _scan(self) -> List[int]:
+        offsets = []
+        if not os.path.exists(self.path):
+            return offsets
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        pos = 0
+        while pos < len(data):
+            try:
+                n, start = _get_varint(data, pos)
+            except IndexError:
+                break
+            if start + n > len(data):
+                break
+            offsets.append(pos)
+            pos = start + n
+        if pos != len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(pos)
+        return offsets
+
+    def _write_index(self, offsets: List[int]) -> None:
+        with open(self.index_path, 'wb') as f:
+            f.write(struct.pack('<{}Q'.format(len(offsets)), *offsets))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, history, size: int = 15, result: int = RESULT_UNKNOWN, meta: Optional[Dict] = None) -> int:
+        """Add a game; returns its index."""
+        body = encode_record(history, size, result, meta)
+        prefix = bytearray()
+        _put_varint(prefix, len(body))
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(bytes(prefix) + body)
+        with open(self.index_path, 'ab') as f:
+            f.write(struct.pack('<Q', offset))
+        self._offsets.append(offset)
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        offset = self._offsets[i]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            head = f.read(10)
+            n, pos = _get_varint(head, 0)
+            f.seek(offset + pos)
+            return decode_record(f.read(n))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Stream the records in order without loading the archive."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                offset = f.tell()
+                head = f.read(10)
+                try:
+                    n, pos = _get_varint(head, 0)
+                except IndexError:  # end of the archive, or a torn length prefix
+                    return
+                f.seek(offset + pos)
+                body = f.read(n)
+                if len(body) < n:  # torn last record
+                    return
+                yield decode_record(body)
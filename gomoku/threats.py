@@ -0,0 +1,340 @@
+"""
+Threat-space search: forced wins by continuous fours (VCF) and by continuous
+threats (VCT, fours and open threes).
+Only threat moves of the attacker and the forced replies of the defender are
+expanded, so these narrow trees reach much deeper than the full-width search.
+"""
+import time
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+OFF = 3  # value of cells outside the board in a line segment
+
+VCF_DEPTH = 12        # attacker moves in a VCF sequence
+VCT_DEPTH = 4         # attacker threat moves in a VCT sequence
+VCT_NODE_LIMIT = 2000
+
+_DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+class _Budget(Exception):
+    """Raised when a solver runs out of nodes."""
+
+
+@lru_cache(maxsize=None)
+def _segment_index(size: int) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """Per flat cell, per direction: flat indices of the 9 cells centred on it (size*size when off-board)."""
+    off = size * size
+    out = []
+    for y in range(size):
+        for x in range(size):
+            per_dir = []
+            for dx, dy in _DIRECTIONS:
+                idx = []
+                for k in range(-4, 5):
+                    cx, cy = x + k * dx, y + k * dy
+                    idx.append(cy * size + cx if 0 <= cx < size and 0 <= cy < size else off)
+                per_dir.append(tuple(idx))
+            out.append(tuple(per_dir))
+    return tuple(out)
+
+
+def _flat_cells(board) -> List[int]:
+    # flat copy of the grid with one trailing OFF cell for off-board lookups
+    cells = getattr(board, '_cells', None)
+    if cells is not None:
+        return cells + [OFF]
+    return [v for row in board.grid for v in row] + [OFF]
+
+
+def _candidates(board) -> List[int]:
+    size = board.size
+    cand = getattr(board, 'candidates', None)
+    if cand is not None:
+        return sorted(cand)
+    grid = board.grid
+    out = []
+    for y in range(size):
+        for x in range(size):
+            if grid[y][x] == 0 and any(
+                    grid[ny][nx] != 0
+                    for ny in range(max(0, y - 2), min(size, y + 3))
+                    for nx in range(max(0, x - 2), min(size, x + 3))):
+                out.append(y * size + x)
+    return out
+
+
+def _segment_level(seg: List[int], p: int) -> int:
+    """Shape p gets on one 9-cell segment by playing its (empty) centre: 5, 4, 3 or 0."""
+    if seg.count(p) < 2:
+        return 0
+    seg[4] = p
+    run = 1
+    k = 3
+    while k >= 0 and seg[k] == p:
+        run += 1
+        k -= 1
+    k = 5
+    while k <= 8 and seg[k] == p:
+        run += 1
+        k += 1
+    if run >= 5:
+        return 5
+    # four: a 5-window through the centre with 4 stones and 1 empty
+    for s in range(0, 5):
+        w = seg[s:s + 5]
+        if w.count(p) == 4 and w.count(0) == 1:
+            return 4
+    # open three: a 6-window through the centre that becomes 0pppp0 with one more stone
+    for s in range(0, 4):
+        if seg[s] == 0 and seg[s + 5] == 0:
+            inner = seg[s + 1:s + 5]
+            if inner.count(p) == 3 and inner.count(0) == 1:
+                return 3
+    return 0
+
+
+def _classify(cells: List[int], segs, i: int, p: int) -> Tuple[int, int]:
+    """(level, lines) for p playing the empty flat cell i.
+
+    level is the strongest shape made (5 five, 4 four, 3 open three, 0 none),
+    lines the number of directions with at least an open three.
+    """
+    best = 0
+    lines = 0
+    for idx in segs[i]:
+        level = _segment_level([cells[j] for j in idx], p)
+        if level == 5:
+            return 5, 1
+        if level:
+            lines += 1
+            if level > best:
+                best = level
+    return best, lines
+
+
+def _line_cells(cells: List[int], segs, i: int, p: int, size: int, three: bool) -> List[Tuple[int, int]]:
+    # empties of the fours (three=False) or open threes (three=True) through p's stone at flat cell i
+    out = []
+    for idx in segs[i]:
+        seg = [cells[j] for j in idx]
+        if three:
+            for s in range(0, 4):
+                if seg[s] == 0 and seg[s + 5] == 0:
+                    inner = seg[s + 1:s + 5]
+                    if inner.count(p) == 3 and inner.count(0) == 1:
+                        for j in range(s, s + 6):
+                            if seg[j] == 0:
+                                c = (idx[j] % size, idx[j] // size)
+                                if c not in out:
+                                    out.append(c)
+        else:
+            for s in range(0, 5):
+                w = seg[s:s + 5]
+                if w.count(p) == 4 and w.count(0) == 1:
+                    j = idx[s + w.index(0)]
+                    c = (j % size, j // size)
+                    if c not in out:
+                        out.append(c)
+    return out
+
+
+def _four_gains(board, x: int, y: int, p: int) -> List[Tuple[int, int]]:
+    """Empty cells where p makes five, on lines through p's stone at (x, y)."""
+    return _line_cells(_flat_cells(board), _segment_index(board.size), y * board.size + x, p, board.size, False)
+
+
+def _three_defenses(board, x: int, y: int, p: int) -> List[Tuple[int, int]]:
+    """Cells that break the open threes through p's stone at (x, y)."""
+    return _line_cells(_flat_cells(board), _segment_index(board.size), y * board.size + x, p, board.size, True)
+
+
+def classify_move(board, x: int, y: int, p: int) -> int:
+    """Shape p gets by playing the empty cell (x, y): 5 five, 4 four, 3 open three, 0 none."""
+    return _classify(_flat_cells(board), _segment_index(board.size), y * board.size + x, p)[0]
+
+
+def _scan(board, p: int, min_level: int) -> List[Tuple[int, int, int, int]]:
+    # (x, y, level, lines) for every candidate reaching min_level, multi-line threats first
+    size = board.size
+    cells = _flat_cells(board)
+    segs = _segment_index(size)
+    out = []
+    for i in _candidates(board):
+        level, lines = _classify(cells, segs, i, p)
+        if level >= min_level:
+            out.append((i % size, i // size, level, lines))
+    out.sort(key=lambda t: (-t[2], -t[3]))
+    return out
+
+
+def winning_moves(board, p: int) -> List[Tuple[int, int]]:
+    """Empty cells where p completes five."""
+    return [(x, y) for (x, y, _, _) in _scan(board, p, 5)]
+
+
+def threat_moves(board, p: int, min_level: int = 4) -> List[Tuple[int, int, int]]:
+    """(x, y, level) for moves giving p a shape of at least min_level, strongest first."""
+    return [t[:3] for t in _scan(board, p, min_level)]
+
+
+class ThreatSolver:
+    """Depth-, node- and time-limited VCF/VCT solver working on a Board in place.
+
+    cancel is an optional threading.Event that stops the solver once set.
+    Threat scans are memoised per position (Zobrist hash) and VCF failures
+    per position and depth, since forcing lines transpose a lot.
+    """
+
+    def __init__(self, board, vcf_depth: int = VCF_DEPTH, vct_depth: int = VCT_DEPTH,
+                 node_limit: int = VCT_NODE_LIMIT, time_limit_ms: Optional[int] = None, cancel=None):
+        self.board = board
+        self.vcf_depth = vcf_depth
+        self.vct_depth = vct_depth
+        self.node_limit = node_limit
+        self.deadline = None if time_limit_ms is None else time.perf_counter() + time_limit_ms / 1000.0
+        self.cancel = cancel
+        self.nodes = 0
+        self._scans = {}
+        self._vcf_failed = {}
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise _Budget()
+        # every node runs threat scans, so the clock is cheap to read each time
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _Budget()
+        if self.cancel is not None and self.cancel.is_set():
+            raise _Budget()
+
+    def _threats(self, p: int) -> List[Tuple[int, int, int, int]]:
+        key = getattr(self.board, 'hash', None)
+        if key is None:
+            return _scan(self.board, p, 3)
+        key = (key, p)
+        found = self._scans.get(key)
+        if found is None:
+            found = self._scans[key] = _scan(self.board, p, 3)
+        return found
+
+    def _forced_block(self, p: int):
+        """None if the opponent threatens nothing, else the single block cell or False when lost."""
+        opp_wins = [(x, y) for (x, y, lv, _) in self._threats(3 - p) if lv == 5]
+        if not opp_wins:
+            return None
+        if len(opp_wins) > 1:
+            return False
+        return opp_wins[0]
+
+    def vcf(self, p: int, depth: int) -> Optional[List[Tuple[int, int]]]:
+        """Winning line of fours for p (p to move), or None."""
+        self._tick()
+        board = self.board
+        threats = self._threats(p)
+        if threats and threats[0][2] == 5:
+            return [threats[0][:2]]
+        if depth <= 0:
+            return None
+        key = getattr(board, 'hash', None)
+        if key is not None and self._vcf_failed.get((key, p), -1) >= depth:
+            return None
+        block = self._forced_block(p)
+        if block is False:
+            return None
+        if block is None:
+            moves = [(x, y) for (x, y, lv, _) in threats if lv == 4]
+        elif any((x, y) == block and lv >= 4 for (x, y, lv, _) in threats):
+            moves = [block]
+        else:
+            return None
+        for (mx, my) in moves:
+            board.place_move(mx, my, p)
+            gains = _four_gains(board, mx, my, p)
+            line = None
+            if len(gains) >= 2:
+                line = [(mx, my)]
+            elif gains:
+                gx, gy = gains[0]
+                board.place_move(gx, gy, 3 - p)
+                won, _ = board.check_win((gx, gy, 3 - p))
+                if won is None:
+                    rest = self.vcf(p, depth - 1)
+                    if rest is not None:
+                        line = [(mx, my), (gx, gy)] + rest
+                board.undo()
+            board.undo()
+            if line is not None:
+                return line
+        if key is not None:
+            self._vcf_failed[(key, p)] = depth
+        return None
+
+    def vct(self, p: int, depth: int) -> Optional[List[Tuple[int, int]]]:
+        """Winning line of threats for p (p to move), or None. The line follows the first defence tried."""
+        line = self.vcf(p, self.vcf_depth)
+        if line is not None or depth <= 0:
+            return line
+        board = self.board
+        if self._forced_block(p) is not None:
+            # answering the opponent's four is all p may do; vcf already tried it as a four
+            return None
+        # double threats first; plain fours were already covered by vcf, so they go after threes
+        moves = sorted(self._threats(p), key=lambda t: (-t[3], t[2]))
+        for (mx, my, level, _) in moves:
+            self._tick()
+            board.place_move(mx, my, p)
+            if level >= 4:
+                defenses = _four_gains(board, mx, my, p)[:2]
+                if len(defenses) >= 2:
+                    board.undo()
+                    return [(mx, my)]
+            else:
+                defenses = _three_defenses(board, mx, my, p)
+                # a counter-four also answers a three
+                for (x, y, lv, _) in self._threats(3 - p):
+                    if lv >= 4 and (x, y) not in defenses:
+                        defenses.append((x, y))
+            main = None
+            for (dx_, dy_) in defenses:
+                board.place_move(dx_, dy_, 3 - p)
+                won, _ = board.check_win((dx_, dy_, 3 - p))
+                rest = None if won is not None else self.vct(p, depth - 1)
+                board.undo()
+                if rest is None:
+                    main = None
+                    break
+                if main is None:
+                    main = [(mx, my), (dx_, dy_)] + rest
+            board.undo()
+            if main is not None:
+                return main
+        return None
+
+
+def find_vcf(board, p: int, depth: int = VCF_DEPTH, node_limit: int = VCT_NODE_LIMIT,
+             time_limit_ms: Optional[int] = None, cancel=None) -> Optional[List[Tuple[int, int]]]:
+    """Victory by continuous fours for p (p to move): the move sequence, or None."""
+    solver = ThreatSolver(board, vcf_depth=depth, node_limit=node_limit, time_limit_ms=time_limit_ms, cancel=cancel)
+    return _run(board, lambda: solver.vcf(p, depth))
+
+
+def find_vct(board, p: int, depth: int = VCT_DEPTH, node_limit: int = VCT_NODE_LIMIT,
+             time_limit_ms: Optional[int] = None, cancel=None) -> Optional[List[Tuple[int, int]]]:
+    """Victory by continuous threats for p (p to move): the move sequence, or None."""
+    solver = ThreatSolver(board, vct_depth=depth, node_limit=node_limit, time_limit_ms=time_limit_ms, cancel=cancel)
+    return _run(board, lambda: solver.vct(p, depth))
+
+
+def _run(board, solve):
+    n_history = len(board.history)
+    redo = list(board._redo_stack)
+    try:
+        return solve()
+    except _Budget:
+        return None
+    finally:
+        # a budget abort leaves solver moves on the board
+        while len(board.history) > n_history:
+            board.undo()
+        board._redo_stack[:] = redo
@@ -0,0 +1,251 @@
+"""
+Headless self-play tournaments between engine configurations.
+
+Games run in parallel on a process pool. Every random opening is played
+twice with colours swapped, games stop early once one side has a forced win
+(or at a move limit, as a draw), and each finished game is written as one
+JSON line as soon as it comes in. The report gives the score and Elo
+difference with a 95% error bar per pairing, plus games/sec and nodes/sec.
+
+    python -m gomoku.tournament --engine d2:depth=2 --engine d3:depth=3 --games 200 --workers 4
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import ai
+from .game import Board
+from .storage import GameArchive, RESULT_DRAW
+
+OPENING_PLIES = 4
+OPENING_MAX_EVAL = 150  # openings whose static evaluation is further off than this are redrawn
+MAX_PLIES = 150         # adjudicated as a draw after this many moves
+TOURNAMENT_TT_MB = 4    # per engine and game
+
+
+class EngineConfig(NamedTuple):
+    name: str
+    depth: int = 2
+    time_limit_ms: Optional[int] = None
+    evaluator: str = 'auto'   # key of ai.EVALUATORS, or 'auto'
+    core: str = 'python'      # 'python' (ai.Engine) or a key of ai.SEARCH_CORES (ai.NativeEngine)
+
+
+def parse_engine(spec: str) -> EngineConfig:
+    """EngineConfig from 'name:depth=3,time=500,eval=python,core=cython'."""
+    name, _, opts = spec.partition(':')
+    kwargs = {}
+    for opt in filter(None, opts.split(',')):
+        k, _, v = opt.partition('=')
+        if k == 'depth':
+            kwargs['depth'] = int(v)
+        elif k == 'time':
+            kwargs['time_limit_ms'] = int(v)
+        elif k == 'eval':
+            kwargs['evaluator'] = v
+        elif k == 'core':
+            kwargs['core'] = v
+        else:
+            raise ValueError('unknown engine option: {}'.format(k))
+    return EngineConfig(name, **kwargs)
+
+
+def balanced_openings(n: int, plies: int = OPENING_PLIES, size: int = 15, seed: Optional[int] = None) -> List[List[Tuple[int, int, int]]]:
+    """n random openings near the centre, each roughly level by static evaluation."""
+    rng = random.Random(seed)
+    center = size // 2
+    out = []
+    while len(out) < n:
+        b = Board(size)
+        player = 1
+        for _ in range(plies):
+            if b.history:
+                cells = [i for i in b.candidates
+                         if abs(i % size - center) <= 3 and abs(i // size - center) <= 3]
+                i = rng.choice(sorted(cells))
+                x, y = i % size, i // size
+            else:
+                x, y = center + rng.randint(-1, 1), center + rng.randint(-1, 1)
+            b.place_move(x, y, player)
+            player = 3 - player
+        if abs(b.evaluation(1)) <= OPENING_MAX_EVAL:
+            out.append(list(b.history))
+    return out
+
+
+def play_game(black: EngineConfig, white: EngineConfig, opening: Sequence[Tuple[int, int, int]],
+              max_plies: int = MAX_PLIES, size: int = 15) -> Dict:
+    """Play one game from opening; result 1 or 2 (winner) or 0 (draw)."""
+    configs = {1: black, 2: white}
+    engines = {p: ai.Engine(TOURNAMENT_TT_MB, c.evaluator) if c.core == 'python' else
+               ai.NativeEngine(c.core, TOURNAMENT_TT_MB) for p, c in configs.items()}
+    nodes = {1: 0, 2: 0}
+    spent = {1: 0.0, 2: 0.0}
+    board = Board(size)
+    board.load_history(list(opening))
+    player = 1 if len(board.history) % 2 == 0 else 2
+    result, reason = 0, 'move_limit'
+    while len(board.history) < max_plies:
+        cfg = configs[player]
+        engine = engines[player]
+        engine.nodes = 0
+        start = time.perf_counter()
+        res = ai.search_position(board, player, cfg.depth, cfg.time_limit_ms, engine=engine)
+        spent[player] += time.perf_counter() - start
+        nodes[player] += engine.nodes
+        mv = res.move or ai.choose_move_random(board)
+        if mv is None:
+            reason = 'board_full'
+            break
+        board.place_move(mv[0], mv[1], player)
+        if board.check_win((mv[0], mv[1], player))[0] is not None:
+            result, reason = player, 'five'
+            break
+        if res.depth == 0 and res.score == ai.WIN_SCORE:
+            # the threat solver proved a forced win; no need to play it out
+            result, reason = player, 'forced'
+            break
+        player = 3 - player
+    return {
+        'black': black.name, 'white': white.name, 'result': result, 'reason': reason,
+        'plies': len(board.history), 'opening': len(opening),
+        'nodes': {black.name: nodes[1], white.name: nodes[2]},
+        'time': {black.name: spent[1], white.name: spent[2]},
+        'history': [list(h) for h in board.history],
+    }
+
+
+def elo(score: float, n: int, stdev: float) -> Tuple[float, float]:
+    """Elo difference for a mean score over n games, and the 95% error bar."""
+    def to_elo(s: float) -> float:
+        s = min(max(s, 1e-3), 1 - 1e-3)
+        return -400 * math.log10(1 / s - 1)
+    diff = to_elo(score)
+    if n < 2:
+        return diff, float('inf')
+    margin = 1.96 * stdev / math.sqrt(n)
+    return diff, (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+
+def summarize(games: Sequence[Dict], elapsed: float) -> Dict:
+    """Per-pairing score and Elo, per-engine nodes/sec, overall games/sec."""
+    pairs = {}
+    totals = {}
+    for g in games:
+        a, b = sorted((g['black'], g['white']))
+        if g['result'] == 0:
+            score_a = 0.5
+        else:
+            winner = g['black'] if g['result'] == 1 else g['white']
+            score_a = 1.0 if winner == a else 0.0
+        pairs.setdefault((a, b), []).append(score_a)
+        for name in (g['black'], g['white']):
+            t = totals.setdefault(name, [0, 0.0])
+            t[0] += g['nodes'][name]
+            t[1] += g['time'][name]
+    report = {'games': len(games), 'seconds': elapsed,
+              'games_per_sec': len(games) / elapsed if elapsed else 0.0,
+              'pairings': [], 'engines': {}}
+    for (a, b), scores in sorted(pairs.items()):
+        n = len(scores)
+        mean = sum(scores) / n
+        var = sum((s - mean) ** 2 for s in scores) / (n - 1) if n > 1 else 0.0
+        diff, err = elo(mean, n, math.sqrt(var))
+        report['pairings'].append({
+            'engine': a, 'opponent': b, 'games': n,
+            'wins': scores.count(1.0), 'draws': scores.count(0.5), 'losses': scores.count(0.0),
+            'score': mean, 'elo': diff, 'elo_error': err,
+        })
+    for name, (n_nodes, secs) in sorted(totals.items()):
+        report['engines'][name] = {'nodes': n_nodes, 'seconds': secs,
+                                   'nodes_per_sec': n_nodes / secs if secs else 0.0}
+    return report
+
+
+def _play(args) -> Dict:
+    game_id, black, white, opening, max_plies = args
+    out = play_game(black, white, opening, max_plies)
+    out['game'] = game_id
+    return out
+
+
+def run_tournament(configs: Sequence[EngineConfig], games: int, workers: int = 1, out_path: Optional[str] = None,
+                   archive_path: Optional[str] = None, seed: Optional[int] = None,
+                   max_plies: int = MAX_PLIES) -> Dict:
+    """Play games games per pairing of configs (rounded up to even) and return the summary.
+
+    Finished games are appended to out_path (JSON lines) and, if given, to a
+    storage.GameArchive at archive_path as they arrive.
+    """
+    openings = balanced_openings((games + 1) // 2, seed=seed)
+    tasks = []
+    for a, b in itertools.combinations(configs, 2):
+        for opening in openings:
+            tasks.append((len(tasks), a, b, opening, max_plies))
+            tasks.append((len(tasks), b, a, opening, max_plies))
+    archive = GameArchive(archive_path) if archive_path else None
+    out = open(out_path, 'a', encoding='utf8') if out_path else None
+    results = []
+    start = time.perf_counter()
+
+    def record(game: Dict) -> None:
+        results.append(game)
+        if out is not None:
+            out.write(json.dumps(game) + '\n')
+            out.flush()
+        if archive is not None:
+            archive.append([tuple(h) for h in game['history']], result=game['result'] or RESULT_DRAW,
+                           meta={'black': game['black'], 'white': game['white'], 'reason': game['reason']})
+
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for fut in as_completed([pool.submit(_play, t) for t in tasks]):
+                    record(fut.result())
+        else:
+            for t in tasks:
+                record(_play(t))
+    finally:
+        if out is not None:
+            out.close()
+    return summarize(results, time.perf_counter() - start)
+
+
+def format_report(report: Dict) -> str:
+    lines = ['{} games in {:.1f}s ({:.2f} games/sec)'.format(report['games'], report['seconds'], report['games_per_sec'])]
+    for p in report['pairings']:
+        lines.append('{engine} vs {opponent}: +{wins} ={draws} -{losses}  score {score:.3f}  '
+                     'Elo {elo:+.0f} +/- {elo_error:.0f}'.format(**p))
+    for name, e in report['engines'].items():
+        lines.append('{}: {:.0f} nodes/sec'.format(name, e['nodes_per_sec']))
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m gomoku.tournament', description='Self-play tournament')
+    parser.add_argument('--engine', action='append', required=True,
+                        help="name:depth=N,time=MS,eval=python|numpy|...,core=python|cython|numba (twice or more)")
+    parser.add_argument('--games', type=int, default=20, help='games per pairing')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--out', default=None, help='JSON lines file the games are appended to')
+    parser.add_argument('--archive', default=None, help='storage.GameArchive the games are appended to')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+    configs = [parse_engine(s) for s in args.engine]
+    if len(configs) < 2:
+        parser.error('need at least two engines')
+    if len({c.name for c in configs}) < len(configs):
+        parser.error('engine names must be unique')
+    report = run_tournament(configs, args.games, args.workers, args.out, args.archive, args.seed, args.max_plies)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == '__main__':
+    main()
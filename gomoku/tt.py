@@ -0,0 +1,133 @@
+"""Fixed-capacity transposition table backed by flat arrays."""
+from array import array
+from typing import Iterator, Optional, Tuple
+
+# bound flags (0 marks an empty slot)
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+NO_MOVE = -1
+# key (Q) + score (i) + depth (b) + flag (B) + generation (B) + move (h)
+ENTRY_BYTES = 8 + 4 + 1 + 1 + 1 + 2
+
+
+class TranspositionTable:
+    """Two-tier buckets: slot 0 keeps the deepest result, slot 1 always takes the newest.
+
+    Entries from earlier searches (older generation) are replaced first, so the
+    table never needs wiping between moves and never grows past its budget.
+    Moves are stored as flat cell indices (NO_MOVE for none).
+    """
+
+    def __init__(self, size_mb: float = 16, verify: bool = False):
+        slots = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        buckets = 1 << ((slots // 2).bit_length() - 1)
+        self.size_mb = size_mb
+        self.capacity = buckets * 2
+        self._mask = buckets - 1
+        self.keys = array('Q', bytes(8 * self.capacity))
+        self.scores = array('i', bytes(4 * self.capacity))
+        self.depths = array('b', bytes(self.capacity))
+        self.flags = array('B', bytes(self.capacity))
+        self.gens = array('B', bytes(self.capacity))
+        self.moves = array('h', [NO_MOVE]) * self.capacity
+        self.generation = 0
+        # optional collision check: full position stored per slot
+        self.verify = verify
+        self._checks = [None] * self.capacity if verify else None
+        self.collisions = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """Start a new generation; entries from older ones become replaceable."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self) -> None:
+        cap = self.capacity
+        self.flags = array('B', bytes(cap))
+        self.moves = array('h', [NO_MOVE]) * cap
+        if self.verify:
+            self._checks = [None] * cap
+        self.generation = 0
+        self.collisions = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        return self.capacity - self.flags.count(0)
+
+    def entries(self, generation: Optional[int] = None, min_depth: int = 0) -> Iterator[Tuple[int, int, int, int, int]]:
+        """(key, score, depth, flag, move) of the used slots, optionally only one generation's."""
+        flags = self.flags
+        depths = self.depths
+        if generation is None:
+            slots = (i for i in range(self.capacity) if flags[i])
+        else:
+            slots = self._generation_slots(generation)
+        for i in slots:
+            if flags[i] and depths[i] >= min_depth:
+                yield self.keys[i], self.scores[i], depths[i], flags[i], self.moves[i]
+
+    def _generation_slots(self, generation: int) -> Iterator[int]:
+        # bytes.find skips the other generations at C speed
+        gens = self.gens.tobytes()
+        marker = bytes((generation,))
+        i = gens.find(marker)
+        while i >= 0:
+            yield i
+            i = gens.find(marker, i + 1)
+
+    def _find(self, key: int) -> int:
+        i = (key & self._mask) << 1
+        flags = self.flags
+        if flags[i] and self.keys[i] == key:
+            return i
+        if flags[i + 1] and self.keys[i + 1] == key:
+            return i + 1
+        return -1
+
+    def probe(self, key: int, check=None) -> Optional[Tuple[int, int, int, int]]:
+        """Return (score, depth, flag, move) for key, or None."""
+        self.probes += 1
+        i = self._find(key)
+        if i < 0:
+            return None
+        if self.verify and self._checks[i] != check:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return self.scores[i], self.depths[i], self.flags[i], self.moves[i]
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: int = NO_MOVE, check=None) -> None:
+        self.stores += 1
+        i = (key & self._mask) << 1
+        flags = self.flags
+        keys = self.keys
+        gen = self.generation
+        if flags[i] and keys[i] == key:
+            slot = i
+        elif flags[i + 1] and keys[i + 1] == key:
+            # promote to the deep slot when this result is at least as deep
+            if depth >= self.depths[i] or not flags[i] or self.gens[i] != gen:
+                flags[i + 1] = 0
+                slot = i
+            else:
+                slot = i + 1
+        elif not flags[i] or self.gens[i] != gen or depth >= self.depths[i]:
+            slot = i
+        else:
+            slot = i + 1
+        if move == NO_MOVE and flags[slot] and keys[slot] == key:
+            move = self.moves[slot]
+        keys[slot] = key
+        self.scores[slot] = score
+        self.depths[slot] = depth
+        flags[slot] = flag
+        self.gens[slot] = gen
+        self.moves[slot] = move
+        if self.verify:
+            self._checks[slot] = check
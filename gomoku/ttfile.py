@@ -0,0 +1,111 @@
+"""
+Persistent transposition table: search results kept on disk across sessions.
+
+The file is a header (magic, board size and Zobrist seed, since keys and
+moves only mean something for the board they were computed on) followed by
+fixed-size records (key, score, move, depth, flag), each with a CRC32. A
+file written for another board size or key table is ignored by load() and
+started afresh by the next append(). New results are only ever appended and
+fsync'ed, so a crash can at worst leave a torn last record; load() drops it
+(and any record whose CRC does not match) and trims the file back to a
+record boundary. compact() rewrites one record per key through a temporary
+file and os.replace.
+"""
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Tuple
+
+from .game import ZOBRIST_SEED
+
+MAGIC = b'GMKTTF02'
+HEADER = struct.Struct('<8sHQ')  # magic, board size, Zobrist seed
+BODY = struct.Struct('<QihbB')   # key, score, move, depth, flag
+CRC = struct.Struct('<I')
+RECORD_BYTES = BODY.size + CRC.size
+
+# rewrite the file on load when it holds this many records per distinct key
+COMPACT_RATIO = 2
+
+
+class TTFile:
+    """Append-only file of (key, score, depth, flag, move) search results."""
+
+    def __init__(self, path: str, size: int = 15):
+        self.path = path
+        self.size = size
+        self.header = HEADER.pack(MAGIC, size, ZOBRIST_SEED)
+        self.records = 0  # records in the file after the last load/append/compact
+
+    def load(self) -> Dict[int, Tuple[int, int, int, int]]:
+        """key -> (score, depth, flag, move), the deepest result per key (the newest on ties)."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+        if len(data) < HEADER.size and self.header.startswith(data):
+            # empty, or the very first write was torn
+            return {}
+        if data[:HEADER.size] != self.header:
+            if data[:6] != MAGIC[:6]:
+                raise ValueError('not a transposition table file: {}'.format(self.path))
+            # another format version, board size or key table: nothing here is usable
+            self.records = 0
+            return {}
+        out = {}
+        start = HEADER.size
+        end = start + (len(data) - start) // RECORD_BYTES * RECORD_BYTES
+        count = 0
+        for pos in range(start, end, RECORD_BYTES):
+            body = data[pos:pos + BODY.size]
+            if CRC.unpack_from(data, pos + BODY.size)[0] != zlib.crc32(body):
+                continue
+            key, score, move, depth, flag = BODY.unpack(body)
+            count += 1
+            old = out.get(key)
+            if old is None or depth >= old[1]:
+                out[key] = (score, depth, flag, move)
+        if end != len(data):
+            # torn write at the end: cut it off so later appends stay aligned
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+        self.records = count
+        if count > COMPACT_RATIO * max(1, len(out)):
+            self.compact(out)
+        return out
+
+    def append(self, entries: Iterable[Tuple[int, int, int, int, int]]) -> int:
+        """Append (key, score, depth, flag, move) entries; returns how many were written."""
+        chunks = []
+        for key, score, depth, flag, move in entries:
+            body = BODY.pack(key, score, move, depth, flag)
+            chunks.append(body + CRC.pack(zlib.crc32(body)))
+        if not chunks:
+            return 0
+        try:
+            with open(self.path, 'rb') as f:
+                new_file = f.read(HEADER.size) != self.header
+        except FileNotFoundError:
+            new_file = True
+        with open(self.path, 'wb' if new_file else 'ab') as f:
+            if new_file:
+                f.write(self.header)
+            f.write(b''.join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+        self.records += len(chunks)
+        return len(chunks)
+
+    def compact(self, entries: Dict[int, Tuple[int, int, int, int]]) -> None:
+        """Replace the file with one record per key of entries (as returned by load)."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.header)
+            for key, (score, depth, flag, move) in entries.items():
+                body = BODY.pack(key, score, move, depth, flag)
+                f.write(body + CRC.pack(zlib.crc32(body)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.records = len(entries)
@@ -1,19 +1,33 @@
 from .game import Board
 from . import ai
 from . import storage
-try:
-    import tkinter as _tk
-    from tkinter import filedialog as _filedialog
-    _TK_AVAILABLE = True
-except Exception:
-    _TK_AVAILABLE = False
-
-import pygame
+from .background import BackgroundSearch
 from typing import Optional, List, Tuple
 
+# pygame and tkinter are imported when the window opens / a file dialog is
+# needed, so importing gomoku.ui stays cheap for headless use
+
+
+def _ask_path(save: bool) -> Optional[str]:
+    """Path from a tkinter file dialog; savegame.json when tkinter is unavailable."""
+    try:
+        import tkinter
+        from tkinter import filedialog
+    except Exception:
+        return 'savegame.json'
+    root = tkinter.Tk()
+    root.withdraw()
+    if save:
+        path = filedialog.asksaveasfilename(title='Save game', defaultextension='.json', filetypes=[('JSON','*.json')])
+    else:
+        path = filedialog.askopenfilename(title='Load game', filetypes=[('JSON','*.json')])
+    root.destroy()
+    return path
+
 
 def run_ui(board_size: int = 15):
     try:
+        import pygame
         pygame.init()
     except Exception:
         print("Pygame initialization failed. Ensure pygame is installed.")
@@ -38,6 +52,13 @@ def run_ui(board_size: int = 15):
     vs_ai = False
     ai_player = 2
     ai_depth = 3
+    ai_time_ms = None  # when set, the AI deepens iteratively within this budget
+    search = None  # BackgroundSearch while the AI is thinking (or pondering)
+    ponder = False  # think on the human's time about the expected reply
+    ready = None  # SearchResult from a ponder hit, played without searching again
+    show_stats = False  # overlay with the SearchStats of the AI's last move
+    last_stats = None
+    small_font = pygame.font.SysFont(None, 18)
 
     def coord_to_pixel(x: int, y: int) -> Tuple[int, int]:
         px = MARGIN + x * CELL
@@ -62,6 +83,11 @@ def run_ui(board_size: int = 15):
             if e.type == pygame.QUIT:
                 running = False
             elif e.type == pygame.KEYDOWN:
+                if search is not None and e.key in (pygame.K_u, pygame.K_r, pygame.K_n, pygame.K_a, pygame.K_p, pygame.K_l, pygame.K_o):
+                    # the position or the AI side is about to change; drop the running search
+                    search.cancel()
+                    search = None
+                    ready = None
                 if e.key == pygame.K_ESCAPE:
                     running = False
                 elif e.key == pygame.K_u:
@@ -113,6 +139,7 @@ def run_ui(board_size: int = 15):
                 elif e.key == pygame.K_n:
                     # new game
                     board = Board(size=size)
+                    ai.reset_caches()
                     current_player = 1
                     game_over = False
                     winner = None
@@ -126,13 +153,7 @@ def run_ui(board_size: int = 15):
                 elif e.key == pygame.K_s:
                     # save game (open save dialog if tkinter available)
                     try:
-                        if _TK_AVAILABLE:
-                            root = _tk.Tk()
-                            root.withdraw()
-                            path = _filedialog.asksaveasfilename(title='Save game', defaultextension='.json', filetypes=[('JSON','*.json')])
-                            root.destroy()
-                        else:
-                            path = 'savegame.json'
+                        path = _ask_path(save=True)
                         if path:
                             state = {
                                 'grid': board.grid,
@@ -150,19 +171,12 @@ def run_ui(board_size: int = 15):
                 elif e.key == pygame.K_l:
                     # load game (open file dialog if tkinter available)
                     try:
-                        if _TK_AVAILABLE:
-                            root = _tk.Tk()
-                            root.withdraw()
-                            path = _filedialog.askopenfilename(title='Load game', filetypes=[('JSON','*.json')])
-                            root.destroy()
-                        else:
-                            path = 'savegame.json'
+                        path = _ask_path(save=False)
                         if path:
                             data = storage.load_state(path)
-                            board.grid = [list(row) for row in data.get('grid', board.grid)]
-                            # restore history as list of tuples
-                            board.history = [tuple(h) for h in data.get('history', [])]
-                            board._redo_stack = []
+                            # grid is rebuilt by replaying the history
+                            board.load_history([tuple(h) for h in data.get('history', [])])
+                            ai.reset_caches()
                             current_player = data.get('current_player', current_player)
                             vs_ai = data.get('vs_ai', vs_ai)
                             ai_player = data.get('ai_player', ai_player)
@@ -181,18 +195,39 @@ def run_ui(board_size: int = 15):
                             print('Game loaded from', path)
                     except Exception as ex:
                         print('Failed to load game:', ex)
+                elif e.key == pygame.K_i:
+                    # toggle the search statistics overlay
+                    show_stats = not show_stats
+                elif e.key == pygame.K_o:
+                    # toggle pondering
+                    ponder = not ponder
+                elif e.key == pygame.K_t:
+                    # toggle fixed depth / time-limited AI
+                    ai_time_ms = None if ai_time_ms else 2000
                 elif e.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
-                    # decrease AI depth
-                    ai_depth = max(1, ai_depth - 1)
+                    # decrease AI depth (or time budget)
+                    if ai_time_ms:
+                        ai_time_ms = max(500, ai_time_ms - 500)
+                    else:
+                        ai_depth = max(1, ai_depth - 1)
                 elif e.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
-                    # increase AI depth (accept '=' as '+')
-                    ai_depth = min(8, ai_depth + 1)
+                    # increase AI depth or time budget (accept '=' as '+')
+                    if ai_time_ms:
+                        ai_time_ms = min(30000, ai_time_ms + 500)
+                    else:
+                        ai_depth = min(8, ai_depth + 1)
             elif e.type == pygame.MOUSEBUTTONDOWN and e.button == 1 and not game_over and not (vs_ai and current_player == ai_player):
                 pos = pixel_to_coord(*e.pos)
                 if pos:
                     x, y = pos
                     placed = board.place_move(x, y, current_player)
                     if placed:
+                        if search is not None:
+                            # stop pondering; keep its answer if the human played the predicted move
+                            ready = search.ponder_hit(board, ai_depth, ai_time_ms)
+                            if ready is not None:
+                                last_stats = search.stats
+                            search = None
                         w, line = board.check_win((x, y, current_player))
                         if w is not None:
                             game_over = True
@@ -201,13 +236,24 @@ def run_ui(board_size: int = 15):
                         else:
                             current_player = 3 - current_player
 
-        # AI move handling
+        # AI move handling: search on a background thread, collect the move when it is done
+        mv = None
+        pv = []
         if vs_ai and not game_over and current_player == ai_player:
-            try:
-                import gomoku.ai as ai_mod
-                mv = ai_mod.choose_move_minimax(board, ai_player, depth=ai_depth)
-            except Exception:
-                mv = None
+            if ready is not None:
+                mv, pv = ready.move, ready.pv
+                ready = None
+            elif search is None:
+                search = BackgroundSearch(board, ai_player, depth=ai_depth, time_limit_ms=ai_time_ms)
+            elif search.done():
+                try:
+                    if search.history == board.history:
+                        mv = search.result()
+                        pv = search.search_result.pv
+                        last_stats = search.stats
+                except Exception:
+                    mv = None
+                search = None
             if mv:
                 x, y = mv
                 placed = board.place_move(x, y, current_player)
@@ -219,6 +265,8 @@ def run_ui(board_size: int = 15):
                         winning_line = line
                     else:
                         current_player = 3 - current_player
+                        if ponder and len(pv) >= 2 and pv[0] == mv and board.is_valid_move(*pv[1]):
+                            search = BackgroundSearch(board, ai_player, ponder_move=pv[1])
 
         screen.fill((245, 222, 179))
         # draw grid
@@ -257,16 +305,34 @@ def run_ui(board_size: int = 15):
         if game_over and winner:
             status = "Player {} wins! (N to restart)".format(winner)
         # AI status
-        ai_status = "AI: On (depth {})".format(ai_depth) if vs_ai else "AI: Off"
+        if ai_time_ms:
+            ai_status = "AI: On ({:.1f}s)".format(ai_time_ms / 1000.0) if vs_ai else "AI: Off"
+        else:
+            ai_status = "AI: On (depth {})".format(ai_depth) if vs_ai else "AI: Off"
+        if vs_ai and ponder:
+            ai_status += " ponder"
+        if search is not None:
+            label = "pondering" if search.ponder_move is not None else "thinking"
+            ai_status += "   {}... {:.1f}s".format(label, search.elapsed())
         txt = font.render(status + '   ' + ai_status, True, (0, 0, 0))
         screen.blit(txt, (MARGIN, MARGIN + (size) * CELL + 10))
 
-        help_txt = font.render("A:toggle AI  +/-:depth  U:undo  R:redo  N:new  ESC:quit", True, (0,0,0))
+        if show_stats and last_stats is not None:
+            lines = last_stats.summary()
+            overlay = pygame.Surface((width - 2 * MARGIN, 16 * len(lines) + 8), pygame.SRCALPHA)
+            overlay.fill((255, 255, 255, 200))
+            for i, line in enumerate(lines):
+                overlay.blit(small_font.render(line, True, (0, 0, 0)), (4, 4 + 16 * i))
+            screen.blit(overlay, (MARGIN, 4))
+
+        help_txt = font.render("A:AI  +/-:depth  T:timed  O:ponder  I:stats  U:undo  R:redo  N:new  ESC:quit", True, (0,0,0))
         screen.blit(help_txt, (MARGIN, MARGIN + (size) * CELL + 35))
 
         pygame.display.flip()
         clock.tick(30)
 
+    if search is not None:
+        search.cancel()
     pygame.quit()
 
 __all__ = ["run_ui"]
@@ -2,6 +2,8 @@
 """
 Gomoku Game Launcher
 Simple wrapper to ensure dependencies are installed and launch the game.
+
+    python gomoku_launcher.py [--install] [--profile [DIR]] [--profile-mode cprofile|sample]
 """
 import sys
 import subprocess
@@ -30,7 +32,7 @@ def launch_game():
     try:
         from gomoku.main import main
         print("Starting Gomoku Game...")
-        main()
+        main(sys.argv[1:])
     except Exception as e:
         print("Error launching game: {}".format(e))
         input("Press Enter to exit...")
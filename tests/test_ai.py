@@ -0,0 +1,354 @@
+import array
+import os
+import random
+import unittest
+from gomoku.game import Board
+from gomoku import ai
+
+
+def random_game(seed, moves=40, size=15):
+    rng = random.Random(seed)
+    b = Board(size=size)
+    player = 1
+    for _ in range(moves):
+        empties = [(x, y) for y in range(size) for x in range(size) if b.grid[y][x] == 0]
+        x, y = rng.choice(empties)
+        b.place_move(x, y, player)
+        player = 3 - player
+    return b
+
+
+class TestIncrementalEval(unittest.TestCase):
+    def test_matches_full_scan(self):
+        for seed in range(5):
+            b = random_game(seed)
+            for p in (1, 2):
+                self.assertEqual(ai.evaluate_board(b, p), ai._py_evaluate_board(b, p))
+
+    def test_undo_redo_restore_totals(self):
+        b = random_game(7, moves=20)
+        before = list(b.pattern_totals)
+        for _ in range(8):
+            b.undo()
+        self.assertEqual(b.evaluation(1), ai._py_evaluate_board(b, 1))
+        for _ in range(8):
+            b.redo()
+        self.assertEqual(b.pattern_totals, before)
+
+    def test_load_history(self):
+        b = random_game(3, moves=15)
+        c = Board(size=15)
+        c.load_history(b.history)
+        self.assertEqual(c.grid, b.grid)
+        self.assertEqual(c.pattern_totals, b.pattern_totals)
+
+
+class TestHashVerification(unittest.TestCase):
+    def tearDown(self):
+        ai.set_hash_verification(False)
+
+    def test_collision_detected(self):
+        ai.set_hash_verification(True)
+        a = random_game(1, moves=10)
+        b = random_game(2, moves=10)
+        val = ai._py_evaluate_board(a, 1)
+        # forge a collision: file a's entry under b's hash
+        ai.EVAL_CACHE._data[b.hash] = ai.EVAL_CACHE._data[a.hash]
+        self.assertEqual(ai._py_evaluate_board(a, 1), val)
+        ai._py_evaluate_board(b, 1)
+        self.assertEqual(ai.hash_collisions(), 1)
+
+
+@unittest.skipUnless(ai.NUMPY_EVAL_AVAILABLE, 'numpy not installed')
+class TestNumpyEvaluator(unittest.TestCase):
+    def test_batch_matches_board(self):
+        import numpy as np
+        from gomoku.ai_numpy import evaluate_boards
+        boards = [random_game(seed, moves=10 * seed) for seed in range(6)]
+        grids = np.array([b.grid for b in boards], dtype=np.int8)
+        self.assertEqual(evaluate_boards(grids, 1).tolist(), [b.evaluation(1) for b in boards])
+        self.assertEqual(evaluate_boards(grids, 2).tolist(), [b.evaluation(2) for b in boards])
+
+
+@unittest.skipUnless(ai.CY_EVAL_AVAILABLE, 'gomoku.ai_cy not built')
+class TestCythonCore(unittest.TestCase):
+    def test_evaluator_matches_python(self):
+        from gomoku.ai_cy import evaluate_board
+        for seed in range(6):
+            b = random_game(seed, moves=10 * seed)
+            for p in (1, 2):
+                self.assertEqual(evaluate_board(b, p), b.evaluation(p))
+
+    def test_search_matches_engine(self):
+        for seed in range(4):
+            b = random_game(seed, moves=6 + 4 * seed)
+            history = list(b.history)
+            for depth in (2, 3):
+                ai.EVAL_CACHE.clear()
+                engine, native = ai.Engine(4), ai.NativeEngine('cython', 4)
+                self.assertEqual(native.search(b, 1, depth), engine.search(b, 1, depth))
+                self.assertEqual(native.nodes, engine.nodes)
+                self.assertEqual(b.history, history)
+
+    def test_timed_search(self):
+        b = random_game(5, moves=12)
+        native = ai.NativeEngine('cython', 4)
+        res = native.search(b, 1, time_limit_ms=200)
+        self.assertTrue(b.is_valid_move(*res.move))
+        self.assertGreaterEqual(res.depth, 2)
+        self.assertEqual([d for d, _, _, _ in native.stats.iterations], list(range(1, res.depth + 1)))
+        self.assertEqual(res.pv[0], res.move)
+
+    def test_default_core(self):
+        self.assertEqual(ai.SEARCH_CORE, os.environ.get('GOMOKU_SEARCH_CORE', 'cython'))
+        core, ai.SEARCH_CORE = ai.SEARCH_CORE, 'cython'
+        try:
+            self.assertIsInstance(ai._default_engine(Board(15)), ai.NativeEngine)
+            self.assertIs(ai._default_engine(Board(21)), ai.DEFAULT_ENGINE)
+        finally:
+            ai.SEARCH_CORE = core
+
+
+@unittest.skipUnless(ai.NUMBA_EVAL_AVAILABLE, 'numba not installed')
+class TestNumbaCore(unittest.TestCase):
+    def test_evaluator_matches_python(self):
+        import numpy as np
+        from gomoku.ai_numba import evaluate_board_numba
+        for seed in range(6):
+            b = random_game(seed, moves=10 * seed)
+            grid = np.array(b.grid, dtype=np.int32)
+            for p in (1, 2):
+                self.assertEqual(evaluate_board_numba(grid, p), b.evaluation(p))
+
+    def test_search_matches_engine(self):
+        for seed in range(3):
+            b = random_game(seed, moves=6 + 4 * seed)
+            history = list(b.history)
+            ai.EVAL_CACHE.clear()
+            engine, native = ai.Engine(4), ai.NativeEngine('numba', 4)
+            self.assertEqual(native.search(b, 2, 3), engine.search(b, 2, 3))
+            self.assertEqual(native.stats.nodes, engine.stats.nodes)
+            self.assertEqual(b.history, history)
+
+    def test_timed_and_cancelled(self):
+        import threading
+        b = random_game(5, moves=12)
+        native = ai.NativeEngine('numba', 4)
+        res = native.search(b, 1, time_limit_ms=200)
+        self.assertTrue(b.is_valid_move(*res.move))
+        self.assertEqual(res.pv[0], res.move)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertIsNone(native.search(b, 1, depth=12, cancel=cancel).move)
+
+    def test_depth_beyond_killer_table(self):
+        import threading
+        from gomoku.ai_numba import MAX_PLY
+        b = random_game(5, moves=12)
+        cancel = threading.Event()
+        cancel.set()
+        native = ai.NativeEngine('numba', 1)
+        # the root is ordered, and its killers looked up, before the first look at the cancel flag
+        self.assertIsNone(native.search(b, 1, depth=MAX_PLY + 5, cancel=cancel).move)
+        res = native.search(b, 1, time_limit_ms=50, max_depth=MAX_PLY + 5)
+        self.assertTrue(b.is_valid_move(*res.move))
+
+    def test_rejects_oversized_board(self):
+        b = Board(size=21)
+        b.place_move(10, 10, 1)
+        with self.assertRaises(ValueError):
+            ai.NativeEngine('numba', 4).search(b, 2, 2)
+
+
+class TestColdStart(unittest.TestCase):
+    def test_heavy_modules_load_lazily(self):
+        import subprocess
+        import sys
+        code = 'import sys, gomoku.ai, gomoku.ui; print(sorted({"numba", "numpy", "pygame", "tkinter"} & set(sys.modules)))'
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), '[]')
+
+    def test_warmup(self):
+        seen = []
+        steps = ai.warmup([9], log=lambda name, secs: seen.append(name))
+        self.assertIn('tables', steps)
+        self.assertEqual(set(seen), set(steps))
+        self.assertEqual('numba' in steps, ai.NUMBA_EVAL_AVAILABLE)
+
+
+class TestThreatBudget(unittest.TestCase):
+    def limits(self, **kwargs):
+        from gomoku import threats
+        seen = []
+        vcf, vct = threats.find_vcf, threats.find_vct
+        threats.find_vcf = lambda b, p, time_limit_ms=None, cancel=None: seen.append(('vcf', time_limit_ms))
+        threats.find_vct = lambda b, p, time_limit_ms=None, cancel=None: seen.append(('vct', time_limit_ms))
+        try:
+            ai._threat_search(random_game(2, moves=10), 1, **kwargs)
+        finally:
+            threats.find_vcf, threats.find_vct = vcf, vct
+        return dict(seen)
+
+    def test_fixed_depth_scales_with_depth(self):
+        budget = 3 * ai.THREAT_MS_PER_PLY
+        got = self.limits(depth=3)
+        self.assertEqual(got['vcf'], min(ai.VCF_TIME_MS, budget))
+        self.assertLessEqual(got['vct'], budget)
+
+    def test_timed_search_shares_its_limit(self):
+        got = self.limits(depth=3, time_limit_ms=200)
+        self.assertLessEqual(got['vcf'], 200 * ai.THREAT_TIME_SHARE)
+        self.assertLessEqual(got['vct'], 200 * ai.THREAT_TIME_SHARE)
+
+
+class TestTimeLimitedSearch(unittest.TestCase):
+    def test_returns_move_within_budget(self):
+        import time
+        b = random_game(5, moves=12)
+        history = list(b.history)
+        start = time.perf_counter()
+        mv = ai.choose_move_minimax(b, 1, time_limit_ms=300)
+        elapsed = time.perf_counter() - start
+        self.assertIsNotNone(mv)
+        self.assertTrue(b.is_valid_move(*mv))
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(b.history, history)
+
+    def test_finds_immediate_win(self):
+        b = Board(size=15)
+        for i, (x, y) in enumerate([(3,7),(3,9),(4,7),(4,9),(5,7),(5,9),(6,7),(6,9)]):
+            b.place_move(x, y, 1 + i % 2)
+        self.assertIn(ai.choose_move_minimax(b, 1, time_limit_ms=200), [(7, 7), (2, 7)])
+
+
+class TestPVS(unittest.TestCase):
+    def test_principal_variation(self):
+        b = random_game(2, moves=10)
+        ai.reset_caches()
+        res = ai.search_position(b, 1, depth=3)
+        self.assertEqual(res.pv[0], res.move)
+        self.assertEqual(len(res.pv), 3)
+        # PV is a legal sequence of distinct empty cells
+        self.assertEqual(len(set(res.pv)), 3)
+        self.assertTrue(all(b.is_valid_move(x, y) for x, y in res.pv))
+
+    def test_minimax_wrapper_agrees_with_negamax(self):
+        b = random_game(6, moves=9)
+        ai.reset_caches()
+        v1, _ = ai.minimax(b, 2, -ai.INF, ai.INF, False, 1)
+        ai.reset_caches()
+        v2, _ = ai.negamax(b, 2, -ai.INF, ai.INF, 2)
+        self.assertEqual(v1, -v2)
+
+
+class TestSearchStats(unittest.TestCase):
+    def test_counters(self):
+        b = random_game(2, moves=10)
+        ai.reset_caches()
+        mv, stats = ai.choose_move_minimax(b, 1, depth=3, with_stats=True)
+        self.assertTrue(b.is_valid_move(*mv))
+        self.assertIs(stats, ai.last_search_stats())
+        self.assertEqual(stats.source, 'search')
+        self.assertGreater(stats.nodes, stats.interior_nodes)
+        self.assertGreater(stats.leaf_evals, 0)
+        self.assertGreaterEqual(stats.tt_probes, stats.tt_hits)
+        self.assertGreater(stats.tt_stores, 0)
+        self.assertEqual([it[0] for it in stats.iterations], [3])
+        self.assertGreater(stats.branching_factor, 1)
+        self.assertIn(0, stats.cutoffs)
+        self.assertEqual(stats.as_dict()['nodes'], stats.nodes)
+
+    def test_iterations_of_timed_search(self):
+        b = random_game(3, moves=8)
+        _, stats = ai.choose_move_minimax(b, 1, time_limit_ms=300, with_stats=True)
+        depths = [it[0] for it in stats.iterations]
+        self.assertEqual(depths, list(range(1, len(depths) + 1)))
+        # nodes of an iteration cut off by the deadline count in the total only
+        self.assertLessEqual(sum(it[2] for it in stats.iterations), stats.nodes)
+
+
+class TestParallelSearch(unittest.TestCase):
+    def tearDown(self):
+        ai.shutdown_workers()
+
+    def test_matches_serial_and_is_deterministic(self):
+        b = random_game(3, moves=10)
+        history = list(b.history)
+        ai.reset_caches()
+        serial = ai.search_position(b, 1, depth=3)
+        first = ai.search_position(b, 1, depth=3, workers=3)
+        second = ai.search_position(b, 1, depth=3, workers=3)
+        self.assertEqual(first.score, serial.score)
+        self.assertEqual(first, second)
+        self.assertEqual(b.history, history)
+
+    def test_worker_engine_kept_between_moves(self):
+        b = random_game(6, moves=8)
+        moves = ai._neighbors(b)[:4]
+        try:
+            ai._search_root_moves(Board, 15, b.history, 1, moves, 2, None, 20, 1)
+            engine = ai._WORKER_ENGINE[1]
+            stored = len(engine.tt)
+            b.place_move(*moves[0], 1)
+            its, _ = ai._search_root_moves(Board, 15, b.history, 2, ai._neighbors(b)[:4], 2, None, 20, 1)
+            self.assertIs(ai._WORKER_ENGINE[1], engine)
+            self.assertGreater(len(engine.tt), stored)
+            self.assertEqual(its[-1].depth, 2)
+        finally:
+            ai._WORKER_ENGINE = None
+
+    def test_shared_bound_keeps_ties_exact(self):
+        b = random_game(3, moves=10)
+        best = ai.Engine(4).search(b, 1, 3)
+        others = [m for m in ai._neighbors(b, depth=3) if m != best.move]
+        for engine in [ai.Engine(4)] + [ai.NativeEngine(core, 4) for core in ai.SEARCH_CORES]:
+            bounds = array.array('i', [-ai.INF] * (ai.MAX_PLY + 1))
+            bounds[3] = best.score
+            engine.shared_bounds = bounds
+            # a share without the best move only fails low against the bound another share set
+            engine.root_moves = others
+            self.assertLess(engine.search(b, 1, 3).score, best.score)
+            engine.root_moves = others[:3] + [best.move]
+            res = engine.search(b, 1, 3)
+            self.assertEqual((res.move, res.score), (best.move, best.score))
+            self.assertEqual(bounds[3], best.score)
+
+    @unittest.skipUnless(ai.SEARCH_CORES, 'no compiled search core')
+    def test_workers_run_native_core(self):
+        b = random_game(6, moves=8)
+        moves = ai._neighbors(b)[:4]
+        core = next(iter(ai.SEARCH_CORES))
+        try:
+            its, stats = ai._search_root_moves(Board, 15, b.history, 1, moves, 3, None, 20, 1, core)
+            self.assertIsInstance(ai._WORKER_ENGINE[1], ai.NativeEngine)
+            engine = ai.Engine(1)
+            engine.root_moves = moves
+            self.assertEqual(its[-1], engine.search(b, 1, 3))
+            self.assertEqual(stats.nodes, engine.stats.nodes)
+        finally:
+            ai._WORKER_ENGINE = None
+
+    def test_cancel_stops_running_workers(self):
+        import threading
+        import time
+        b = random_game(3, moves=10)
+        cancel = threading.Event()
+        threading.Timer(0.5, cancel.set).start()
+        res = ai.search_position(b, 1, time_limit_ms=600000, max_depth=ai.MAX_PLY, workers=2, cancel=cancel)
+        self.assertIsNone(res.move)
+        # the cancelled workers are free again instead of finishing their searches first
+        start = time.perf_counter()
+        self.assertIsNotNone(ai.search_position(b, 1, depth=2, workers=2).move)
+        self.assertLess(time.perf_counter() - start, 10)
+
+    def test_engines_do_not_share_state(self):
+        b = random_game(4, moves=8)
+        engine = ai.Engine(tt_size_mb=1)
+        engine.search(b, 1, depth=2)
+        self.assertGreater(len(engine.tt), 0)
+        self.assertIsNot(engine.tt, ai.DEFAULT_ENGINE.tt)
+        self.assertIsNot(engine.history, ai.HISTORY)
+
+
+if __name__ == '__main__':
+    unittest.main()
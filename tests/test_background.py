@@ -0,0 +1,63 @@
+import time
+import unittest
+import random
+from gomoku.background import BackgroundSearch
+from gomoku.game import Board
+from gomoku import ai
+
+
+def random_game(seed, moves, size=15):
+    rng = random.Random(seed)
+    b = Board(size=size)
+    for i in range(moves):
+        empties = [(x, y) for y in range(size) for x in range(size) if b.grid[y][x] == 0]
+        b.place_move(*rng.choice(empties), 1 + i % 2)
+    return b
+
+
+class TestBackgroundSearch(unittest.TestCase):
+    def test_returns_move_without_touching_board(self):
+        b = random_game(5, moves=12)
+        history = list(b.history)
+        search = BackgroundSearch(b, 1, depth=2)
+        mv = search.result()
+        self.assertTrue(search.done())
+        self.assertTrue(b.is_valid_move(*mv))
+        self.assertEqual(b.history, history)
+
+    def test_cancel_stops_deep_search(self):
+        b = random_game(7, moves=16)
+        ai.reset_caches()
+        search = BackgroundSearch(b, 1, depth=7)
+        time.sleep(0.1)
+        start = time.perf_counter()
+        search.cancel()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertTrue(search.done())
+        self.assertIsNone(search.result())
+
+
+class TestPonder(unittest.TestCase):
+    def setUp(self):
+        self.board = random_game(9, moves=11)
+        self.reply = ai.search_position(self.board, 2, depth=2).move
+
+    def test_hit_returns_answer(self):
+        search = BackgroundSearch(self.board, 1, ponder_move=self.reply)
+        time.sleep(0.5)
+        self.board.place_move(*self.reply, 2)
+        res = search.ponder_hit(self.board, depth=1)
+        self.assertIsNotNone(res)
+        self.assertTrue(self.board.is_valid_move(*res.move))
+
+    def test_miss_returns_none(self):
+        search = BackgroundSearch(self.board, 1, ponder_move=self.reply)
+        time.sleep(0.2)
+        other = next(m for m in ai._neighbors(self.board) if m != self.reply)
+        self.board.place_move(*other, 2)
+        self.assertIsNone(search.ponder_hit(self.board, depth=1))
+        self.assertTrue(search.done())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import json
+import unittest
+from gomoku import bench
+
+
+class TestBench(unittest.TestCase):
+    def test_positions(self):
+        boards = bench.positions()
+        self.assertIn('save_1', boards)
+        self.assertEqual(len(boards['save_1'].history), 6)
+        self.assertEqual(len(boards['scattered'].history), 40)
+
+    def test_report(self):
+        report = bench.run(depth=2, names=['auto', 'python'], min_time=0.01)
+        json.dumps(report)
+        self.assertEqual(list(report['cores']), bench.cores())
+        for core, r in report['cores'].items():
+            for pos, search in r['searches'].items():
+                self.assertEqual(search['scores'], report['cores']['python']['searches'][pos]['scores'], (core, pos))
+        self.assertEqual(report['parity'], {'auto': [], 'python': []})
+        auto = report['backends']['auto']['searches']
+        python = report['backends']['python']['searches']
+        for pos in auto:
+            self.assertEqual(auto[pos]['scores'], python[pos]['scores'])
+            self.assertEqual(len(auto[pos]['time_to_depth']), 2)
+        self.assertGreater(report['backends']['auto']['evals_per_sec'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import random
+import tempfile
+import unittest
+from gomoku import ai, book
+from gomoku.game import Board
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.book')
+        os.close(fd)
+        games = [
+            ([(7, 7, 1), (8, 8, 2), (6, 8, 1)], 1),
+            ([(7, 7, 1), (8, 8, 2), (9, 9, 1)], 2),
+            ([(7, 7, 1), (8, 7, 2)], None),
+        ]
+        book.write_book(self.path, book.collect(games))
+        self.book = book.OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        ai.load_book(None)
+        os.remove(self.path)
+
+    def test_inverse_transforms(self):
+        fs = book._transforms(15)
+        for t, f in enumerate(fs):
+            back = fs[book._INVERSE[t]]
+            self.assertEqual(back(*f(3, 11)), (3, 11))
+
+    def test_lookup_and_weights(self):
+        b = Board(15)
+        self.assertEqual(self.book.lookup(b), [(7, 7, 4)])
+        b.place_move(7, 7, 1)
+        b.place_move(8, 8, 2)
+        # (6, 8) and (9, 9): one game each, the first won by the mover
+        self.assertEqual(self.book.lookup(b), [(6, 8, 2), (9, 9, 1)])
+
+    def test_symmetric_position_finds_transformed_move(self):
+        b = Board(15)
+        b.place_move(7, 7, 1)
+        b.place_move(6, 8, 2)  # mirror image of (8, 8)
+        moves = {(x, y) for x, y, _ in self.book.lookup(b)}
+        self.assertEqual(moves, {(8, 8), (5, 9)})
+
+    def test_search_position_plays_book_move(self):
+        ai.load_book(self.path)
+        b = Board(15)
+        b.place_move(7, 7, 1)
+        res = ai.search_position(b, 2, depth=3)
+        self.assertEqual(res.depth, 0)
+        self.assertIn(res.move, [(8, 8), (8, 7), (6, 6), (6, 8), (8, 6), (7, 8), (7, 6), (6, 7)])
+        self.assertIn(self.book.choose(b, random.Random(0)), [(x, y) for x, y, _ in self.book.lookup(b)])
+
+    def test_truncated_file_rejected(self):
+        self.book.close()
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for cut in (0, book.HEADER.size - 1, len(data) - 1):
+            with open(self.path, 'wb') as f:
+                f.write(data[:cut])
+            with self.assertRaises(ValueError):
+                book.OpeningBook(self.path)
+        ai.load_book(None)
+        ai.BOOK_PATH = self.path
+        self.assertIsNotNone(ai.search_position(Board(15), 1, depth=1).move)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from gomoku.cache import EvalCache
+
+
+class TestEvalCache(unittest.TestCase):
+    def test_color_symmetric_entry(self):
+        c = EvalCache(budget_mb=0.01)
+        c.put(1, 2, 35)
+        self.assertEqual(c.get(1, 2), 35)
+        self.assertEqual(c.get(1, 1), -35)
+        self.assertEqual(len(c), 1)
+
+    def test_lru_eviction_and_stats(self):
+        c = EvalCache(budget_mb=0.01)
+        c.max_entries = 2
+        c.put('a', 1, 1)
+        c.put('b', 1, 2)
+        c.get('a', 1)          # 'b' is now least recently used
+        c.put('c', 1, 3)
+        self.assertIsNone(c.get('b', 1))
+        self.assertEqual(c.get('a', 1), 1)
+        st = c.stats()
+        self.assertEqual((st['hits'], st['misses'], st['evictions']), (2, 1, 1))
+
+    def test_verified_entries_fit_budget(self):
+        import tracemalloc
+        tracemalloc.start()
+        c = EvalCache(budget_mb=0.5, verify=True)
+        base = tracemalloc.get_traced_memory()[0]
+        for k in range(c.max_entries):
+            c.put(k << 20, 1, k, check=k.to_bytes(19 * 19, 'little'))
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        self.assertLessEqual(used, 0.5 * 1024 * 1024)
+        self.assertLess(c.max_entries, EvalCache(budget_mb=0.5).max_entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 from gomoku.game import Board
 
@@ -37,5 +38,68 @@ class TestWinDetection(unittest.TestCase):
         self.assertTrue(b.place_move(0,0,1))
         self.assertFalse(b.place_move(0,0,2))
 
+class TestZobrist(unittest.TestCase):
+    def test_incremental_hash(self):
+        b = Board(size=15)
+        self.assertEqual(b.hash, 0)
+        for i, (x, y) in enumerate([(7,7),(8,8),(6,7),(9,9)]):
+            b.place_move(x, y, 1 + i % 2)
+            self.assertEqual(b.hash, b.compute_hash())
+        b.undo()
+        b.undo()
+        self.assertEqual(b.hash, b.compute_hash())
+        b.redo()
+        self.assertEqual(b.hash, b.compute_hash())
+
+    def test_transposition_same_hash(self):
+        a = Board(size=15)
+        b = Board(size=15)
+        for x, y, p in [(7,7,1),(8,8,2),(6,6,1)]:
+            a.place_move(x, y, p)
+        for x, y, p in [(6,6,1),(8,8,2),(7,7,1)]:
+            b.place_move(x, y, p)
+        self.assertEqual(a.hash, b.hash)
+
+class TestCandidates(unittest.TestCase):
+    def scan(self, b):
+        out = {}
+        for y in range(b.size):
+            for x in range(b.size):
+                if b.grid[y][x] == 0:
+                    n = sum(1 for dy in range(-2, 3) for dx in range(-2, 3)
+                            if (dx or dy) and 0 <= x + dx < b.size and 0 <= y + dy < b.size
+                            and b.grid[y + dy][x + dx] != 0)
+                    if n:
+                        out[y * b.size + x] = n
+        return out
+
+    def test_incremental_candidates(self):
+        rng = random.Random(8)
+        b = Board(size=15)
+        player = 1
+        for _ in range(60):
+            empties = [(x, y) for y in range(15) for x in range(15) if b.grid[y][x] == 0]
+            x, y = rng.choice(empties)
+            b.place_move(x, y, player)
+            player = 3 - player
+        for _ in range(25):
+            b.undo()
+        for _ in range(10):
+            b.redo()
+        expected = self.scan(b)
+        self.assertEqual(b.candidates, set(expected))
+        self.assertEqual({i: b.neighbor_count[i] for i in b.candidates}, expected)
+
+    def test_copy_is_independent(self):
+        b = Board(size=15)
+        for i, (x, y) in enumerate([(7, 7), (8, 8), (6, 7), (9, 9)]):
+            b.place_move(x, y, 1 + i % 2)
+        b.undo()
+        c = b.copy()
+        self.assertIsInstance(c, Board)
+        self.assertEqual((c.grid, c.history, c.hash, c.candidates), (b.grid, b.history, b.hash, b.candidates))
+        self.assertEqual(c.redo(), (9, 9, 2))
+        self.assertEqual(len(b.history), 3)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from gomoku.patterns import score_line_pair
+
+
+def reference_score(line, p):
+    # the original sliding-window scorer the tables were derived from
+    if len(line) < 2:
+        return 0
+    score = 0
+    padded = [0] + list(line) + [0]
+    L = len(padded)
+    for i in range(0, L - 4):
+        if all(v == p for v in padded[i:i + 5]):
+            score += 100000
+    for i in range(0, L - 5):
+        s6 = padded[i:i + 6]
+        if s6[0] == 0 and all(v == p for v in s6[1:5]) and s6[5] == 0:
+            score += 10000
+    for i in range(0, L - 4):
+        s5 = padded[i:i + 5]
+        if sum(1 for v in s5 if v == p) == 4 and not all(v == p for v in s5):
+            score += 1000
+    for i in range(0, L - 4):
+        s5 = padded[i:i + 5]
+        if s5[0] == 0 and s5[4] == 0 and sum(1 for v in s5[1:4] if v == p) == 3:
+            score += 500
+    for i in range(0, L - 3):
+        s4 = padded[i:i + 4]
+        if sum(1 for v in s4 if v == p) == 3 and not (s4[0] == 0 and s4[-1] == 0):
+            score += 100
+    for i in range(0, L - 3):
+        s4 = padded[i:i + 4]
+        if s4[0] == 0 and s4[-1] == 0 and sum(1 for v in s4[1:3] if v == p) == 2:
+            score += 10
+    return score
+
+
+class TestPatternTables(unittest.TestCase):
+    def test_matches_reference_scorer(self):
+        rng = random.Random(11)
+        for _ in range(3000):
+            n = rng.randint(0, 15)
+            line = [rng.choice((0, 0, 1, 2)) for _ in range(n)]
+            self.assertEqual(score_line_pair(line), (reference_score(line, 1), reference_score(line, 2)))
+
+    def test_known_shapes(self):
+        self.assertEqual(score_line_pair([0, 1, 1, 1, 1, 0])[0], reference_score([0, 1, 1, 1, 1, 0], 1))
+        self.assertGreaterEqual(score_line_pair([2] * 5)[1], 100000)
+        self.assertEqual(score_line_pair([1]), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import pstats
+import tempfile
+import unittest
+from gomoku import ai, profiling
+from gomoku.game import Board
+
+
+def opening():
+    b = Board(15)
+    for i, (x, y) in enumerate([(7, 7), (8, 6), (6, 6), (8, 8)]):
+        b.place_move(x, y, 1 + i % 2)
+    return b
+
+
+class TestSearchProfiler(unittest.TestCase):
+    def setUp(self):
+        ai.reset_caches()
+        # profile the Python engine, whose frames the checks look for
+        self.core, ai.SEARCH_CORE = ai.SEARCH_CORE, 'python'
+
+    def tearDown(self):
+        ai.PROFILER = None
+        ai.SEARCH_CORE = self.core
+
+    def check_collapsed(self, path):
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, n = line.rsplit(' ', 1)
+            self.assertGreater(int(n), 0)
+        self.assertTrue(any('negamax' in line for line in lines))
+
+    def test_cprofile_mode(self):
+        with tempfile.TemporaryDirectory() as d:
+            ai.PROFILER = profiling.SearchProfiler(d, 'cprofile')
+            ai.choose_move_minimax(opening(), 1, depth=3)
+            base = os.path.join(d, '0001_move005_p1')
+            self.assertGreater(pstats.Stats(base + '.pstats').total_calls, 0)
+            self.check_collapsed(base + '.collapsed')
+
+    def test_sample_mode(self):
+        with tempfile.TemporaryDirectory() as d:
+            ai.PROFILER = profiling.SearchProfiler(d, 'sample', interval=0.001)
+            ai.choose_move_minimax(opening(), 1, depth=3)
+            self.check_collapsed(os.path.join(d, '0001_move005_p1.collapsed'))
+            self.assertFalse(os.path.exists(os.path.join(d, '0001_move005_p1.pstats')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from gomoku import storage
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestGameRecords(unittest.TestCase):
+    def test_record_round_trip(self):
+        history = [(7, 7, 1), (8, 8, 2), (0, 14, 1), (14, 0, 2)]
+        data = storage.encode_record(history, 15, 1, {'event': 'test'})
+        rec = storage.decode_record(data)
+        self.assertEqual(rec, {'size': 15, 'result': 1, 'meta': {'event': 'test'}, 'history': history})
+
+    def test_json_import_export(self):
+        path = os.path.join(HERE, '..', 'save_1.json')
+        rec = storage.import_json(path)
+        original = storage.load_state(path)
+        self.assertEqual(rec['history'], [tuple(h) for h in original['history']])
+        self.assertLess(len(storage.encode_record(rec['history'], rec['size'])) * 50,
+                        os.path.getsize(path))
+        with tempfile.TemporaryDirectory() as d:
+            out = os.path.join(d, 'copy.json')
+            storage.export_json(out, rec)
+            self.assertEqual(storage.load_state(out), original)
+
+
+class TestGameArchive(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.gma')
+        self.games = [[(i % 15, (i * 7) % 15, 1 + k % 2) for k, i in enumerate(range(n, n + n % 9 + 1))]
+                      for n in range(30)]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_random_access_and_streaming(self):
+        arch = storage.GameArchive(self.path)
+        for g in self.games:
+            arch.append(g, result=storage.RESULT_DRAW)
+        arch = storage.GameArchive(self.path)
+        self.assertEqual(len(arch), 30)
+        self.assertEqual(arch[17]['history'], self.games[17])
+        self.assertEqual([r['history'] for r in arch], self.games)
+
+    def test_index_rebuilt_after_torn_append(self):
+        arch = storage.GameArchive(self.path)
+        for g in self.games[:5]:
+            arch.append(g)
+        with open(self.path, 'ab') as f:
+            f.write(b'\x40\x01\x02')  # length prefix of a record that never made it
+        os.remove(self.path + '.idx')
+        arch = storage.GameArchive(self.path)
+        self.assertEqual(len(arch), 5)
+        arch.append(self.games[5])
+        self.assertEqual(storage.GameArchive(self.path)[5]['history'], self.games[5])
+
+    def test_streaming_stops_at_torn_record(self):
+        arch = storage.GameArchive(self.path)
+        for g in self.games[:3]:
+            arch.append(g)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for tail in (b'\x80', b'\x40\x01\x02'):  # torn length prefix, torn body
+            with open(self.path, 'wb') as f:
+                f.write(data + tail)
+            self.assertEqual([r['history'] for r in arch], self.games[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
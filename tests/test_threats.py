@@ -0,0 +1,52 @@
+import unittest
+from gomoku.game import Board
+from gomoku import threats
+
+
+def make(moves):
+    b = Board(size=15)
+    for x, y, p in moves:
+        b.place_move(x, y, p)
+    return b
+
+
+class TestThreatSearch(unittest.TestCase):
+    def test_vcf_double_four(self):
+        b = make([(5,5,1),(6,5,1),(7,5,1),(4,5,2),(8,6,1),(8,7,1),(8,8,1),(8,9,2),(3,3,2),(12,12,2)])
+        self.assertEqual(threats.find_vcf(b, 1), [(8, 5)])
+
+    def test_vcf_through_forced_block(self):
+        # (8,5) fours the row, O must take (9,5), then (8,4) is an open four in the column
+        b = make([(5,5,1),(6,5,1),(7,5,1),(4,5,2),(8,6,1),(8,7,1),(8,9,2),(0,0,2),(14,14,2)])
+        self.assertEqual(threats.find_vcf(b, 1), [(8, 5), (9, 5), (8, 4)])
+
+    def test_vct_double_three(self):
+        b = make([(6,7,1),(7,7,1),(8,5,1),(8,6,1),(0,0,2),(14,14,2),(0,14,2),(14,0,2)])
+        history = list(b.history)
+        line = threats.find_vct(b, 1)
+        self.assertIsNotNone(line)
+        self.assertEqual(b.history, history)
+        self.assertIsNone(threats.find_vcf(b, 1))
+
+    def test_cancelled(self):
+        import threading
+        b = make([(6,7,1),(7,7,1),(8,5,1),(8,6,1),(0,0,2),(14,14,2),(0,14,2),(14,0,2)])
+        history = list(b.history)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertIsNone(threats.find_vct(b, 1, cancel=cancel))
+        self.assertEqual(b.history, history)
+
+    def test_quiet_position(self):
+        b = make([(7,7,1),(8,8,2)])
+        self.assertIsNone(threats.find_vct(b, 1))
+
+    def test_must_block_opponent_five(self):
+        # X has a four threat of its own but O already threatens five
+        b = make([(1,1,2),(2,1,2),(3,1,2),(4,1,2),(7,7,1),(8,7,1),(9,7,1)])
+        self.assertIsNone(threats.find_vcf(b, 1, depth=1))
+        self.assertEqual(threats.find_vcf(b, 2), [(0, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import os
+import tempfile
+import unittest
+from gomoku import tournament
+from gomoku.storage import GameArchive
+
+
+class TestTournament(unittest.TestCase):
+    def test_parse_engine(self):
+        cfg = tournament.parse_engine('fast:depth=1,time=300,eval=python,core=cython')
+        self.assertEqual(cfg, tournament.EngineConfig('fast', 1, 300, 'python', 'cython'))
+        with self.assertRaises(ValueError):
+            tournament.parse_engine('x:speed=2')
+
+    def test_elo(self):
+        self.assertEqual(tournament.elo(0.5, 100, 0.5)[0], 0)
+        diff, err = tournament.elo(0.75, 100, 0.4)
+        self.assertAlmostEqual(diff, 190.85, places=1)
+        self.assertGreater(err, 0)
+
+    def test_openings_are_reproducible_and_level(self):
+        a = tournament.balanced_openings(5, seed=3)
+        self.assertEqual(a, tournament.balanced_openings(5, seed=3))
+        self.assertTrue(all(len(o) == tournament.OPENING_PLIES for o in a))
+
+    def test_run_streams_games(self):
+        configs = [tournament.EngineConfig('a', depth=1), tournament.EngineConfig('b', depth=1, evaluator='python')]
+        with tempfile.TemporaryDirectory() as d:
+            out = os.path.join(d, 'games.jsonl')
+            arch = os.path.join(d, 'games.gma')
+            report = tournament.run_tournament(configs, 2, out_path=out, archive_path=arch, seed=1, max_plies=20)
+            with open(out) as f:
+                games = [json.loads(line) for line in f]
+            self.assertEqual(len(GameArchive(arch)), 2)
+        self.assertEqual(report['games'], 2)
+        self.assertEqual(len(games), 2)
+        # the opening is played once with each colour
+        self.assertEqual({(g['black'], g['white']) for g in games}, {('a', 'b'), ('b', 'a')})
+        self.assertEqual(games[0]['history'][:4], games[1]['history'][:4])
+        self.assertEqual(report['pairings'][0]['games'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from gomoku.tt import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_store_probe(self):
+        tt = TranspositionTable(size_mb=0.01)
+        tt.store(12345, 3, -40, LOWER, 17)
+        self.assertEqual(tt.probe(12345), (-40, 3, LOWER, 17))
+        self.assertIsNone(tt.probe(54321))
+
+    def test_depth_preferred_slot_survives(self):
+        tt = TranspositionTable(size_mb=0.01)
+        stride = tt._mask + 1
+        deep, shallow, newer = 5, 5 + stride, 5 + 2 * stride  # same bucket
+        tt.store(deep, 6, 1, EXACT)
+        tt.store(shallow, 1, 2, UPPER)
+        tt.store(newer, 2, 3, EXACT)
+        self.assertIsNotNone(tt.probe(deep))
+        self.assertIsNone(tt.probe(shallow))
+        self.assertEqual(tt.probe(newer)[0], 3)
+
+    def test_old_generation_replaced(self):
+        tt = TranspositionTable(size_mb=0.01)
+        stride = tt._mask + 1
+        tt.store(7, 8, 1, EXACT)
+        tt.new_search()
+        tt.store(7 + stride, 1, 2, EXACT)
+        self.assertIsNone(tt.probe(7))
+        self.assertEqual(tt.probe(7 + stride)[1], 1)
+
+    def test_keeps_move_when_none_given(self):
+        tt = TranspositionTable(size_mb=0.01)
+        tt.store(99, 2, 10, EXACT, 42)
+        tt.store(99, 3, 11, LOWER, NO_MOVE)
+        self.assertEqual(tt.probe(99), (11, 3, LOWER, 42))
+
+    def test_capacity_bounded(self):
+        tt = TranspositionTable(size_mb=0.01)
+        for k in range(10000):
+            tt.store(k * 7919, k % 5, k, EXACT)
+        self.assertLessEqual(len(tt), tt.capacity)
+        self.assertLessEqual(tt.capacity * 17, 0.01 * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
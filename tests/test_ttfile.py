@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+import unittest
+from gomoku import ai
+from gomoku.game import Board
+from gomoku.tt import EXACT, LOWER
+from gomoku.ttfile import TTFile, RECORD_BYTES, HEADER
+
+
+class TestTTFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'tt.bin')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_and_merge_deepest(self):
+        f = TTFile(self.path)
+        f.append([(1, 10, 2, EXACT, 5), (2, -3, 1, LOWER, 7)])
+        f.append([(1, 20, 4, LOWER, 6), (2, 9, 0, EXACT, 8)])
+        self.assertEqual(TTFile(self.path).load(), {1: (20, 4, LOWER, 6), 2: (-3, 1, LOWER, 7)})
+
+    def test_torn_and_corrupt_records_are_dropped(self):
+        f = TTFile(self.path)
+        f.append([(1, 10, 2, EXACT, 5), (2, 11, 2, EXACT, 6)])
+        with open(self.path, 'r+b') as fh:
+            fh.seek(HEADER.size + RECORD_BYTES + 3)
+            fh.write(b'\xff')  # corrupt the second record
+        with open(self.path, 'ab') as fh:
+            fh.write(b'\x01\x02\x03')  # torn append
+        self.assertEqual(f.load(), {1: (10, 2, EXACT, 5)})
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + 2 * RECORD_BYTES)
+        f.append([(3, 1, 3, EXACT, 1)])
+        self.assertEqual(set(f.load()), {1, 3})
+
+    def test_compaction(self):
+        f = TTFile(self.path)
+        for d in range(1, 6):
+            f.append([(7, d, d, EXACT, d)])
+        self.assertEqual(f.load(), {7: (5, 5, EXACT, 5)})
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + RECORD_BYTES)
+
+    def test_other_board_size_ignored(self):
+        TTFile(self.path, 15).append([(1, 10, 2, EXACT, 5)])
+        f = TTFile(self.path, 19)
+        self.assertEqual(f.load(), {})
+        f.append([(2, 11, 2, EXACT, 6)])
+        self.assertEqual(f.load(), {2: (11, 2, EXACT, 6)})
+        self.assertEqual(TTFile(self.path, 15).load(), {})
+
+    def test_second_session_reuses_results(self):
+        rng = random.Random(3)
+        b = Board(15)
+        for i in range(10):
+            empties = [(x, y) for y in range(15) for x in range(15) if b.grid[y][x] == 0]
+            b.place_move(*rng.choice(empties), 1 + i % 2)
+        first = ai.Engine(tt_size_mb=2)
+        first.use_tt_file(self.path)
+        r1 = first.search(b, 1, depth=3)
+        second = ai.Engine(tt_size_mb=2)
+        second.use_tt_file(self.path)
+        r2 = second.search(b, 1, depth=3)
+        self.assertEqual((r1.move, r1.score), (r2.move, r2.score))
+        self.assertLess(second.nodes * 5, first.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()